@@ -0,0 +1,3 @@
+"""
+离线基准测试：使用保存的商品页面和静态WebDriver，测量各环节吞吐量，不访问淘宝
+"""
@@ -0,0 +1,55 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基准测试用的WebDriver，按商品ID把URL映射到保存的页面，不启动Chrome
+"""
+
+import os
+import re
+import time
+from utils.static_driver import StaticHtmlDriver
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+PRODUCT_FIXTURES = [
+    'product_single_sku.html',
+    'product_multi_sku.html',
+    'product_discount.html'
+]
+DELISTED_FIXTURE = 'delisted.html'
+
+_ITEM_ID = re.compile(r'[?&]id=(\d+)')
+
+
+def load_fixture(name):
+    """读取保存的页面"""
+    with open(os.path.join(FIXTURE_DIR, name), encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeWebDriver(StaticHtmlDriver):
+    """从fixtures目录返回页面的WebDriver"""
+
+    def __init__(self, latency=0.0, delisted_every=0):
+        """
+        Args:
+            latency: 每次打开页面的模拟耗时(秒)
+            delisted_every: 每隔多少个商品ID返回一次下架页面，0表示不返回
+        """
+        super().__init__(page_loader=self._load_page)
+        self.latency = latency
+        self.delisted_every = delisted_every
+        self.page_loads = 0
+        self._pages = {name: load_fixture(name) for name in PRODUCT_FIXTURES + [DELISTED_FIXTURE]}
+
+    def _load_page(self, url):
+        self.page_loads += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        match = _ITEM_ID.search(url)
+        item_id = int(match.group(1)) if match else 0
+        if self.delisted_every and item_id % self.delisted_every == 0:
+            return self._pages[DELISTED_FIXTURE]
+        return self._pages[PRODUCT_FIXTURES[item_id % len(PRODUCT_FIXTURES)]]
@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+针对本地模拟服务器的压力测试，用真实的PriceFetcher/SkuFetcher逐页抓取
+
+用法示例：
+    # 不启动Chrome，直接下载HTML后解析
+    python -m benchmarks.load_test --pages 2000 --latency uniform:0.01,0.05
+    # 使用真实Chrome
+    python -m benchmarks.load_test --driver chrome --pages 200 --error-rate 0.05
+    # 使用Playwright(需要安装playwright)，与chrome的结果比较
+    python -m benchmarks.load_test --driver playwright --pages 200
+"""
+
+import os
+import sys
+import time
+import logging
+import argparse
+
+from config import CONFIG
+from benchmarks.mock_server import MockTaobaoServer, DEFAULT_SETTINGS
+from benchmarks.run_benchmarks import percentile
+from benchmarks.workbooks import CACHE_DIR
+
+
+def install_driver(kind):
+    """按类型选择并启动获取后端"""
+    from utils.fetch_backend import HttpBackend, use_backend
+    if kind == 'chrome':
+        from utils.browser_handler import browser as backend
+    elif kind == 'playwright':
+        from utils.playwright_backend import PlaywrightBackend
+        backend = PlaywrightBackend()
+    else:
+        backend = HttpBackend()
+    use_backend(backend)
+    backend.setup()
+    return backend
+
+
+def run_load(server, pages, driver_kind):
+    """
+    依次抓取pages个商品页的价格和SKU
+
+    Returns:
+        dict: 统计结果
+    """
+    from core.price_fetcher import PriceFetcher
+    from core.sku_fetcher import SkuFetcher
+    price_fetcher = PriceFetcher()
+    sku_fetcher = SkuFetcher()
+    backend = install_driver(driver_kind)
+
+    latencies = []
+    succeeded = 0
+    started = time.perf_counter()
+    try:
+        for item_id in range(1, pages + 1):
+            url = server.url_for(item_id)
+            page_started = time.perf_counter()
+            price = price_fetcher.get_price(url)
+            sku = sku_fetcher.get_sku(url)
+            latencies.append(time.perf_counter() - page_started)
+            if price and sku:
+                succeeded += 1
+    finally:
+        backend.close()
+    elapsed = time.perf_counter() - started
+
+    return {
+        'pages': pages,
+        'succeeded': succeeded,
+        'seconds': round(elapsed, 2),
+        'pages_per_minute': round(pages / elapsed * 60, 1) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+        'backend': backend.stats(),
+        'server': server.state.snapshot()['stats']
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="模拟服务器压力测试")
+    parser.add_argument('--driver', choices=['http', 'chrome', 'playwright'], default='http',
+                        help="获取后端，http: 直接下载HTML解析；chrome: Selenium + Chrome；playwright: Playwright")
+    parser.add_argument('--pages', type=int, default=1000, help="抓取的商品页数量")
+    parser.add_argument('--wait-timeout', type=float, default=2.0, help="等待元素的超时时间(秒)")
+    parser.add_argument('--latency', default='fixed:0', help="延迟分布，如 uniform:0.05,0.5")
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    parser.add_argument('--throttle-rate', type=float, default=0.0)
+    parser.add_argument('--rate-limit', type=float, default=0.0)
+    parser.add_argument('--login-rate', type=float, default=0.0)
+    parser.add_argument('--drift-rate', type=float, default=0.0)
+    parser.add_argument('--delisted-every', type=int, default=0)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    logging.basicConfig(
+        level=logging.WARNING,
+        filename=os.path.join(CACHE_DIR, 'load_test.log'),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    CONFIG['browser']['timeout'] = args.wait_timeout
+    # 状态文件(驱动缓存等)写入缓存目录，不使用正式任务的data/state
+    CONFIG['task']['state_dir'] = os.path.join(CACHE_DIR, 'state')
+
+    settings = {key: value for key, value in vars(args).items() if key in DEFAULT_SETTINGS}
+    with MockTaobaoServer(**settings) as server:
+        result = run_load(server, args.pages, args.driver)
+
+    print(f"抓取 {result['pages']} 页，成功 {result['succeeded']} 页，耗时 {result['seconds']} 秒")
+    print(f"吞吐量 {result['pages_per_minute']} 页/分钟，p50 {result['p50_ms']}ms，p95 {result['p95_ms']}ms")
+    print(f"后端统计({args.driver}): {result['backend']}")
+    print(f"服务器统计: {result['server']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
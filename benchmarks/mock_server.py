@@ -0,0 +1,363 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+本地模拟淘宝商品页服务器，用于压力测试和故障注入
+
+页面结构与config.py中的选择器一致（见benchmarks/pages.py），支持：
+    - 延迟分布：fixed:0.2 / uniform:0.05,0.5 / lognormal:-1.6,0.6
+    - 错误率：按比例返回500
+    - 限流：超过每秒请求数或按比例返回限流响应(429或滑块验证页)
+    - 登录拦截：按比例返回登录页
+    - 选择器漂移：按比例更换页面中带哈希后缀的class
+    - 下架商品：每隔N个商品ID返回下架页面
+    - 商品变化：修改revision后每隔N个商品ID的价格和SKU改变，商品页带ETag/Last-Modified，
+      请求带If-None-Match/If-Modified-Since且商品未变化时返回304，用于测试变化探测
+
+用法示例：
+    python -m benchmarks.mock_server --port 8765 --latency lognormal:-1.6,0.6 --error-rate 0.02
+运行中可通过 GET /__stats 查看统计，POST /__control (JSON) 修改参数。
+"""
+
+import sys
+import json
+import time
+import random
+import hashlib
+import logging
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, quote
+from email.utils import formatdate
+
+from benchmarks.pages import (render_product_page, render_delisted_page, render_api_payload,
+                              default_panel_class, default_sku_class)
+
+logger = logging.getLogger('taobao_price_checker.mock_server')
+
+SKU_NAMES = ['黑色', '白色', '灰色', '蓝色', '红色', '粉色', '绿色', '卡其色']
+
+# 商品详情接口路径
+API_PATH = '/h5/mtop.taobao.pcdetail.data.get/1.0/'
+
+PUNISH_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>验证码拦截</title></head>
+<body><div id="nocaptcha" class="nc-container">亲，请拖动下方滑块完成验证</div>
+<script>window._config_ = {"action": "captcha", "url": "/punish?x5secdata=mock"};</script>
+</body></html>
+"""
+
+LOGIN_PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>淘宝网 - 登录</title></head>
+<body><div id="login" class="login-box">亲，请登录</div></body></html>
+"""
+
+DEFAULT_SETTINGS = {
+    'latency': 'fixed:0',
+    'error_rate': 0.0,
+    'throttle_rate': 0.0,
+    'throttle_mode': 'punish',   # punish: 返回滑块验证页；status: 返回429
+    'rate_limit': 0.0,           # 每秒允许的请求数，0表示不限制
+    'login_rate': 0.0,
+    'drift_rate': 0.0,
+    'delisted_every': 0,
+    'revision': 0,               # 商品数据版本，修改后change_every选中的商品价格和SKU改变
+    'change_every': 1            # 每隔N个商品ID随revision变化，1表示全部商品
+}
+
+# revision为0时商品页的Last-Modified，之后每个版本晚一小时
+BASE_MODIFIED = 1704067200
+
+
+def parse_latency(spec):
+    """
+    解析延迟分布描述
+
+    Args:
+        spec: fixed:秒 / uniform:最小,最大 / lognormal:mu,sigma
+
+    Returns:
+        function: 无参数，返回一次延迟采样(秒)
+    """
+    kind, _, params = spec.partition(':')
+    values = [float(value) for value in params.split(',') if value]
+    if kind == 'fixed':
+        return lambda: values[0] if values else 0.0
+    if kind == 'uniform':
+        return lambda: random.uniform(values[0], values[1])
+    if kind == 'lognormal':
+        return lambda: random.lognormvariate(values[0], values[1])
+    raise ValueError(f"不支持的延迟分布: {spec}")
+
+
+def drift_class(class_names):
+    """把带哈希后缀的class(如purchasePanel--cG3DU6bX)换成新的哈希，模拟前端发版"""
+    drifted = []
+    for name in class_names.split():
+        if '--' in name:
+            prefix = name.split('--')[0]
+            name = f"{prefix}--{''.join(random.choices('abcdefghijkLMNOPQRSTxyz0123456789', k=8))}"
+        drifted.append(name)
+    return ' '.join(drifted)
+
+
+def product_for(item_id, revision=0):
+    """根据商品ID和数据版本生成确定的标题、价格和SKU"""
+    rng = random.Random(item_id if not revision else f"{item_id}-{revision}")
+    price = round(rng.uniform(9.9, 999.0), 2)
+    sku_count = rng.randint(1, 4)
+    skus = [SKU_NAMES[(item_id + offset) % len(SKU_NAMES)] for offset in range(sku_count)]
+    return f"模拟商品{item_id}", price, skus
+
+
+def validators_for(item_id, revision):
+    """
+    Returns:
+        tuple: 商品页的(ETag, Last-Modified)
+    """
+    etag = '"' + hashlib.sha1(f"{item_id}-{revision}".encode('utf-8')).hexdigest()[:16] + '"'
+    return etag, formatdate(BASE_MODIFIED + revision * 3600, usegmt=True)
+
+
+def sku_prices_for(price, skus):
+    """各SKU的价格：第一个SKU为页面显示的价格，之后每个加10元"""
+    return [round(price + 10 * index, 2) for index in range(len(skus))]
+
+
+class MockTaobaoState:
+    """服务器参数和统计，供所有请求线程共享"""
+
+    def __init__(self, **settings):
+        self.lock = threading.Lock()
+        self.settings = dict(DEFAULT_SETTINGS)
+        self.stats = {}
+        self._window_start = time.monotonic()
+        self._window_count = 0
+        self.update(settings)
+
+    def update(self, settings):
+        with self.lock:
+            for key, value in settings.items():
+                if key not in DEFAULT_SETTINGS:
+                    raise ValueError(f"未知参数: {key}")
+                self.settings[key] = value
+            self.sample_latency = parse_latency(self.settings['latency'])
+
+    def count(self, key):
+        with self.lock:
+            self.stats[key] = self.stats.get(key, 0) + 1
+
+    def over_rate_limit(self):
+        """按一秒的固定窗口统计请求数"""
+        limit = self.settings['rate_limit']
+        if not limit:
+            return False
+        with self.lock:
+            now = time.monotonic()
+            if now - self._window_start >= 1.0:
+                self._window_start = now
+                self._window_count = 0
+            self._window_count += 1
+            return self._window_count > limit
+
+    def revision_for(self, item_id):
+        """商品当前的数据版本，未被change_every选中的商品始终为0"""
+        change_every = self.settings['change_every']
+        if change_every and item_id % change_every == 0:
+            return self.settings['revision']
+        return 0
+
+    def snapshot(self):
+        with self.lock:
+            return {'settings': dict(self.settings), 'stats': dict(self.stats)}
+
+
+class MockTaobaoHandler(BaseHTTPRequestHandler):
+    """请求处理类"""
+
+    server_version = "Tengine"
+    state = None
+
+    def log_message(self, format, *args):
+        logger.debug(format % args)
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        if parsed.path == '/__stats':
+            return self._send(200, json.dumps(self.state.snapshot(), ensure_ascii=False),
+                              'application/json')
+        if parsed.path.startswith(API_PATH):
+            return self._send_api(parsed)
+        if parsed.path not in ('/item.htm', '/'):
+            self.state.count('not_found')
+            return self._send(404, 'not found', 'text/plain')
+
+        settings = self.state.settings
+        self.state.count('requests')
+        delay = max(0.0, self.state.sample_latency())
+        if delay:
+            time.sleep(delay)
+
+        if self.state.over_rate_limit() or random.random() < settings['throttle_rate']:
+            self.state.count('throttled')
+            if settings['throttle_mode'] == 'status':
+                return self._send(429, 'too many requests', 'text/plain', {'Retry-After': '5'})
+            return self._send(200, PUNISH_PAGE)
+        if random.random() < settings['error_rate']:
+            self.state.count('errors')
+            return self._send(500, 'internal server error', 'text/plain')
+        if random.random() < settings['login_rate']:
+            self.state.count('login_wall')
+            return self._send(200, LOGIN_PAGE)
+
+        try:
+            item_id = int(parse_qs(parsed.query).get('id', ['0'])[0])
+        except ValueError:
+            item_id = 0
+
+        delisted_every = settings['delisted_every']
+        if delisted_every and item_id % delisted_every == 0:
+            self.state.count('delisted')
+            return self._send(200, render_delisted_page(item_id))
+
+        panel_class = default_panel_class()
+        sku_class = default_sku_class()
+        if random.random() < settings['drift_rate']:
+            self.state.count('drifted')
+            panel_class = drift_class(panel_class)
+            sku_class = drift_class(sku_class)
+
+        revision = self.state.revision_for(item_id)
+        etag, last_modified = validators_for(item_id, revision)
+        if self._not_modified(etag, last_modified):
+            self.state.count('not_modified')
+            return self._send(304, '', headers={'ETag': etag, 'Last-Modified': last_modified})
+
+        title, price, skus = product_for(item_id, revision)
+        self.state.count('pages')
+        api_url = f"{API_PATH}?jsv=2.7.2&data=" + quote(json.dumps({'id': str(item_id)}))
+        self._send(200, render_product_page(item_id, title, price, skus,
+                                            panel_class=panel_class, sku_class=sku_class,
+                                            api_url=api_url),
+                   headers={'ETag': etag, 'Last-Modified': last_modified})
+
+    def _not_modified(self, etag, last_modified):
+        """条件请求：If-None-Match优先，没有时比较If-Modified-Since"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        return self.headers.get('If-Modified-Since') == last_modified
+
+    def _send_api(self, parsed):
+        """商品详情接口，按mtop的JSONP格式返回"""
+        self.state.count('api_requests')
+        try:
+            item_id = int(json.loads(parse_qs(parsed.query).get('data', ['{}'])[0]).get('id', 0))
+        except ValueError:
+            item_id = 0
+        title, price, skus = product_for(item_id, self.state.revision_for(item_id))
+        body = json.dumps(render_api_payload(item_id, title, price, skus,
+                                                     sku_prices=sku_prices_for(price, skus)),
+                          ensure_ascii=False)
+        self._send(200, f"mtopjsonp1({body})", 'application/javascript')
+
+    def do_POST(self):
+        if urlparse(self.path).path != '/__control':
+            return self._send(404, 'not found', 'text/plain')
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            self.state.update(json.loads(self.rfile.read(length) or b'{}'))
+        except Exception as e:
+            return self._send(400, str(e), 'text/plain')
+        self._send(200, json.dumps(self.state.snapshot(), ensure_ascii=False), 'application/json')
+
+    def _send(self, status, body, content_type='text/html', headers=None):
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class MockTaobaoServer:
+    """在后台线程中运行的模拟服务器"""
+
+    def __init__(self, host='127.0.0.1', port=0, **settings):
+        """
+        Args:
+            host: 监听地址
+            port: 监听端口，0表示自动分配
+            settings: 服务器参数，见DEFAULT_SETTINGS
+        """
+        self.state = MockTaobaoState(**settings)
+        handler = type('BoundMockTaobaoHandler', (MockTaobaoHandler,), {'state': self.state})
+        self.httpd = ThreadingHTTPServer((host, port), handler)
+        self.httpd.daemon_threads = True
+        self.httpd.request_queue_size = 128
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def url_for(self, item_id):
+        """商品页URL"""
+        return f"{self.base_url}/item.htm?id={item_id}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info(f"模拟服务器已启动: {self.base_url}")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="本地模拟淘宝商品页服务器")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', default='fixed:0', help="延迟分布，如 uniform:0.05,0.5")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="返回500的比例")
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help="返回限流响应的比例")
+    parser.add_argument('--throttle-mode', choices=['punish', 'status'], default='punish')
+    parser.add_argument('--rate-limit', type=float, default=0.0, help="每秒允许的请求数")
+    parser.add_argument('--login-rate', type=float, default=0.0, help="返回登录页的比例")
+    parser.add_argument('--drift-rate', type=float, default=0.0, help="选择器漂移的比例")
+    parser.add_argument('--delisted-every', type=int, default=0, help="每隔N个商品ID返回下架页")
+    parser.add_argument('--revision', type=int, default=0, help="商品数据版本")
+    parser.add_argument('--change-every', type=int, default=1, help="每隔N个商品ID随revision变化")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    settings = {key: value for key, value in vars(args).items() if key in DEFAULT_SETTINGS}
+    server = MockTaobaoServer(args.host, args.port, **settings)
+    logger.info(f"商品页示例: {server.url_for(1)}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
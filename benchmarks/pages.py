@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+合成商品页面，结构与config.py中的价格面板、价格XPath和SKU选择器一致
+"""
+
+import html
+import json
+from config import CONFIG
+
+
+def default_panel_class():
+    """配置中的价格面板class(去掉class=和引号)"""
+    return CONFIG['price']['panel_class'].replace('class=', '').strip('"')
+
+
+def default_sku_class():
+    """配置中的SKU元素class"""
+    return CONFIG['sku']['class_name']
+
+
+def render_product_page(item_id, title, price, skus, original_price=None,
+                        panel_class=None, sku_class=None, panel_id=None, api_url=None):
+    """
+    生成商品页面HTML
+
+    价格位于 //*[@id=panel_id]/div[2]/div[3]/div/div/div[1]/span[3]，
+    SKU为class等于sku_class的元素，与config.py中的模板对应。
+
+    Args:
+        item_id: 商品ID
+        title: 商品标题
+        price: 当前价格
+        skus: SKU名称列表
+        original_price: 划线价，None则不显示
+        panel_class: 价格面板class，None则使用配置值
+        sku_class: SKU元素class，None则使用配置值
+        panel_id: 价格面板id，None则根据商品ID生成
+        api_url: 页面加载后请求的商品详情接口地址，None则不请求
+
+    Returns:
+        str: 页面HTML
+    """
+    panel_class = default_panel_class() if panel_class is None else panel_class
+    sku_class = default_sku_class() if sku_class is None else sku_class
+    panel_id = panel_id or f"purchasePanel_{item_id}"
+
+    sku_items = "\n".join(
+        f'            <div class="valueItem--smR4pNt4" data-vid="{index}">'
+        f'<span class="{html.escape(sku_class)}" title="{html.escape(sku)}">{html.escape(sku)}</span></div>'
+        for index, sku in enumerate(skus, 1)
+    )
+    original = ""
+    if original_price is not None:
+        original = (f'<div class="subPrice--KfQ0yn4v"><span class="text--LP7Wf49z">优惠前</span>'
+                    f'<span class="symbol--TtVJ2Q4O">¥</span><span class="text--LP7Wf49z">{original_price:.2f}</span></div>')
+
+    api_script = ""
+    if api_url:
+        api_script = f'<script>fetch({json.dumps(api_url)}).then(function (r) {{ return r.text(); }});</script>'
+
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+  <meta charset="utf-8">
+  <title>{html.escape(title)}-淘宝网</title>
+  <link rel="stylesheet" href="https://g.alicdn.com/??tb-item/pc-detail/index.css">
+  <script src="https://g.alicdn.com/??tb-item/pc-detail/index.js"></script>
+  {api_script}
+</head>
+<body>
+  <div id="root" data-item-id="{item_id}">
+    <div class="header--mEEeHjHm"><a href="https://www.taobao.com">淘宝网</a></div>
+    <div class="main--NSm7BNOi">
+      <div class="mainTitle--O1XCl8e2">{html.escape(title)}</div>
+      <div id="{panel_id}" class="{html.escape(panel_class)}">
+        <div class="header--xPs4k2Cx"><span>价格</span></div>
+        <div class="content--PrDUA6kF">
+          <div class="tag--rE4wBzgw"></div>
+          <div class="delivery--xG6oJ3ee"><span>发货地 浙江杭州</span></div>
+          <div class="priceWrap--vOXNnT9W">
+            <div class="priceRow--SbNhKTHL">
+              <div class="priceInner--Wp6vA2XU">
+                <div class="highlightPrice--LlVWiXXs">
+                  <span class="text--LP7Wf49z">券后</span><span class="symbol--TtVJ2Q4O">¥</span><span class="text--LP7Wf49z">{price:.2f}</span>
+                </div>
+                {original}
+              </div>
+            </div>
+          </div>
+        </div>
+      </div>
+      <div class="skuWrapper--S5aTwWwK">
+        <div class="skuItem--Z2AJB9Ew">
+          <div class="labelWrap--ffBEejeJ"><span class="f-els-2">颜色分类</span></div>
+          <div class="content--DIGuLqdf">
+{sku_items}
+          </div>
+        </div>
+      </div>
+    </div>
+    <div class="footer--RIVU4V2z">{"<p>商品详情</p>" * 20}</div>
+  </div>
+</body>
+</html>
+"""
+
+
+def render_delisted_page(item_id):
+    """生成已下架商品页面HTML"""
+    return f"""<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>淘宝网 - 宝贝不存在</title></head>
+<body>
+  <div id="root" data-item-id="{item_id}">
+    <div class="error-notice-hd">很抱歉，您查看的宝贝不存在，可能已下架或者被转移。</div>
+  </div>
+</body>
+</html>
+"""
+
+
+def render_api_payload(item_id, title, price, skus, original_price=None, sku_prices=None):
+    """
+    生成商品详情接口(mtop.taobao.pcdetail.data.get)的返回数据，结构与线上接口的相关字段一致
+
+    Args:
+        sku_prices: 各SKU的价格，与skus一一对应，None则都使用price
+
+    Returns:
+        dict: 接口数据
+    """
+    sku_prices = [price] * len(skus) if sku_prices is None else sku_prices
+    values = [{'vid': str(index), 'name': sku} for index, sku in enumerate(skus, 1)]
+    sku2info = {'0': {'price': {'priceText': f"{price:.2f}"}, 'quantity': str(len(skus) * 100)}}
+    for index, sku_price in enumerate(sku_prices, 1):
+        sku2info[str(item_id * 100 + index)] = {'price': {'priceText': f"{sku_price:.2f}"}, 'quantity': '100'}
+
+    price_vo = {'price': {'priceText': f"{price:.2f}"}}
+    if original_price is not None:
+        price_vo['extraPrice'] = {'priceText': f"{original_price:.2f}", 'priceTitle': '优惠前'}
+
+    return {
+        'api': 'mtop.taobao.pcdetail.data.get',
+        'v': '1.0',
+        'ret': ['SUCCESS::调用成功'],
+        'data': {
+            'item': {'itemId': str(item_id), 'title': title},
+            'componentsVO': {'priceVO': price_vo},
+            'skuBase': {
+                'props': [{'pid': '1627207', 'name': '颜色分类', 'values': values}],
+                'skus': [{'skuId': str(item_id * 100 + index), 'propPath': f"1627207:{index}"}
+                         for index, _ in enumerate(skus, 1)]
+            },
+            'skuCore': {'sku2info': sku2info}
+        }
+    }
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+离线基准测试入口
+
+用法示例：
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --sizes 1000,10000,100000 --save baseline.json
+    python -m benchmarks.run_benchmarks --baseline baseline.json --threshold 0.15
+
+输出每项测试的 行/秒、单行耗时分位数(p50/p95/p99) 和内存峰值；指定--baseline时，
+吞吐量比基线下降超过阈值的测试会使进程以非零状态码退出。
+"""
+
+import os
+import sys
+import json
+import time
+import importlib
+import logging
+import argparse
+import tracemalloc
+
+from config import CONFIG
+from benchmarks.fake_driver import FakeWebDriver
+from benchmarks.workbooks import CACHE_DIR, ITEM_URL, get_workbook
+
+BENCHMARKS = ['excel', 'price', 'sku', 'run_task']
+
+
+def percentile(values, percent):
+    """计算分位数(最近秩法)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def measure(name, rows, func):
+    """
+    执行一项测试并统计吞吐量、延迟分位数和内存峰值
+
+    Args:
+        name: 测试名称
+        rows: 处理的行数
+        func: 测试函数，返回单行耗时列表(秒)，无法按行统计时返回空列表
+
+    Returns:
+        dict: 测试结果
+    """
+    tracemalloc.start()
+    started = time.perf_counter()
+    latencies = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    result = {
+        'name': name,
+        'rows': rows,
+        'seconds': round(elapsed, 4),
+        'rows_per_sec': round(rows / elapsed, 2) if elapsed > 0 else 0.0,
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'peak_memory_mb': round(peak / 1024 / 1024, 2)
+    }
+    print(f"{name:<24} {rows:>8} 行  {result['rows_per_sec']:>10.1f} 行/秒  "
+          f"p50 {result['p50_ms']:>8.2f}ms  p95 {result['p95_ms']:>8.2f}ms  "
+          f"p99 {result['p99_ms']:>8.2f}ms  内存峰值 {result['peak_memory_mb']:>8.2f}MB")
+    return result
+
+
+def install_fake_driver(latency=0.0):
+    """把浏览器单例的驱动替换为FakeWebDriver"""
+    from utils.browser_handler import browser
+    browser.driver = FakeWebDriver(latency=latency)
+    return browser
+
+
+def bench_excel(rows):
+    """读取对比表"""
+    from utils.excel_handler import ExcelHandler
+    path = get_workbook(rows)
+    handler = ExcelHandler()
+    # ExcelHandler在第一次读取时才导入pandas，这里先导入并单独输出耗时，不计入读取吞吐量
+    if 'pandas' not in sys.modules:
+        started = time.perf_counter()
+        importlib.import_module('pandas')
+        print(f"{'pandas导入':<24} {(time.perf_counter() - started) * 1000:>8.1f}ms(不计入excel_read)")
+
+    def run():
+        data = handler.read_excel(path)
+        assert len(data) == rows, f"读取行数不正确: {len(data)}"
+        return []
+
+    return measure(f"excel_read[{rows}]", rows, run)
+
+
+def bench_fetch(kind, rows, latency):
+    """逐个获取价格或SKU"""
+    from core.price_fetcher import PriceFetcher
+    from core.sku_fetcher import SkuFetcher
+    fetch = PriceFetcher().get_price if kind == 'price' else SkuFetcher().get_sku
+    browser = install_fake_driver(latency)
+
+    def run():
+        latencies = []
+        for item_id in range(1, rows + 1):
+            started = time.perf_counter()
+            value = fetch(ITEM_URL.format(item_id=item_id))
+            latencies.append(time.perf_counter() - started)
+            assert value, f"获取{kind}失败: {item_id}"
+        return latencies
+
+    try:
+        return measure(f"{kind}_fetch[{rows}]", rows, run)
+    finally:
+        browser.close()
+
+
+def bench_run_task(rows, latency):
+    """完整任务流程(读取、获取、比较)"""
+    from core.task_runner import TaskRunner
+    path = get_workbook(rows)
+    CONFIG['task']['request_delay'] = 0
+    install_fake_driver(latency)
+
+    marks = []
+    # 不写回状态文件和结果快照，基准测试的模拟行不会覆盖正式任务的上一轮记录
+    runner = TaskRunner(on_result=lambda result: marks.append(time.perf_counter()), save_state=False)
+
+    def run():
+        started = time.perf_counter()
+        results = runner.run(path)
+        assert len(results) == rows, f"处理行数不正确: {len(results)}"
+        # 相邻两行结果的时间差即单行耗时(第一行包含读取表格和启动时间)
+        points = [started] + marks
+        return [points[i + 1] - points[i] for i in range(1, len(points) - 1)]
+
+    return measure(f"run_task[{rows}]", rows, run)
+
+
+def compare_with_baseline(results, baseline_path, threshold):
+    """
+    与基线结果比较吞吐量
+
+    Returns:
+        list: 退化的测试名称列表
+    """
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = {item['name']: item for item in json.load(f)['results']}
+
+    regressions = []
+    for result in results:
+        base = baseline.get(result['name'])
+        if not base or not base['rows_per_sec']:
+            continue
+        change = result['rows_per_sec'] / base['rows_per_sec'] - 1
+        status = "退化" if change < -threshold else "正常"
+        print(f"{result['name']:<24} 基线 {base['rows_per_sec']:>10.1f} 行/秒  "
+              f"当前 {result['rows_per_sec']:>10.1f} 行/秒  变化 {change:+.1%}  {status}")
+        if change < -threshold:
+            regressions.append(result['name'])
+    return regressions
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="离线基准测试")
+    parser.add_argument('--only', default=','.join(BENCHMARKS),
+                        help=f"要执行的测试，逗号分隔，可选: {','.join(BENCHMARKS)}")
+    parser.add_argument('--sizes', default='1000,10000,100000', help="对比表读取测试的行数")
+    parser.add_argument('--fetch-rows', type=int, default=1000, help="价格/SKU获取测试的页面数")
+    parser.add_argument('--task-rows', type=int, default=1000, help="完整任务测试的行数")
+    parser.add_argument('--latency', type=float, default=0.0, help="模拟的页面加载耗时(秒)")
+    parser.add_argument('--wait-timeout', type=float, default=2.0, help="等待元素的超时时间(秒)")
+    parser.add_argument('--save', help="结果保存路径(JSON)，可作为之后的基线")
+    parser.add_argument('--baseline', help="基线结果路径(JSON)")
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="允许的吞吐量下降比例，超过则返回非零状态码")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    selected = [name.strip() for name in args.only.split(',') if name.strip()]
+
+    # 日志写入缓存目录，避免控制台输出影响测量
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    logging.basicConfig(
+        level=logging.WARNING,
+        filename=os.path.join(CACHE_DIR, 'benchmark.log'),
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    CONFIG['browser']['timeout'] = args.wait_timeout
+    # 状态文件(驱动缓存等)写入缓存目录，不使用正式任务的data/state
+    CONFIG['task']['state_dir'] = os.path.join(CACHE_DIR, 'state')
+
+    results = []
+    if 'excel' in selected:
+        for size in (int(value) for value in args.sizes.split(',')):
+            results.append(bench_excel(size))
+    for kind in ('price', 'sku'):
+        if kind in selected:
+            results.append(bench_fetch(kind, args.fetch_rows, args.latency))
+    if 'run_task' in selected:
+        results.append(bench_run_task(args.task_rows, args.latency))
+
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'results': results},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已保存到: {args.save}")
+
+    if args.baseline:
+        regressions = compare_with_baseline(results, args.baseline, args.threshold)
+        if regressions:
+            print(f"吞吐量退化超过{args.threshold:.0%}: {', '.join(regressions)}")
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
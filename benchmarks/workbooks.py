@@ -0,0 +1,51 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+生成基准测试用的对比表，列名与CONFIG['excel']一致
+"""
+
+import os
+from config import CONFIG
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache')
+
+ITEM_URL = "https://item.taobao.com/item.htm?id={item_id}"
+
+
+def generate_workbook(path, rows):
+    """
+    生成指定行数的对比表
+
+    Args:
+        path: 输出的xlsx路径
+        rows: 数据行数
+    """
+    from openpyxl import Workbook
+
+    columns = CONFIG['excel']['columns']
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(CONFIG['excel']['sheet_name'])
+    sheet.append([columns['link_a'], columns['sku_a'], columns['link_b'], columns['sku_b']])
+    for row in range(rows):
+        item_a = 2 * row + 1
+        item_b = 2 * row + 2
+        sheet.append([
+            ITEM_URL.format(item_id=item_a), f"SKU-{item_a}",
+            ITEM_URL.format(item_id=item_b), f"SKU-{item_b}"
+        ])
+    workbook.save(path)
+
+
+def get_workbook(rows):
+    """
+    获取指定行数的对比表，已生成过的直接复用
+
+    Returns:
+        str: 对比表路径
+    """
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    path = os.path.join(CACHE_DIR, f"workbook_{rows}.xlsx")
+    if not os.path.exists(path):
+        generate_workbook(path, rows)
+    return path
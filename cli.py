@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+命令行/守护进程入口，不依赖PyQt，可在无图形界面的服务器上运行。
+
+用法示例：
+    python cli.py run data/对比表.xlsx --once
+    python cli.py run data/对比表.xlsx --interval 60 --output results.jsonl --alerts alerts.jsonl
+    python cli.py --startup-report run data/对比表.xlsx --once
+
+分布式模式(协调进程写入任务队列，工作进程可在其他机器上运行)：
+    python cli.py run data/对比表.xlsx --queue data/jobs.db --serve 0.0.0.0:8765
+    python cli.py worker --queue http://协调机器:8765
+
+修改选择器后对归档的页面重新提取(需要开启archive.enabled)：
+    python cli.py reextract --output reextract.jsonl --file data/对比表.xlsx --save 补全结果.xlsx
+"""
+
+import sys
+
+# 启动耗时分析需要在其他导入之前开启(python cli.py --startup-report run ...)
+from utils.startup_profiler import profiler
+profiler.install_if_requested(sys.argv)
+
+import os
+import csv
+import json
+import time
+import signal
+import argparse
+import threading
+import multiprocessing
+from datetime import datetime
+
+from config import CONFIG
+from utils.log_setup import setup_logging
+from core.task_runner import ALERT_MESSAGES
+from core.result_buffer import RESULT_FIELDS
+from core.process_runner import create_runner
+from utils.metrics import metrics, start_exporter
+
+
+class JsonLinesWriter:
+    """将记录以JSON Lines格式写入文件或标准输出"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False)
+        with self._lock:
+            if self.path in (None, '-'):
+                sys.stdout.write(line + '\n')
+                sys.stdout.flush()
+            else:
+                with open(self.path, 'a', encoding='utf-8') as f:
+                    f.write(line + '\n')
+
+
+def save_results(path, results, run_time):
+    """
+    保存一轮任务的结果
+
+    Args:
+        path: 输出路径，后缀为.xlsx/.csv/.jsonl，'-'或None表示标准输出
+        results: 结果列表或ResultBuffer
+        run_time: 本轮任务开始时间字符串
+    """
+    if path and path.endswith('.xlsx'):
+        from utils.excel_handler import ExcelHandler
+        ExcelHandler().save_results(path, results)
+    elif path and path.endswith('.csv'):
+        write_header = not os.path.exists(path)
+        with open(path, 'a', encoding='utf-8-sig', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['run_time', *RESULT_FIELDS])
+            if write_header:
+                writer.writeheader()
+            for result in results:
+                writer.writerow(dict(result, run_time=run_time))
+    else:
+        writer = JsonLinesWriter(path)
+        for result in results:
+            writer.write(dict(result, run_time=run_time))
+
+
+def run_once(runner, args):
+    """执行一轮任务并写出结果"""
+    run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    # 时间预算默认为重复间隔，本轮在下一轮开始前结束
+    if args.budget is not None:
+        budget = args.budget * 60
+    elif not args.once and args.interval > 0:
+        budget = args.interval * 60
+    else:
+        budget = None
+    results = runner.run(args.file, budget=budget)
+    with metrics.span('save'):
+        if args.changed_only and runner.changes is not None:
+            # 只输出与上一轮相比有变化的行
+            sequences = runner.changes.sequences()
+            save_results(args.output, [result for result in results if result['sequence'] in sequences], run_time)
+        else:
+            save_results(args.output, results, run_time)
+        if args.changes and runner.changes is not None:
+            writer = JsonLinesWriter(args.changes)
+            for record in runner.changes.records():
+                writer.write(dict(record, run_time=run_time))
+    return results
+
+
+def cmd_run(args, logger):
+    """run 子命令：按间隔重复执行比较任务"""
+    alert_writer = JsonLinesWriter(args.alerts)
+
+    def on_alert(alert_type, result):
+        alert_writer.write({
+            'time': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'type': alert_type,
+            'message': ALERT_MESSAGES[alert_type],
+            'result': dict(result)
+        })
+
+    def on_progress(value):
+        logger.debug(f"任务进度: {value}%")
+
+    queue_server = None
+    if args.queue:
+        from core.job_queue import JobQueue, JobQueueServer
+        from core.job_runner import JobCoordinator
+        job_queue = JobQueue(args.queue)
+        if args.serve:
+            host, _, port = args.serve.rpartition(':')
+            queue_server = JobQueueServer(job_queue, host or None, int(port)).start()
+        runner = JobCoordinator(job_queue, on_progress=on_progress, on_alert=on_alert)
+    else:
+        runner = create_runner(on_progress=on_progress, on_alert=on_alert, processes=args.processes)
+    stop_event = threading.Event()
+
+    def handle_signal(signum, frame):
+        logger.info(f"收到信号{signum}，当前行处理完成后退出")
+        stop_event.set()
+        runner.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    # 启动报告在浏览器启动之前输出，只统计进程冷启动部分
+    profiler.mark('进入run命令')
+    profiler.report()
+
+    exporter = start_exporter(args.metrics_port, args.metrics_file)
+
+    interval_seconds = max(args.interval, 0) * 60
+    run_count = 0
+    try:
+        while not stop_event.is_set():
+            run_count += 1
+            started = time.monotonic()
+            logger.info(f"本次是第{run_count}次任务执行")
+            run_once(runner, args)
+
+            if args.once or interval_seconds <= 0:
+                break
+            # 与图形界面一致，间隔从本轮开始时计算；等待可被信号中断
+            remaining = interval_seconds - (time.monotonic() - started)
+            if remaining > 0:
+                logger.info(f"{int(remaining)}秒后执行下一轮任务")
+                stop_event.wait(remaining)
+    finally:
+        if exporter:
+            exporter.stop()
+        if queue_server:
+            queue_server.stop()
+
+    return 0
+
+
+def cmd_worker(args, logger):
+    """worker 子命令：分布式模式的工作进程，从任务队列租用任务"""
+    from core.job_queue import open_queue
+    from core.job_runner import JobWorker
+
+    worker = JobWorker(open_queue(args.queue), worker_id=args.worker_id,
+                       batch_size=args.batch_size, idle_exit=args.idle_exit)
+
+    def handle_signal(signum, frame):
+        logger.info(f"收到信号{signum}，当前行处理完成后退出")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    if hasattr(signal, 'SIGTERM'):
+        signal.signal(signal.SIGTERM, handle_signal)
+
+    exporter = start_exporter(args.metrics_port, args.metrics_file)
+    try:
+        worker.run()
+    finally:
+        if exporter:
+            exporter.stop()
+    return 0
+
+
+def cmd_reextract(args, logger):
+    """reextract 子命令：用当前的选择器对归档的页面重新提取，验证修改并补全结果"""
+    from core.reextractor import reextract, summarize, backfill
+
+    records = reextract(since=args.since, processes=args.processes)
+    if args.output:
+        writer = JsonLinesWriter(args.output)
+        for record in records:
+            if args.all or record['price']['verdict'] != 'same' or record['sku']['verdict'] != 'same':
+                writer.write(record)
+
+    for kind, counts in summarize(records).items():
+        logger.info(f"{kind}: " + ", ".join(f"{verdict} {count}" for verdict, count in sorted(counts.items())))
+
+    if args.file:
+        from utils.excel_handler import ExcelHandler
+        data = ExcelHandler().read_excel(args.file)
+        run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        save_results(args.save, backfill(data, records), run_time)
+    return 0
+
+
+def build_parser():
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(description="淘宝商品价格对比工具(命令行版)")
+    subparsers = parser.add_subparsers(dest='command')
+
+    run_parser = subparsers.add_parser('run', help="执行比较任务")
+    run_parser.add_argument('file', help="Excel文件路径")
+    run_parser.add_argument('--interval', type=int, default=CONFIG['task']['default_interval'],
+                            help="任务重复间隔(分钟)，0表示只执行一次")
+    run_parser.add_argument('--once', action='store_true', help="只执行一次")
+    run_parser.add_argument('--budget', type=float, default=None,
+                            help="每轮的时间预算(分钟)，默认等于重复间隔；到达后按优先级保留已完成的行并结束本轮")
+    run_parser.add_argument('--output', default='-',
+                            help="结果输出路径(.xlsx/.csv/.jsonl)，默认输出到标准输出")
+    run_parser.add_argument('--alerts', default='-',
+                            help="警告输出路径(JSON Lines)，默认输出到标准输出")
+    run_parser.add_argument('--changes', default=None,
+                            help="与上一轮相比的变化(新差异、差异消失、价格变动)输出路径(JSON Lines)")
+    run_parser.add_argument('--changed-only', action='store_true',
+                            help="结果只输出与上一轮相比有变化的行")
+    run_parser.add_argument('--metrics-port', type=int, default=None,
+                            help="Prometheus指标端点端口，默认使用配置文件中的值")
+    run_parser.add_argument('--metrics-file', default=None,
+                            help="定期写入指标的JSON文件，默认使用配置文件中的值")
+    run_parser.add_argument('--processes', type=int, default=None,
+                            help="工作进程数，1为单进程，0为CPU核数，默认使用配置文件中的值")
+    run_parser.add_argument('--queue', default=None,
+                            help="分布式模式：任务队列SQLite文件，本进程只作为协调进程")
+    run_parser.add_argument('--serve', default=None,
+                            help="分布式模式：通过HTTP提供任务队列的地址，如0.0.0.0:8765；只写端口时使用queue.server_host")
+    run_parser.set_defaults(func=cmd_run)
+
+    worker_parser = subparsers.add_parser('worker', help="分布式模式的工作进程")
+    worker_parser.add_argument('--queue', required=True,
+                               help="任务队列：SQLite文件路径或协调进程的HTTP地址")
+    worker_parser.add_argument('--worker-id', default=None, help="工作进程ID，默认为 主机名-进程号")
+    worker_parser.add_argument('--batch-size', type=int, default=None,
+                               help="每次租用的任务数，默认使用配置文件中的值")
+    worker_parser.add_argument('--idle-exit', type=int, default=0,
+                               help="任务队列持续为空多少秒后退出，0表示一直运行")
+    worker_parser.add_argument('--metrics-port', type=int, default=None,
+                               help="Prometheus指标端点端口，默认使用配置文件中的值")
+    worker_parser.add_argument('--metrics-file', default=None,
+                               help="定期写入指标的JSON文件，默认使用配置文件中的值")
+    worker_parser.set_defaults(func=cmd_worker)
+
+    reextract_parser = subparsers.add_parser('reextract', help="对归档的页面重新提取价格和SKU(不联网)")
+    reextract_parser.add_argument('--since', default=None,
+                                  help="只处理该时间之后归档的页面，格式为\"YYYY-mm-dd HH:MM:SS\"")
+    reextract_parser.add_argument('--processes', type=int, default=0,
+                                  help="工作进程数，0为CPU核数")
+    reextract_parser.add_argument('--output', default='-',
+                                  help="逐页比较结果输出路径(JSON Lines)，默认输出到标准输出")
+    reextract_parser.add_argument('--all', action='store_true',
+                                  help="输出全部页面，默认只输出与归档时提取结果不同的页面")
+    reextract_parser.add_argument('--file', default=None,
+                                  help="Excel文件路径，指定时按重新提取的值生成各行结果")
+    reextract_parser.add_argument('--save', default='-',
+                                  help="按--file生成的结果输出路径(.xlsx/.csv/.jsonl)，默认输出到标准输出")
+    reextract_parser.set_defaults(func=cmd_reextract)
+
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if not getattr(args, 'func', None):
+        parser.print_help()
+        return 1
+
+    logger = setup_logging()
+    try:
+        return args.func(args, logger)
+    except Exception as e:
+        logger.error(f"命令执行失败: {str(e)}")
+        return 1
+
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()
+    sys.exit(main())
@@ -11,6 +11,25 @@ CONFIG = {
     "browser": {
         "headless": False,  # 是否启用无头模式 (True为不显示浏览器界面)
         "timeout": 30,      # 页面加载超时时间(秒)
+        "tabs": 1,          # 每个浏览器的标签页数，大于1时在后台标签页预加载后续页面
+        "spares": 0,        # 后台保持的备用浏览器数，浏览器回收或崩溃时直接换用，每个备用浏览器占用一份内存
+        "driver_path": "",     # chromedriver路径，留空则自动查找并缓存(见utils/driver_resolver.py)
+        "driver_version": "",  # 固定chromedriver版本，留空则使用PATH中的或webdriver_manager匹配的版本
+        "binary_path": "",     # Chrome可执行文件路径，留空则自动查找
+        # 浏览器回收：长时间运行时浏览器内存持续增长，超过阈值后在行与行之间重建浏览器
+        "recycle": {
+            "max_pages": 500,    # 同一浏览器打开的页面数上限，0表示不限制
+            "max_rss_mb": 1500,  # chromedriver及浏览器全部进程的内存上限(MB)，需要安装psutil，0表示不检查
+            "check_every": 20,   # 每打开多少个页面检查一次内存
+            "mode": "restart"    # 达到页面数上限时: restart重启浏览器 / blank清空会话和缓存后继续使用
+        },
+        # 持久的用户数据目录：磁盘缓存和cookie在多轮任务、浏览器回收之间保留(见utils/browser_profile.py)
+        "profile": {
+            "persistent": False,     # False则每次启动浏览器使用新的临时目录
+            "dir": "data/profiles",  # 用户数据目录所在目录，每个同时运行的浏览器占用其中一个
+            "cache_mb": 256,         # 每个浏览器的磁盘缓存上限(MB)，0表示使用Chrome默认值
+            "max_mb": 1024           # 启动、回收或关闭浏览器时目录超过该大小(MB)则清理缓存(保留cookie)，0表示不清理
+        },
         "user_agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
         "window_size": {
             "width": 1366,
@@ -18,6 +37,14 @@ CONFIG = {
         }
     },
     
+    # 页面获取后端(见utils/fetch_backend.py)
+    "backend": {
+        # selenium: Chrome + Selenium / playwright: 一个Chromium进程内的多个浏览器上下文(需要安装playwright)
+        # http: 直接下载HTML静态解析，不执行JavaScript
+        "name": "selenium",
+        "contexts": 4  # playwright的浏览器上下文数，即同时加载的页面数上限
+    },
+    
     # 价格获取配置
     "price": {
         # 价格XPath模板，其中{panel_id}将被替换为实际面板ID
@@ -30,6 +57,36 @@ CONFIG = {
         "class_name": "valueItemText--HiKnUqGa f-els-1"
     },
     
+    # 提取方式配置
+    "extract": {
+        # dom: 等待页面渲染后按XPath/class提取
+        # network: 从页面请求的商品详情接口数据中读取，读取不到时再从页面提取
+        "mode": "dom",
+        "api_patterns": ["mtop.taobao.pcdetail.data.get", "mtop.taobao.detail.getdetail"],
+        "api_wait": 3,       # 页面加载完成后等待接口响应的最长时间(秒)，超时后从页面提取
+        "api_buffer": 64,    # 按商品ID缓存的接口数据条数
+        # 按SKU获取(task.fetch_mode为variants)时，页面提取下是否依次点击每个SKU读取各自的价格
+        "click_variants": False,
+        "click_wait": 0.5    # 点击SKU后等待价格刷新的时间(秒)
+    },
+    
+    # 页面归档：保存获取过的页面，修改选择器后用 python cli.py reextract 离线重新提取(见utils/page_archive.py)
+    "archive": {
+        "enabled": False,
+        "dir": "data/archive",
+        "mode": "stripped",  # full: 完整HTML / stripped: 去掉script、style、svg和注释
+        "codec": "auto"      # auto: 安装了zstandard时使用zstd，否则使用zlib；也可指定zstd/zlib
+    },
+
+    # 变化探测：每轮开始时用轻量的HTTP请求(ETag/Last-Modified/页面摘要)检查页面是否变化，
+    # 未变化的链接直接使用上次获取的值，不打开页面(见core/change_probe.py)
+    "probe": {
+        "enabled": False,
+        "workers": 8,        # 同时进行的探测请求数
+        "timeout": 5,        # 单个探测请求的超时时间(秒)
+        "max_age": 86400     # 记录的有效期(秒)，超过后即使未变化也完整获取一次，0表示不限制
+    },
+    
     # Excel配置
     "excel": {
         "sheet_name": "Sheet1",
@@ -45,7 +102,87 @@ CONFIG = {
     "task": {
         "default_interval": 60,  # 默认任务间隔(分钟)
         "retry_times": 3,        # 失败重试次数
-        "retry_delay": 5         # 重试间隔(秒)
+        "retry_delay": 5,        # 重试间隔(秒)
+        "request_delay": 1,      # 每行处理完后的等待时间(秒)，避免请求过快
+        # fields: 每行的价格、SKU分别打开页面获取
+        # variants: 每个链接本轮只打开一次，获取全部SKU的价格，各行按表格中的SKU名称匹配
+        "fetch_mode": "fields",
+        "processes": 1,          # 工作进程数，1为单进程，0为CPU核数；每个进程各自启动一个浏览器
+        "state_dir": "data/state"  # 跨轮次保存的状态(下架商品等)所在目录
+    },
+    
+    # 失败分类配置：根据页面URL、标题或内容判断失败原因
+    "classify": {
+        "login_urls": ["login.taobao.com", "login.tmall.com"],
+        "login_texts": ["亲，请登录", "淘宝网 - 登录"],
+        "throttle_urls": ["/punish", "x5secdata", "_____tmd_____"],
+        "throttle_texts": ["验证码拦截", "请拖动下方滑块", "nocaptcha"],
+        "delisted_urls": ["noitem.htm", "/error.htm"],
+        "delisted_texts": ["宝贝不存在", "此宝贝已下架", "商品已下架"],
+        # 只在这些商品主体区域(CSS选择器)中查找下架文字，推荐商品等区域的文字不计入
+        "delisted_containers": ["[class*='error-notice']", "[class*='main--']", "#J_DetailMeta"]
+    },
+    
+    # 重试配置(重试次数和基础间隔见task.retry_times/retry_delay)
+    "retry": {
+        "multiplier": 2,         # 指数退避倍数
+        "max_delay": 60,         # 单次退避上限(秒)
+        "budget_ratio": 0.2,     # 每轮重试预算占页面数的比例
+        "min_budget": 10,        # 每轮最少的重试预算
+        # 按域名熔断：最近window次请求中失败比例达到failure_ratio时暂停cooldown秒
+        "circuit_breaker": {
+            "window": 20,
+            "min_requests": 10,
+            "failure_ratio": 0.5,
+            "cooldown": 30,
+            "max_cooldown": 600,
+            # 熔断持续超过该时间(秒)后，等待该域名的行本轮不再推迟，按失败处理(下一轮再试)；
+            # 之后仍按冷却时间放行探测请求，恢复后正常获取。0表示一直等待
+            "max_open": 120
+        }
+    },
+    
+    # 与上一轮结果比较的配置
+    "diff": {
+        "alerts": "changes",     # changes: 只在差异新出现时警告 / all: 每轮对所有存在差异的行警告
+        "snapshot_file": "run_snapshot.json"  # 上一轮结果快照，位于task.state_dir下
+    },
+    
+    # 同时加载页面数自动调节(上限大于1时生效：selenium为browser.tabs，playwright为backend.contexts)
+    "concurrency": {
+        "adaptive": True,        # False则始终使用全部标签页
+        "initial": 2,            # 初始同时加载的页面数
+        "min": 1,
+        "window": 20,            # 每获取window个页面调节一次
+        "target_p95": 8,         # 页面获取p95耗时上限(秒)，超过则减半
+        "max_timeout_rate": 0.1, # 超时比例上限，超过则减半
+        "increase": 1,           # 每次加性增加的数量
+        "decrease": 0.5          # 乘性减少的比例；出现限流时立即按此比例减少
+    },
+    
+    # 分环节执行：获取 → 比较 → 输出(回调)，环节之间用有界队列连接(见core/pipeline.py)
+    "pipeline": {
+        "queue_size": 50,        # 环节之间队列的容量，队列满时上游等待
+        "compare_workers": 1,    # 比较环节的线程数
+        "sink_workers": 1        # 输出环节(结果、警告、进度回调)的线程数，大于1时回调可能被同时调用
+    },
+    
+    # 获取顺序和时间预算配置
+    "plan": {
+        "priority": True,        # 按优先级处理：上一轮有差异的行、上一轮未获取的行、价格较高的商品优先
+        "budget_ratio": 0.9,     # 时间预算(通常为任务间隔)中用于获取的比例，其余留给保存结果等
+        "latency_alpha": 0.2,    # 每行耗时指数加权平均的权重
+        "min_samples": 5         # 预测完成时间前至少需要的已完成行数
+    },
+    
+    # 分布式模式任务队列配置
+    "queue": {
+        "lease_seconds": 300,    # 任务租约时长(秒)，工作进程处理期间定期续租
+        "max_attempts": 3,       # 单个任务最多租用次数，超过后标记为失败
+        "batch_size": 5,         # 工作进程每次租用的任务(行)数
+        "poll_interval": 2,      # 队列为空时工作进程、协调进程的轮询间隔(秒)
+        "server_host": "127.0.0.1",  # HTTP接口(--serve未指定地址时)的监听地址，供其他机器访问时改为0.0.0.0
+        "token": ""              # HTTP接口的共享令牌，协调进程和工作进程配置相同的值，空表示不校验
     },
     
     # 比较配置
@@ -53,12 +190,27 @@ CONFIG = {
         "price_precision": 2     # 价格比较精度(小数位数)
     },
     
+    # 指标配置
+    "metrics": {
+        "http_port": 0,          # Prometheus文本格式端点端口，0表示不启动
+        "http_host": "127.0.0.1",  # 端点监听地址，需要其他机器抓取时改为0.0.0.0
+        "json_file": "",         # 定期写入指标的JSON文件路径，空表示不写入
+        "json_interval": 60      # JSON文件写入间隔(秒)
+    },
+    
     # 日志配置
     "log": {
         "level": "INFO",
         "file": "logs/app.log",
-        "max_size": 10 * 1024 * 1024,  # 10MB
-        "backup_count": 5
+        "max_size": 10 * 1024 * 1024,  # 10MB，超过后轮转
+        "backup_count": 5,
+        "format": "text",        # 日志文件格式：text 或 json(每行一条JSON)
+        # 重复日志限流：同类警告/错误在interval秒内前burst条正常输出，之后每sample_every条输出1条
+        "rate_limit": {
+            "burst": 10,
+            "interval": 60,
+            "sample_every": 100
+        }
     }
 }
 
@@ -67,6 +219,17 @@ def get_price_xpath(panel_id):
     """生成价格的XPath"""
     return CONFIG["price"]["xpath_template"].format(panel_id=panel_id)
 
+# 价格面板选择器
+def get_panel_selector():
+    """
+    获取价格面板的CSS选择器
+    
+    panel_class中包含多个类名，selenium的By.CLASS_NAME会把它当作后代选择器，
+    因此转换为 .类名1.类名2 形式的复合选择器
+    """
+    panel_class = CONFIG["price"]["panel_class"].replace('class=', '').strip('"')
+    return ''.join(f'.{name}' for name in panel_class.split())
+
 # SKU元素选择器
 def get_sku_selector():
     """获取SKU元素选择器"""
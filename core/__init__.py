@@ -1,9 +1,30 @@
-from core.price_fetcher import PriceFetcher
-from core.sku_fetcher import SkuFetcher
-from core.data_comparator import DataComparator
+import importlib
+
+# 按需导入，避免导入core包时就加载bs4/selenium等重量级依赖
+_LAZY_IMPORTS = {
+    'PriceFetcher': 'core.price_fetcher',
+    'SkuFetcher': 'core.sku_fetcher',
+    'VariantFetcher': 'core.variant_fetcher',
+    'DataComparator': 'core.data_comparator',
+    'TaskRunner': 'core.task_runner',
+    'ProcessTaskRunner': 'core.process_runner',
+    'ResultRecord': 'core.result_buffer',
+    'ResultBuffer': 'core.result_buffer'
+}
 
 __all__ = [
     'PriceFetcher',
     'SkuFetcher',
-    'DataComparator'
-] 
\ No newline at end of file
+    'VariantFetcher',
+    'DataComparator',
+    'TaskRunner',
+    'ProcessTaskRunner',
+    'ResultRecord',
+    'ResultBuffer'
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+商品详情接口(mtop.taobao.pcdetail.data.get等)返回数据的解析
+
+页面上的价格和SKU由这些接口的JSON数据渲染而来。直接从接口数据读取，
+不依赖页面渲染完成，也不依赖config.py中带哈希后缀的class名。
+"""
+
+import re
+import json
+import logging
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.api_parser')
+
+_JSONP_PATTERN = re.compile(r'^\s*[\w$.]+\s*\((.*)\)\s*;?\s*$', re.S)
+
+
+def parse_body(text):
+    """
+    解析接口返回的JSON或JSONP文本
+
+    Returns:
+        dict: 解析结果，无法解析时返回None
+    """
+    if not text:
+        return None
+    match = _JSONP_PATTERN.match(text)
+    if match:
+        text = match.group(1)
+    try:
+        payload = json.loads(text)
+    except ValueError:
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def _get(data, *path):
+    """按路径读取嵌套字典，中途缺失时返回None"""
+    for key in path:
+        if not isinstance(data, dict):
+            return None
+        data = data.get(key)
+    return data
+
+
+def _to_price(text):
+    """把价格文本(如"¥89.00"、"89-120")转换为浮点数，区间价取最低价"""
+    if text is None:
+        return 0.0
+    match = re.search(r'\d+(?:\.\d+)?', str(text))
+    if not match:
+        return 0.0
+    return round(float(match.group()), CONFIG['compare']['price_precision'])
+
+
+def payload_item_id(payload):
+    """接口数据中的商品ID"""
+    item_id = _get(payload, 'data', 'item', 'itemId')
+    return str(item_id) if item_id is not None else None
+
+
+def is_success(payload):
+    """mtop接口的ret字段以SUCCESS开头表示调用成功"""
+    ret = payload.get('ret') or []
+    return not ret or str(ret[0]).startswith('SUCCESS')
+
+
+def find_price(payload):
+    """
+    读取页面显示的价格
+
+    Returns:
+        float: 价格，找不到时返回0.0
+    """
+    data = payload.get('data') or {}
+    for path in (('componentsVO', 'priceVO', 'price', 'priceText'),
+                 ('price', 'price', 'priceText'),
+                 ('skuCore', 'sku2info', '0', 'price', 'priceText')):
+        price = _to_price(_get(data, *path))
+        if price:
+            return price
+    return 0.0
+
+
+def find_sku(payload):
+    """
+    读取第一个SKU属性值的名称，与页面上第一个SKU元素的文字对应
+
+    Returns:
+        str: SKU名称，找不到时返回空字符串
+    """
+    props = _get(payload, 'data', 'skuBase', 'props') or []
+    for prop in props:
+        for value in prop.get('values') or []:
+            if value.get('name'):
+                return str(value['name']).strip()
+    return ""
+
+
+def find_variants(payload):
+    """
+    读取全部可选SKU组合及其价格和库存
+
+    多个属性(如颜色、尺码)的组合名称按属性顺序用空格连接，例如"红色 XL"。
+
+    Returns:
+        list: (SKU名称, 价格, 库存)列表，价格缺失时为0.0，库存缺失时为None
+    """
+    data = payload.get('data') or {}
+    names = {}
+    for prop in _get(data, 'skuBase', 'props') or []:
+        for value in prop.get('values') or []:
+            if value.get('name'):
+                names[f"{prop.get('pid')}:{value.get('vid')}"] = str(value['name']).strip()
+
+    sku2info = _get(data, 'skuCore', 'sku2info') or {}
+    variants = []
+    for sku in _get(data, 'skuBase', 'skus') or []:
+        parts = [names.get(part) for part in str(sku.get('propPath') or '').split(';') if part]
+        if not parts or None in parts:
+            continue
+        info = sku2info.get(str(sku.get('skuId'))) or {}
+        quantity = info.get('quantity')
+        stock = int(quantity) if str(quantity).isdigit() else None
+        variants.append((' '.join(parts), _to_price(_get(info, 'price', 'priceText')), stock))
+
+    # 没有SKU组合数据(单规格商品)时，只有属性值名称
+    if not variants:
+        variants = [(name, 0.0, None) for name in names.values()]
+    return variants
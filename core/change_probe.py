@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+商品页变化探测
+
+大部分商品页在两轮之间没有变化，但每次都要完整渲染页面才能知道。开启probe.enabled后，
+每轮开始时对本轮要打开的链接各发一次轻量的HTTP请求，得到页面的版本标识(validator)：
+    - 服务器返回ETag或Last-Modified时直接使用，之后带If-None-Match/If-Modified-Since
+      发送条件请求，未变化时服务器返回304，不传输页面内容
+    - 都没有时使用去掉脚本、样式后的页面摘要(脚本中的令牌、时间戳每次请求都不同)
+版本标识与上次完整获取时记录的相同(见FetchState.remember)时直接使用上次的值，
+不再打开页面；探测失败或标识变化的链接按原流程完整获取。
+
+淘宝商品页需要登录状态且由脚本渲染，直接请求通常拿不到有效的版本标识，
+该功能主要用于服务端渲染、支持条件请求的站点和本地模拟服务器(benchmarks/mock_server.py)。
+"""
+
+import hashlib
+import logging
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from utils.page_archive import strip_html
+from utils.metrics import metrics
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.change_probe')
+
+# 版本标识前缀
+VALIDATOR_ETAG = 'etag:'
+VALIDATOR_MODIFIED = 'modified:'
+VALIDATOR_DIGEST = 'sha256:'
+
+# 探测结果(指标标签)
+PROBE_UNCHANGED = 'unchanged'
+PROBE_CHANGED = 'changed'
+PROBE_FAILED = 'failed'
+
+
+def conditional_headers(validator):
+    """
+    按上次的版本标识生成条件请求头
+
+    Args:
+        validator: 上次的版本标识，None表示没有记录
+
+    Returns:
+        dict: 请求头，页面摘要无法用于条件请求，返回空字典
+    """
+    if not validator:
+        return {}
+    if validator.startswith(VALIDATOR_ETAG):
+        return {'If-None-Match': validator[len(VALIDATOR_ETAG):]}
+    if validator.startswith(VALIDATOR_MODIFIED):
+        return {'If-Modified-Since': validator[len(VALIDATOR_MODIFIED):]}
+    return {}
+
+
+def response_validator(headers, body):
+    """
+    Args:
+        headers: 响应头
+        body: 响应内容(bytes)
+
+    Returns:
+        str: 页面的版本标识，ETag优先，其次Last-Modified，都没有时为页面摘要
+    """
+    etag = headers.get('ETag')
+    if etag:
+        return VALIDATOR_ETAG + etag
+    last_modified = headers.get('Last-Modified')
+    if last_modified:
+        return VALIDATOR_MODIFIED + last_modified
+    charset = headers.get_content_charset() or 'utf-8'
+    html = strip_html(body.decode(charset, errors='replace'))
+    return VALIDATOR_DIGEST + hashlib.sha256(html.encode('utf-8')).hexdigest()
+
+
+class ChangeProbe:
+    """商品页变化探测类"""
+
+    def __init__(self, fetch_state):
+        """
+        Args:
+            fetch_state: FetchState，读取上次记录的版本标识
+        """
+        self.fetch_state = fetch_state
+
+    def probe(self, url):
+        """
+        探测一个链接当前的版本标识
+
+        Returns:
+            str: 版本标识，请求失败时返回None
+        """
+        previous = self.fetch_state.probe_validator(url)
+        headers = {'User-Agent': CONFIG['browser']['user_agent']}
+        headers.update(conditional_headers(previous))
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            with metrics.span('probe'):
+                with urllib.request.urlopen(request, timeout=CONFIG['probe']['timeout']) as response:
+                    validator = response_validator(response.headers, response.read())
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and previous:
+                metrics.inc('probes_total', result=PROBE_UNCHANGED)
+                return previous
+            metrics.inc('probes_total', result=PROBE_FAILED)
+            logger.debug(f"变化探测失败 {url}: HTTP {e.code}")
+            return None
+        except Exception as e:
+            metrics.inc('probes_total', result=PROBE_FAILED)
+            logger.debug(f"变化探测失败 {url}: {str(e)}")
+            return None
+
+        metrics.inc('probes_total', result=PROBE_UNCHANGED if validator == previous else PROBE_CHANGED)
+        return validator
+
+    def probe_all(self, urls, stop_event=None):
+        """
+        并发探测多个链接
+
+        Args:
+            urls: 链接列表，重复的只探测一次
+            stop_event: 设置后不再开始新的探测
+
+        Returns:
+            dict: 链接 -> 版本标识(探测失败时为None)
+        """
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return {}
+        stop_event = stop_event or threading.Event()
+
+        def probe_one(url):
+            return None if stop_event.is_set() else self.probe(url)
+
+        workers = max(1, min(CONFIG['probe']['workers'], len(urls)))
+        with metrics.span('probe_all'):
+            with ThreadPoolExecutor(workers, thread_name_prefix='probe') as executor:
+                validators = dict(zip(urls, executor.map(probe_one, urls)))
+        unchanged = sum(1 for url, validator in validators.items()
+                        if validator is not None and validator == self.fetch_state.probe_validator(url))
+        logger.info(f"变化探测{len(urls)}个链接，{unchanged}个未变化")
+        return validators
@@ -0,0 +1,116 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+同时加载的页面数自动调节(AIMD：加性增、乘性减)
+
+获取后端同时加载的页面数上限为browser.tabs(Playwright为backend.contexts)，实际值由控制器决定：
+最近一批页面的p95耗时、超时比例都在阈值以内时加1，超过阈值或出现限流时减半。
+站点空闲时逐步提高并发，被限流或变慢时迅速退让，不需要按时段手动调整。
+"""
+
+import logging
+import threading
+from utils.metrics import metrics
+from core.fetch_outcome import FailureCategory
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.concurrency')
+
+# 调节结果
+DECISION_INCREASE = 'increase'
+DECISION_DECREASE = 'decrease'
+DECISION_HOLD = 'hold'
+
+
+def _percentile(values, ratio):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * ratio))]
+
+
+class AimdController:
+    """同时加载页面数的AIMD控制器"""
+
+    def __init__(self, maximum, minimum=None, initial=None):
+        """
+        Args:
+            maximum: 并发上限(浏览器标签页数)
+            minimum: 并发下限，None则使用配置
+            initial: 初始并发，None则使用配置
+        """
+        settings = CONFIG['concurrency']
+        self.maximum = max(1, maximum)
+        self.minimum = min(self.maximum, settings['min'] if minimum is None else minimum)
+        initial = settings['initial'] if initial is None else initial
+        self.limit = float(max(self.minimum, min(self.maximum, initial)))
+
+        self.window = settings['window']
+        self.target_p95 = settings['target_p95']
+        self.max_timeout_rate = settings['max_timeout_rate']
+        self.increase = settings['increase']
+        self.decrease = settings['decrease']
+
+        self._latencies = []
+        self._timeouts = 0
+        self._since_decrease = self.window
+        self._lock = threading.Lock()
+        metrics.set_gauge('concurrency_limit', self.current)
+
+    @property
+    def current(self):
+        """当前允许同时加载的页面数"""
+        return int(self.limit)
+
+    def record(self, seconds, category):
+        """
+        记录一次页面获取
+
+        Args:
+            seconds: 获取耗时(秒)
+            category: 结果的失败分类(FailureCategory)，成功为OK
+        """
+        with self._lock:
+            self._since_decrease += 1
+            if category is FailureCategory.THROTTLED:
+                # 限流立即减半，同一窗口内只减一次，避免连续的限流页面把并发直接降到下限
+                if self._since_decrease >= self.window:
+                    self._apply(DECISION_DECREASE, "出现限流")
+                return
+
+            self._latencies.append(seconds)
+            if category is FailureCategory.TIMEOUT:
+                self._timeouts += 1
+            if len(self._latencies) >= self.window:
+                self._decide()
+
+    def _decide(self):
+        p95 = _percentile(self._latencies, 0.95)
+        timeout_rate = self._timeouts / len(self._latencies)
+        metrics.set_gauge('concurrency_window_p95_seconds', p95)
+        metrics.set_gauge('concurrency_window_timeout_rate', timeout_rate)
+
+        if timeout_rate > self.max_timeout_rate:
+            self._apply(DECISION_DECREASE, f"超时比例{timeout_rate:.0%}")
+        elif p95 > self.target_p95:
+            self._apply(DECISION_DECREASE, f"p95耗时{p95:.2f}秒")
+        elif self.limit < self.maximum:
+            self._apply(DECISION_INCREASE, f"p95耗时{p95:.2f}秒")
+        else:
+            self._apply(DECISION_HOLD, "已达上限")
+        self._latencies = []
+        self._timeouts = 0
+
+    def _apply(self, decision, reason):
+        previous = self.current
+        if decision == DECISION_INCREASE:
+            self.limit = min(self.maximum, self.limit + self.increase)
+        elif decision == DECISION_DECREASE:
+            self.limit = max(self.minimum, self.limit * self.decrease)
+            self._since_decrease = 0
+            self._latencies = []
+            self._timeouts = 0
+
+        metrics.inc('concurrency_decisions_total', decision=decision)
+        metrics.set_gauge('concurrency_limit', self.current)
+        if self.current != previous:
+            logger.info(f"同时加载页面数 {previous} → {self.current} ({reason})")
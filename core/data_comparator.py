@@ -70,6 +70,58 @@ class DataComparator:
             logger.error(f"比较SKU时出错: {str(e)}")
             return False
     
+    def check_price_difference(self, price_a, price_b):
+        """
+        检查本店和竞店价格是否存在差异
+        
+        Args:
+            price_a: 本店价格
+            price_b: 竞店价格
+            
+        Returns:
+            bool: 存在差异返回True
+        """
+        return not self.compare_prices(price_a, price_b)
+    
+    def check_sku_difference(self, sku_a, sku_b):
+        """
+        检查本店和竞店SKU是否存在差异
+        
+        Args:
+            sku_a: 本店SKU
+            sku_b: 竞店SKU
+            
+        Returns:
+            bool: 存在差异返回True
+        """
+        return not self.compare_skus(sku_a, sku_b)
+    
+    def check_local_sku_difference(self, expected_sku, actual_sku):
+        """
+        检查表格中的本店SKU与链接中获取的SKU是否不同
+        
+        Args:
+            expected_sku: 表格中填写的本店SKU
+            actual_sku: 从本店链接获取的SKU
+            
+        Returns:
+            bool: 存在差异返回True
+        """
+        return not self.compare_skus(expected_sku, actual_sku)
+    
+    def check_competitor_sku_difference(self, expected_sku, actual_sku):
+        """
+        检查表格中的竞店SKU与链接中获取的SKU是否不同
+        
+        Args:
+            expected_sku: 表格中填写的竞店SKU
+            actual_sku: 从竞店链接获取的SKU
+            
+        Returns:
+            bool: 存在差异返回True
+        """
+        return not self.compare_skus(expected_sku, actual_sku)
+    
     def _to_decimal(self, value):
         """
         将输入值转换为Decimal类型
@@ -0,0 +1,205 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+获取结果和失败分类
+
+价格/SKU获取失败时区分原因（商品下架、登录拦截、滑块限流、选择器失效、超时、
+网络错误），不同原因使用不同的重试策略：
+    - RETRY_SOON: 本轮内退避重试（超时、网络错误、限流）
+    - RETRY_NEXT_RUN: 本轮不再重试，下一轮再试（登录拦截、选择器失效）
+    - NEVER: 在表格中该行内容变化之前不再请求（商品下架）
+"""
+
+import socket
+import logging
+from enum import Enum
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.fetch_outcome')
+
+
+class FailureCategory(Enum):
+    """失败分类"""
+    OK = 'ok'
+    DELISTED = 'delisted'              # 商品不存在或已下架
+    LOGIN_WALL = 'login_wall'          # 跳转到登录页
+    THROTTLED = 'throttled'            # 滑块验证或429限流
+    SELECTOR_DRIFT = 'selector_drift'  # 页面正常但找不到价格/SKU元素
+    TIMEOUT = 'timeout'                # 页面加载超时
+    NETWORK = 'network'                # 网络错误或服务器错误
+    UNKNOWN = 'unknown'
+
+
+class RetryPolicyType(Enum):
+    """失败后的处理策略"""
+    RETRY_SOON = 'retry_soon'
+    RETRY_NEXT_RUN = 'retry_next_run'
+    NEVER = 'never'
+
+
+CATEGORY_POLICIES = {
+    FailureCategory.DELISTED: RetryPolicyType.NEVER,
+    FailureCategory.LOGIN_WALL: RetryPolicyType.RETRY_NEXT_RUN,
+    FailureCategory.SELECTOR_DRIFT: RetryPolicyType.RETRY_NEXT_RUN,
+    FailureCategory.THROTTLED: RetryPolicyType.RETRY_SOON,
+    FailureCategory.TIMEOUT: RetryPolicyType.RETRY_SOON,
+    FailureCategory.NETWORK: RetryPolicyType.RETRY_SOON,
+    FailureCategory.UNKNOWN: RetryPolicyType.RETRY_SOON
+}
+
+# 这些失败说明站点本身在正常响应，不计入域名熔断的错误率
+HOST_HEALTHY_CATEGORIES = (FailureCategory.DELISTED, FailureCategory.SELECTOR_DRIFT)
+
+
+class FetchOutcome:
+    """一次获取的结果：值和失败分类"""
+
+    __slots__ = ('value', 'category', 'detail')
+
+    def __init__(self, value, category=FailureCategory.OK, detail=""):
+        self.value = value
+        self.category = category
+        self.detail = detail
+
+    @classmethod
+    def success(cls, value):
+        return cls(value)
+
+    @classmethod
+    def failure(cls, category, default, detail=""):
+        """
+        Args:
+            category: 失败分类
+            default: 失败时返回给调用方的默认值(0.0或"")
+            detail: 失败描述
+        """
+        return cls(default, category, detail)
+
+    @property
+    def ok(self):
+        return self.category is FailureCategory.OK
+
+    @property
+    def policy(self):
+        return CATEGORY_POLICIES.get(self.category, RetryPolicyType.RETRY_SOON)
+
+    @property
+    def host_healthy(self):
+        """站点是否正常响应，用于熔断器记录"""
+        return self.ok or self.category in HOST_HEALTHY_CATEGORIES
+
+    def __repr__(self):
+        return f"FetchOutcome({self.value!r}, {self.category.value}, {self.detail!r})"
+
+
+def classify_navigation_error(error):
+    """
+    根据打开页面时的异常判断失败分类
+
+    Args:
+        error: BrowserHandler.get_page记录的异常
+
+    Returns:
+        FailureCategory: 失败分类
+    """
+    if error is None:
+        return FailureCategory.UNKNOWN
+
+    # HTTP直接下载页面时的错误(urllib)
+    code = getattr(error, 'code', None)
+    if isinstance(code, int):
+        if code == 429:
+            return FailureCategory.THROTTLED
+        if code in (404, 410):
+            return FailureCategory.DELISTED
+        return FailureCategory.NETWORK
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return FailureCategory.TIMEOUT
+
+    name = type(error).__name__
+    message = str(error)
+    if 'Timeout' in name or 'timed out' in message:
+        return FailureCategory.TIMEOUT
+    if 'net::' in message or name in ('URLError', 'ConnectionError', 'ConnectionRefusedError'):
+        return FailureCategory.NETWORK
+    return FailureCategory.UNKNOWN
+
+
+def _matches(text, markers):
+    return any(marker in text for marker in markers)
+
+
+def check_blocked_page(driver):
+    """
+    打开页面后用URL和标题快速判断是否为登录页、验证页或下架页，
+    命中时不必再等待价格/SKU元素超时
+
+    Args:
+        driver: 获取后端或WebDriver对象(读取current_url、title、page_source)
+
+    Returns:
+        FailureCategory: 命中时返回失败分类，否则返回None
+    """
+    markers = CONFIG['classify']
+    try:
+        url = driver.current_url or ''
+        title = driver.title or ''
+    except Exception as e:
+        logger.warning(f"读取页面地址和标题失败: {str(e)}")
+        return None
+
+    if _matches(url, markers['login_urls']) or _matches(title, markers['login_texts']):
+        return FailureCategory.LOGIN_WALL
+    if _matches(url, markers['throttle_urls']) or _matches(title, markers['throttle_texts']):
+        return FailureCategory.THROTTLED
+    if _matches(url, markers['delisted_urls']) or _matches(title, markers['delisted_texts']):
+        return FailureCategory.DELISTED
+    return None
+
+
+def _container_text(backend, selectors):
+    """商品主体区域(classify.delisted_containers)的文本，推荐商品等其他区域的文字不计入"""
+    try:
+        texts = backend.extract_batch({f'c{index}': ('css selector', selector)
+                                       for index, selector in enumerate(selectors)})
+    except Exception as e:
+        logger.warning(f"读取商品主体区域失败: {str(e)}")
+        return ''
+    return '\n'.join(text for values in texts.values() for text in values)
+
+
+def classify_missing_element(driver):
+    """
+    找不到价格/SKU元素时，根据页面内容判断原因
+
+    下架文字只在商品主体区域中查找：页面上推荐的其他商品可能带有"已下架"等字样，
+    误判为下架后该行会一直不再获取。
+
+    Args:
+        driver: 获取后端(读取current_url、title、page_source，按选择器读取元素文本)
+
+    Returns:
+        FailureCategory: 失败分类，页面正常但结构不符时为SELECTOR_DRIFT
+    """
+    category = check_blocked_page(driver)
+    if category:
+        return category
+
+    markers = CONFIG['classify']
+    try:
+        source = driver.page_source or ''
+    except Exception as e:
+        logger.warning(f"读取页面源码失败: {str(e)}")
+        return FailureCategory.TIMEOUT
+
+    if _matches(source, markers['login_texts']):
+        return FailureCategory.LOGIN_WALL
+    if _matches(source, markers['throttle_texts']):
+        return FailureCategory.THROTTLED
+    if _matches(_container_text(driver, markers['delisted_containers']), markers['delisted_texts']):
+        return FailureCategory.DELISTED
+    # 页面几乎为空，说明没有加载完成
+    if len(source) < 512:
+        return FailureCategory.TIMEOUT
+    return FailureCategory.SELECTOR_DRIFT
@@ -0,0 +1,204 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+跨轮次保存的获取状态：确认下架的商品链接、页面版本标识及对应的获取结果
+
+下架的链接按表格行内容的指纹记录，只要该行内容不变，之后的任务就不再打开该链接；
+表格中该行被修改(换了链接或SKU)后指纹变化，会重新获取。同一链接可能出现在多行中，
+每个链接记录全部已确认下架的行指纹。
+
+开启变化探测(见core/change_probe.py)时，完整获取成功后记录页面当时的版本标识和获取到的值，
+之后探测到相同的版本标识时直接使用记录的值。记录超过probe.max_age后失效，读取状态文件时丢弃。
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.fetch_state')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def row_fingerprint(item):
+    """
+    计算表格行内容的指纹
+
+    Args:
+        item: Excel中读取的单行数据
+
+    Returns:
+        str: 指纹
+    """
+    content = json.dumps(item, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()[:16]
+
+
+class FetchState:
+    """获取状态，保存在state_dir/fetch_state.json"""
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(BASE_DIR, CONFIG['task']['state_dir'], 'fetch_state.json')
+        self.path = path
+        self.dead = {}    # 链接 -> {行指纹: {'category', 'since'}}
+        self.probes = {}  # 链接 -> {'validator', 'values': {获取类型: 值}, 'checked': time.time()}
+        self.cleared = set()  # 本进程中获取成功(调用过clear)的链接，多进程模式下回传给主进程
+        self._dirty = False
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """读取状态文件，文件不存在或损坏时从空状态开始"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, encoding='utf-8') as f:
+                    state = json.load(f)
+                self.dead = {url: self._upgrade(entry) for url, entry in state.get('dead', {}).items()}
+                self.probes = {url: entry for url, entry in state.get('probes', {}).items()
+                               if not self._expired(entry)}
+        except Exception as e:
+            logger.error(f"读取获取状态文件出错，将重新记录: {str(e)}")
+            self.dead = {}
+            self.probes = {}
+
+    def save(self):
+        """有变化时写回状态文件"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_file = self.path + '.tmp'
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'dead': self.dead, 'probes': self.probes}, f, ensure_ascii=False, indent=2)
+                os.replace(temp_file, self.path)
+                self._dirty = False
+            except Exception as e:
+                logger.error(f"保存获取状态文件出错: {str(e)}")
+
+    @staticmethod
+    def _upgrade(entry):
+        """旧版本每个链接只记录一个行指纹：{'fingerprint', 'category', 'since'}"""
+        if 'fingerprint' in entry:
+            return {entry['fingerprint']: {'category': entry['category'], 'since': entry['since']}}
+        return entry
+
+    def is_dead(self, url, fingerprint):
+        """
+        Returns:
+            bool: 该链接在当前行内容下已确认下架
+        """
+        with self._lock:
+            return fingerprint in self.dead.get(url, {})
+
+    def mark_dead(self, url, fingerprint, category):
+        """记录确认下架的链接，同一链接的其他行的记录保留"""
+        with self._lock:
+            self.dead.setdefault(url, {})[fingerprint] = {
+                'category': category,
+                'since': time.strftime("%Y-%m-%d %H:%M:%S")
+            }
+            self._dirty = True
+
+    def clear(self, url):
+        """链接获取成功后移除记录"""
+        with self._lock:
+            self.cleared.add(url)
+            if self.dead.pop(url, None) is not None:
+                self._dirty = True
+
+    @staticmethod
+    def _expired(entry):
+        max_age = CONFIG['probe']['max_age']
+        return bool(max_age) and time.time() - entry.get('checked', 0) > max_age
+
+    def probe_validator(self, url):
+        """
+        Returns:
+            str: 上次完整获取时页面的版本标识，没有记录或已失效时返回None
+        """
+        with self._lock:
+            entry = self.probes.get(url)
+            if entry is None or self._expired(entry):
+                return None
+            return entry['validator']
+
+    def cached_value(self, url, validator, kind):
+        """
+        页面版本未变化时上次获取到的值
+
+        Args:
+            url: 商品页面URL
+            validator: 本轮探测到的版本标识
+            kind: 获取类型(price/sku/variants)
+
+        Returns:
+            上次的值，版本标识不同、记录已失效或没有该类型的值时返回None
+        """
+        with self._lock:
+            entry = self.probes.get(url)
+            if entry is None or entry['validator'] != validator or self._expired(entry):
+                return None
+            return entry['values'].get(kind)
+
+    def remember(self, url, validator, kind, value):
+        """
+        记录完整获取成功时页面的版本标识和获取到的值
+
+        Args:
+            validator: 本轮获取前探测到的版本标识
+            kind: 获取类型(price/sku/variants)
+            value: 获取到的值(可JSON序列化)
+        """
+        with self._lock:
+            entry = self.probes.get(url)
+            if entry is None or entry['validator'] != validator:
+                entry = self.probes[url] = {'validator': validator, 'values': {}, 'checked': time.time()}
+            entry['values'][kind] = value
+            self._dirty = True
+
+    def export(self, urls):
+        """
+        导出部分链接的记录，多进程模式下工作进程用于回传分片的状态
+
+        Args:
+            urls: 链接列表
+
+        Returns:
+            dict: {'dead': 其中已确认下架的链接记录, 'cleared': 其中本进程获取成功的链接,
+                   'probes': 其中的版本标识记录}
+        """
+        with self._lock:
+            return {'dead': {url: self.dead[url] for url in urls if url in self.dead},
+                    'cleared': [url for url in urls if url in self.cleared],
+                    'probes': {url: self.probes[url] for url in urls if url in self.probes}}
+
+    def merge(self, exported):
+        """
+        用工作进程回传的分片状态更新记录
+
+        只删除分片中实际获取成功的链接的下架记录；分片没有处理到的链接(中途停止、
+        到达截止时间)保留其他分片记录的行指纹，结果与各分片合并的先后顺序无关。
+
+        Args:
+            exported: 分片结束时的记录(export的返回值)
+        """
+        with self._lock:
+            for url in exported.get('cleared', ()):
+                self._dirty |= self.dead.pop(url, None) is not None
+            for url, entry in exported['dead'].items():
+                # 同一链接的行可能分在多个分片中，合并各分片记录的行指纹
+                merged = dict(self.dead.get(url, {}), **entry)
+                if self.dead.get(url) != merged:
+                    self.dead[url] = merged
+                    self._dirty = True
+            for url, entry in exported['probes'].items():
+                if self.probes.get(url) != entry:
+                    self.probes[url] = entry
+                    self._dirty = True
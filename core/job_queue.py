@@ -0,0 +1,424 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分布式模式使用的持久化任务队列
+
+协调进程把表格的每一行写成一个任务存入SQLite文件，工作进程(可以在其他机器上)
+租用任务、获取数据后提交结果。租约到期未提交(工作进程退出或断网)的任务重新
+回到待处理状态，超过最大尝试次数后标记为失败。
+
+同一台机器或共享存储上的工作进程可以直接打开SQLite文件；其他机器通过协调进程
+启动的HTTP接口(JobQueueServer)访问，客户端JobQueueClient的方法与JobQueue相同。
+配置了queue.token时，HTTP请求需要在TOKEN_HEADER请求头中带上相同的令牌。
+
+一轮任务结束后协调进程调用purge删除该轮的全部任务，队列文件不会随轮次增长。
+"""
+
+import hmac
+import json
+import time
+import sqlite3
+import logging
+import threading
+import urllib.request
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.job_queue')
+
+# 任务状态
+JOB_PENDING = 'pending'
+JOB_LEASED = 'leased'
+JOB_DONE = 'done'
+JOB_FAILED = 'failed'
+JOB_CANCELLED = 'cancelled'
+
+# HTTP接口的共享令牌请求头
+TOKEN_HEADER = 'X-Queue-Token'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    sequence INTEGER NOT NULL,
+    item TEXT NOT NULL,
+    status TEXT NOT NULL,
+    worker TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    alerts TEXT,
+    finish_seq INTEGER
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, id);
+CREATE INDEX IF NOT EXISTS jobs_run_finished ON jobs (run_id, finish_seq);
+"""
+
+
+def _job_dict(row):
+    return {'id': row[0], 'run_id': row[1], 'sequence': row[2], 'item': json.loads(row[3])}
+
+
+class JobQueue:
+    """基于SQLite文件的任务队列，多进程、多线程安全"""
+
+    def __init__(self, path, max_attempts=None):
+        """
+        Args:
+            path: SQLite文件路径
+            max_attempts: 单个任务最多租用次数，None则使用配置
+        """
+        self.path = path
+        self.max_attempts = CONFIG['queue']['max_attempts'] if max_attempts is None else max_attempts
+        db = self._connect()
+        try:
+            db.execute('PRAGMA journal_mode=WAL')
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30, isolation_level=None)
+
+    @contextmanager
+    def _transaction(self):
+        """每次操作使用独立连接，写事务开始时即加锁，避免多个工作进程租到同一任务"""
+        db = self._connect()
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+                db.execute('COMMIT')
+            except Exception:
+                db.execute('ROLLBACK')
+                raise
+        finally:
+            db.close()
+
+    def enqueue(self, run_id, rows):
+        """
+        写入一轮任务
+
+        Args:
+            run_id: 本轮任务ID
+            rows: (行序号, 单行数据)列表
+
+        Returns:
+            int: 写入的任务数
+        """
+        with self._transaction() as db:
+            db.executemany(
+                'INSERT INTO jobs (run_id, sequence, item, status) VALUES (?, ?, ?, ?)',
+                [(run_id, sequence, json.dumps(item, ensure_ascii=False), JOB_PENDING)
+                 for sequence, item in rows]
+            )
+        return len(rows)
+
+    def _requeue_expired(self, db, now):
+        """租约到期的任务重新回到待处理状态，超过最大尝试次数的标记为失败"""
+        expired = db.execute('SELECT id, attempts, worker FROM jobs WHERE status = ? AND lease_until < ?',
+                             (JOB_LEASED, now)).fetchall()
+        for job_id, attempts, worker in expired:
+            if attempts >= self.max_attempts:
+                self._finish(db, job_id, JOB_FAILED, error=f"租约到期(最后租用: {worker})")
+            else:
+                db.execute('UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL WHERE id = ?',
+                           (JOB_PENDING, job_id))
+        if expired:
+            logger.warning(f"{len(expired)}个任务租约到期，已重新排队")
+        return len(expired)
+
+    def requeue_expired(self):
+        """处理租约到期的任务，协调进程定期调用"""
+        with self._transaction() as db:
+            return self._requeue_expired(db, time.time())
+
+    def _finish(self, db, job_id, status, result=None, alerts=None, error=None):
+        # 完成顺序按轮次编号，删除其他轮次的任务不影响本轮协调进程读取的位置
+        db.execute(
+            'UPDATE jobs SET status = ?, result = ?, alerts = ?, error = ?, lease_until = NULL, '
+            'finish_seq = (SELECT COALESCE(MAX(finish_seq), 0) + 1 FROM jobs '
+            'WHERE run_id = (SELECT run_id FROM jobs WHERE id = ?)) WHERE id = ?',
+            (status, json.dumps(result, ensure_ascii=False) if result is not None else None,
+             json.dumps(alerts or [], ensure_ascii=False), error, job_id, job_id)
+        )
+
+    def lease(self, worker, count=1, lease_seconds=None):
+        """
+        租用最多count个同一轮的待处理任务
+
+        Args:
+            worker: 工作进程ID
+            count: 最多租用的任务数
+            lease_seconds: 租约时长(秒)，None则使用配置
+
+        Returns:
+            list: 任务字典列表(id, run_id, sequence, item)
+        """
+        lease_seconds = lease_seconds or CONFIG['queue']['lease_seconds']
+        now = time.time()
+        with self._transaction() as db:
+            self._requeue_expired(db, now)
+            first = db.execute('SELECT run_id FROM jobs WHERE status = ? ORDER BY id LIMIT 1',
+                               (JOB_PENDING,)).fetchone()
+            if first is None:
+                return []
+            rows = db.execute(
+                'SELECT id, run_id, sequence, item FROM jobs WHERE status = ? AND run_id = ? ORDER BY id LIMIT ?',
+                (JOB_PENDING, first[0], count)
+            ).fetchall()
+            db.executemany(
+                'UPDATE jobs SET status = ?, worker = ?, lease_until = ?, attempts = attempts + 1 WHERE id = ?',
+                [(JOB_LEASED, worker, now + lease_seconds, row[0]) for row in rows]
+            )
+        return [_job_dict(row) for row in rows]
+
+    def heartbeat(self, worker, job_ids, lease_seconds=None):
+        """
+        延长仍在处理中的任务的租约
+
+        Returns:
+            int: 成功延长的任务数(租约已被收回的任务不会延长)
+        """
+        lease_seconds = lease_seconds or CONFIG['queue']['lease_seconds']
+        with self._transaction() as db:
+            cursor = db.executemany(
+                'UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = ?',
+                [(time.time() + lease_seconds, job_id, worker, JOB_LEASED) for job_id in job_ids]
+            )
+            return cursor.rowcount
+
+    def complete(self, worker, job_id, result, alerts=None):
+        """
+        提交任务结果
+
+        Returns:
+            bool: 是否提交成功；租约已过期并被其他工作进程租用时返回False
+        """
+        with self._transaction() as db:
+            owner = db.execute('SELECT worker, status FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if owner is None or owner[0] != worker or owner[1] != JOB_LEASED:
+                logger.warning(f"任务{job_id}的租约已失效，丢弃{worker}提交的结果")
+                return False
+            self._finish(db, job_id, JOB_DONE, result=result, alerts=alerts)
+            return True
+
+    def fail(self, worker, job_id, error):
+        """工作进程放弃任务：未超过最大尝试次数时重新排队"""
+        with self._transaction() as db:
+            row = db.execute('SELECT worker, status, attempts FROM jobs WHERE id = ?', (job_id,)).fetchone()
+            if row is None or row[0] != worker or row[1] != JOB_LEASED:
+                return False
+            if row[2] >= self.max_attempts:
+                self._finish(db, job_id, JOB_FAILED, error=error)
+            else:
+                db.execute('UPDATE jobs SET status = ?, worker = NULL, lease_until = NULL, error = ? WHERE id = ?',
+                           (JOB_PENDING, error, job_id))
+            return True
+
+    def cancel(self, run_id):
+        """取消一轮任务中尚未完成的任务"""
+        with self._transaction() as db:
+            cursor = db.execute('UPDATE jobs SET status = ? WHERE run_id = ? AND status IN (?, ?)',
+                                (JOB_CANCELLED, run_id, JOB_PENDING, JOB_LEASED))
+            return cursor.rowcount
+
+    def purge(self, run_id):
+        """
+        删除一轮任务的全部记录，协调进程读取完该轮结果后调用
+
+        之后工作进程提交的该轮结果会因租约失效而被丢弃。
+
+        Returns:
+            int: 删除的任务数
+        """
+        with self._transaction() as db:
+            cursor = db.execute('DELETE FROM jobs WHERE run_id = ?', (run_id,))
+            return cursor.rowcount
+
+    def progress(self, run_id):
+        """
+        Returns:
+            dict: 各状态的任务数
+        """
+        with self._transaction() as db:
+            rows = db.execute('SELECT status, COUNT(*) FROM jobs WHERE run_id = ? GROUP BY status',
+                              (run_id,)).fetchall()
+        return dict(rows)
+
+    def finished(self, run_id, after_seq=0):
+        """
+        读取完成顺序在after_seq之后的已结束任务
+
+        Returns:
+            list: 任务字典列表，另含status、result、alerts、error、finish_seq
+        """
+        with self._transaction() as db:
+            rows = db.execute(
+                'SELECT id, run_id, sequence, item, status, result, alerts, error, finish_seq FROM jobs '
+                'WHERE run_id = ? AND finish_seq > ? ORDER BY finish_seq', (run_id, after_seq)
+            ).fetchall()
+        jobs = []
+        for row in rows:
+            job = _job_dict(row)
+            job.update({
+                'status': row[4],
+                'result': json.loads(row[5]) if row[5] else None,
+                'alerts': json.loads(row[6]) if row[6] else [],
+                'error': row[7],
+                'finish_seq': row[8]
+            })
+            jobs.append(job)
+        return jobs
+
+
+class _QueueRequestHandler(BaseHTTPRequestHandler):
+    """任务队列HTTP接口，请求和响应均为JSON"""
+    job_queue = None
+    token = ''
+
+    # 路径 → (JobQueue方法, 参数名)
+    ROUTES = {
+        '/lease': ('lease', ('worker', 'count', 'lease_seconds')),
+        '/heartbeat': ('heartbeat', ('worker', 'job_ids', 'lease_seconds')),
+        '/complete': ('complete', ('worker', 'job_id', 'result', 'alerts')),
+        '/fail': ('fail', ('worker', 'job_id', 'error'))
+    }
+
+    def _authorized(self):
+        """未配置令牌时不检查；令牌不符时返回401"""
+        if not self.token or hmac.compare_digest(self.headers.get(TOKEN_HEADER, ''), self.token):
+            return True
+        logger.warning(f"拒绝未通过令牌校验的任务队列请求: {self.client_address[0]} {self.path}")
+        self._send(401, {'error': 'unauthorized'})
+        return False
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        route = self.ROUTES.get(urlparse(self.path).path)
+        if route is None:
+            return self._send(404, {'error': 'not found'})
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            method, names = route
+            value = getattr(self.job_queue, method)(*(body.get(name) for name in names))
+            self._send(200, {'value': value})
+        except Exception as e:
+            logger.error(f"处理任务队列请求出错 {self.path}: {str(e)}")
+            self._send(500, {'error': str(e)})
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        parsed = urlparse(self.path)
+        if parsed.path != '/progress':
+            return self._send(404, {'error': 'not found'})
+        run_id = parse_qs(parsed.query).get('run_id', [''])[0]
+        self._send(200, {'value': self.job_queue.progress(run_id)})
+
+    def _send(self, status, data):
+        body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class JobQueueServer:
+    """在协调进程中通过HTTP提供任务队列，供其他机器上的工作进程使用"""
+
+    def __init__(self, job_queue, host=None, port=8765, token=None):
+        """
+        Args:
+            job_queue: 任务队列(JobQueue)
+            host: 监听地址，None则使用queue.server_host(默认只监听本机)
+            port: 端口，0表示随机分配
+            token: 共享令牌，None则使用queue.token，空表示不校验
+        """
+        self.job_queue = job_queue
+        self.host = CONFIG['queue']['server_host'] if host is None else host
+        self.port = port
+        self.token = CONFIG['queue']['token'] if token is None else token
+        self._httpd = None
+
+    def start(self):
+        handler = type('BoundQueueRequestHandler', (_QueueRequestHandler,),
+                       {'job_queue': self.job_queue, 'token': self.token})
+        self._httpd = ThreadingHTTPServer((self.host, self.port), handler)
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        logger.info(f"任务队列HTTP接口已启动: http://{self.host}:{self.port}")
+        if not self.token and self.host not in ('127.0.0.1', 'localhost'):
+            logger.warning("任务队列HTTP接口未配置queue.token，同一网络中的任何人都可以访问")
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+
+class JobQueueClient:
+    """通过HTTP访问协调进程的任务队列，方法与JobQueue相同"""
+
+    def __init__(self, base_url, timeout=30, token=None):
+        """
+        Args:
+            base_url: 协调进程HTTP接口地址
+            timeout: 请求超时时间(秒)
+            token: 共享令牌，None则使用queue.token
+        """
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.token = CONFIG['queue']['token'] if token is None else token
+
+    def _post(self, path, **params):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers[TOKEN_HEADER] = self.token
+        request = urllib.request.Request(
+            self.base_url + path,
+            data=json.dumps(params, ensure_ascii=False).encode('utf-8'),
+            headers=headers
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            return json.loads(response.read())['value']
+
+    def lease(self, worker, count=1, lease_seconds=None):
+        return self._post('/lease', worker=worker, count=count, lease_seconds=lease_seconds)
+
+    def heartbeat(self, worker, job_ids, lease_seconds=None):
+        return self._post('/heartbeat', worker=worker, job_ids=job_ids, lease_seconds=lease_seconds)
+
+    def complete(self, worker, job_id, result, alerts=None):
+        return self._post('/complete', worker=worker, job_id=job_id, result=result, alerts=alerts)
+
+    def fail(self, worker, job_id, error):
+        return self._post('/fail', worker=worker, job_id=job_id, error=error)
+
+
+def open_queue(spec):
+    """
+    按地址打开任务队列
+
+    Args:
+        spec: http(s)://开头为协调进程的HTTP接口，否则为SQLite文件路径
+
+    Returns:
+        JobQueue或JobQueueClient
+    """
+    if spec.startswith(('http://', 'https://')):
+        return JobQueueClient(spec)
+    return JobQueue(spec)
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分布式模式：协调进程和工作进程
+
+协调进程(JobCoordinator)把表格写入任务队列并等待结果，接口与TaskRunner相同，
+图形界面和命令行可以直接替换使用；工作进程(JobWorker)可以在任意机器上启动，
+不断租用任务、用自己的浏览器获取数据并提交结果。增加机器即可提高总吞吐量。
+"""
+
+import os
+import time
+import uuid
+import socket
+import logging
+import threading
+from utils.excel_handler import ExcelHandler
+from utils.fetch_backend import current_backend
+from core.task_runner import TaskRunner, FETCH_FIELDS, FAILED_VALUES, STATUS_FIELDS
+from core.fetch_outcome import FailureCategory
+from core.fetch_state import FetchState
+from core.result_buffer import ResultRecord, ResultBuffer
+from core.run_diff import RunDiff
+from core.run_planner import plan_rows, run_deadline
+from core.job_queue import JOB_DONE
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.job_runner')
+
+
+def failed_result(sequence):
+    """超过最大尝试次数的任务对应的结果"""
+    values = {field: FAILED_VALUES[kind] for field, _, kind in FETCH_FIELDS}
+    values.update({status_field: FailureCategory.UNKNOWN.value for status_field in STATUS_FIELDS.values()})
+    return ResultRecord(sequence, **values)
+
+
+class JobCoordinator:
+    """协调进程：把表格拆成任务写入队列，收集工作进程提交的结果"""
+
+    def __init__(self, job_queue, on_progress=None, on_result=None, on_alert=None):
+        """
+        Args:
+            job_queue: 任务队列(JobQueue)
+            on_progress: 进度回调，参数为进度百分比(int)
+            on_result: 结果回调，参数为单行结果(ResultRecord)
+            on_alert: 警告回调，参数为警告类型和单行结果
+        """
+        self.job_queue = job_queue
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.on_alert = on_alert
+        self.excel_handler = ExcelHandler()
+        self._stop_event = threading.Event()
+        self.changes = None  # 最近一轮的变化集(ChangeSet)
+
+    def stop(self):
+        """停止等待，本轮尚未完成的任务被取消"""
+        self._stop_event.set()
+
+    def run(self, file_path, budget=None):
+        """
+        执行一次完整的比较任务
+
+        Args:
+            file_path: Excel文件路径
+            budget: 时间预算(秒)，通常为任务重复间隔，到达截止时间后取消未完成的任务
+
+        Returns:
+            ResultBuffer: 每行比较结果，按行序号排序
+        """
+        self._stop_event.clear()
+        results = ResultBuffer()
+
+        data = self.excel_handler.read_excel(file_path)
+        if not data:
+            logger.error("无法读取Excel文件")
+            return results
+
+        diff = RunDiff(data)
+        deadline = run_deadline(budget)
+        run_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        # 工作进程按写入顺序租用任务，按优先级写入
+        total = self.job_queue.enqueue(run_id, plan_rows(list(enumerate(data, 1)), diff.snapshot))
+        logger.info(f"已写入任务队列: 本轮{run_id}，共{total}行，等待工作进程处理")
+
+        last_seq = 0
+        try:
+            while len(results) < total:
+                if self._stop_event.is_set():
+                    cancelled = self.job_queue.cancel(run_id)
+                    logger.info(f"任务已停止，取消{cancelled}个未完成的任务")
+                    break
+                if deadline is not None and time.time() >= deadline:
+                    cancelled = self.job_queue.cancel(run_id)
+                    logger.warning(f"已到本轮截止时间，取消{cancelled}个未完成的任务")
+                    break
+
+                self.job_queue.requeue_expired()
+                jobs = self.job_queue.finished(run_id, last_seq)
+                for job in jobs:
+                    last_seq = job['finish_seq']
+                    if job['status'] == JOB_DONE:
+                        result = ResultRecord.from_dict(job['result'])
+                        for alert_type in job['alerts']:
+                            if diff.observe_alert(job['item'], alert_type, result):
+                                self._emit(self.on_alert, alert_type, result)
+                    else:
+                        logger.error(f"第{job['sequence']}行任务失败: {job['error']}")
+                        result = failed_result(job['sequence'])
+                    diff.observe_result(job['item'], result)
+                    results.append(result)
+                    self._emit(self.on_result, result)
+                    self._emit(self.on_progress, int((len(results) / total) * 100))
+
+                if not jobs:
+                    self._stop_event.wait(CONFIG['queue']['poll_interval'])
+
+            logger.info("任务执行完成")
+            return results
+
+        except Exception as e:
+            logger.error(f"等待任务结果时出错: {str(e)}")
+            return results
+        finally:
+            self.changes = diff.finish()
+            results.sort()
+            self._purge(run_id)
+
+    def _purge(self, run_id):
+        """本轮结果已全部读取，删除队列中本轮的任务"""
+        try:
+            removed = self.job_queue.purge(run_id)
+            logger.debug(f"已从任务队列删除本轮{run_id}的{removed}个任务")
+        except Exception as e:
+            logger.error(f"清理任务队列时出错: {str(e)}")
+
+    def _emit(self, callback, *args):
+        """调用回调函数，回调中的异常不影响任务继续执行"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"执行回调时出错: {str(e)}")
+
+
+class JobWorker:
+    """无状态工作进程：租用任务、获取数据、提交结果"""
+
+    def __init__(self, job_queue, worker_id=None, batch_size=None, idle_exit=0):
+        """
+        Args:
+            job_queue: 任务队列(JobQueue或JobQueueClient)
+            worker_id: 工作进程ID，None则使用 主机名-进程号
+            batch_size: 每次租用的任务数，None则使用配置
+            idle_exit: 队列持续为空多少秒后退出，0表示一直运行
+        """
+        self.job_queue = job_queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.batch_size = batch_size or CONFIG['queue']['batch_size']
+        self.idle_exit = idle_exit
+
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._jobs = {}    # 行序号 → 当前批次中尚未提交的任务
+        self._alerts = {}  # 行序号 → 警告类型列表
+        self.runner = TaskRunner(on_result=self._on_result, on_alert=self._on_alert,
+                                 stop_event=self._stop_event)
+
+    def stop(self):
+        """当前行处理完成后退出，未完成的任务交还队列"""
+        self._stop_event.set()
+
+    def run(self):
+        """持续处理任务直到停止"""
+        logger.info(f"工作进程{self.worker_id}已启动")
+        self.runner.fetch_state = FetchState()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        idle_since = time.monotonic()
+
+        try:
+            while not self._stop_event.is_set():
+                try:
+                    jobs = self.job_queue.lease(self.worker_id, self.batch_size)
+                except Exception as e:
+                    logger.error(f"租用任务失败: {str(e)}")
+                    jobs = []
+
+                if not jobs:
+                    if self.idle_exit and time.monotonic() - idle_since >= self.idle_exit:
+                        logger.info(f"任务队列持续为空{self.idle_exit}秒，工作进程退出")
+                        break
+                    self._stop_event.wait(CONFIG['queue']['poll_interval'])
+                    continue
+
+                idle_since = time.monotonic()
+                with self._lock:
+                    self._jobs = {job['sequence']: job for job in jobs}
+                    self._alerts = {}
+                self.runner.run_rows([(job['sequence'], job['item']) for job in jobs], close_browser=False)
+                self._release_unfinished()
+                self.runner.fetch_state.save()
+        finally:
+            self._stop_event.set()
+            self._release_unfinished()
+            current_backend().close()
+            logger.info(f"工作进程{self.worker_id}已退出")
+
+    def _on_alert(self, alert_type, result):
+        with self._lock:
+            self._alerts.setdefault(result['sequence'], []).append(alert_type)
+
+    def _on_result(self, result):
+        with self._lock:
+            job = self._jobs.pop(result['sequence'], None)
+            alerts = self._alerts.pop(result['sequence'], [])
+        if job is not None:
+            self.job_queue.complete(self.worker_id, job['id'], result.to_dict(), alerts)
+
+    def _release_unfinished(self):
+        """停止或出错时把本批次未完成的任务交还队列，不必等待租约到期"""
+        with self._lock:
+            jobs = list(self._jobs.values())
+            self._jobs = {}
+        for job in jobs:
+            try:
+                self.job_queue.fail(self.worker_id, job['id'], "工作进程未完成该任务")
+            except Exception as e:
+                logger.error(f"交还任务{job['id']}失败: {str(e)}")
+
+    def _heartbeat_loop(self):
+        """处理期间定期续租"""
+        interval = CONFIG['queue']['lease_seconds'] / 3
+        while not self._stop_event.wait(interval):
+            with self._lock:
+                job_ids = [job['id'] for job in self._jobs.values()]
+            if not job_ids:
+                continue
+            try:
+                self.job_queue.heartbeat(self.worker_id, job_ids)
+            except Exception as e:
+                logger.error(f"任务续租失败: {str(e)}")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+分环节执行的流水线
+
+TaskRunner的各行依次经过：获取(打开页面并提取，占用浏览器，在调用run_rows的线程中执行)
+→ 比较(计算结果和警告) → 输出(结果、警告和进度回调)。环节之间用有界队列连接，
+每个环节有自己的工作线程数(pipeline配置)：弹窗、刷新表格、向任务队列提交结果等较慢的
+输出不再拖慢获取，下游处理不过来、队列满时上游才等待(背压)，内存占用有上限。
+
+各环节的队列深度、利用率(处理耗时占工作线程时间的比例)和上游因队列满而等待的时间
+记录在指标中，每轮结束时在日志中输出，利用率最高的环节即为瓶颈。
+"""
+
+import time
+import queue
+import logging
+import threading
+from contextlib import contextmanager
+from utils.metrics import metrics
+
+logger = logging.getLogger('taobao_price_checker.pipeline')
+
+# 工作线程退出标记
+_STOP = object()
+
+
+class StageStats:
+    """一个环节的处理数和处理耗时"""
+
+    __slots__ = ('name', 'workers', 'processed', 'busy', 'blocked', 'started', '_lock')
+
+    def __init__(self, name, workers=1):
+        self.name = name
+        self.workers = workers
+        self.processed = 0
+        self.busy = 0.0      # 处理耗时合计(秒)
+        self.blocked = 0.0   # 因下游队列满而等待的时间(秒)
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def add(self, busy):
+        with self._lock:
+            self.processed += 1
+            self.busy += busy
+        metrics.inc('pipeline_items_total', stage=self.name)
+        metrics.set_gauge('pipeline_stage_utilization', round(self.utilization(), 3), stage=self.name)
+
+    def add_blocked(self, seconds):
+        with self._lock:
+            self.blocked += seconds
+        metrics.inc('pipeline_blocked_seconds_total', seconds, stage=self.name)
+
+    def utilization(self):
+        """
+        Returns:
+            float: 处理耗时占全部工作线程时间的比例(0~1)
+        """
+        elapsed = (time.monotonic() - self.started) * self.workers
+        return min(1.0, self.busy / elapsed) if elapsed > 0 else 0.0
+
+
+class Stage:
+    """由有界输入队列和若干工作线程组成的环节"""
+
+    def __init__(self, name, handler, workers=1, capacity=0):
+        """
+        Args:
+            name: 环节名称，用作指标标签
+            handler: 处理函数，参数为上游传来的数据，返回值传给下一环节(None则不再传递)
+            workers: 工作线程数
+            capacity: 输入队列容量，0表示不限制
+        """
+        self.name = name
+        self.handler = handler
+        self.queue = queue.Queue(capacity)
+        self.stats = StageStats(name, max(1, workers))
+        self.downstream = None
+        self._threads = []
+
+    def start(self):
+        for index in range(self.stats.workers):
+            thread = threading.Thread(target=self._worker, name=f'{self.name}-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self):
+        """处理完队列中已有的数据后结束全部工作线程"""
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def _worker(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            metrics.set_gauge('pipeline_queue_depth', self.queue.qsize(), stage=self.name)
+            started = time.monotonic()
+            try:
+                output = self.handler(item)
+            except Exception as e:
+                metrics.inc('stage_errors_total', stage=self.name)
+                logger.error(f"流水线环节{self.name}处理出错: {str(e)}")
+                output = None
+            self.stats.add(time.monotonic() - started)
+            if output is not None and self.downstream is not None:
+                put(self.downstream, output, self.stats)
+
+
+def put(stage, item, upstream):
+    """
+    放入环节的输入队列，队列满时等待并把等待时间记在上游环节上
+
+    Args:
+        stage: 目标环节
+        item: 数据
+        upstream: 上游环节的StageStats
+    """
+    try:
+        stage.queue.put_nowait(item)
+    except queue.Full:
+        started = time.monotonic()
+        stage.queue.put(item)
+        upstream.add_blocked(time.monotonic() - started)
+    metrics.set_gauge('pipeline_queue_depth', stage.queue.qsize(), stage=stage.name)
+
+
+class Pipeline:
+    """
+    流水线：调用方线程中的源环节(source)加上依次连接的后续环节
+
+    用法：
+        pipeline = Pipeline('fetch')
+        pipeline.add_stage('compare', compare, workers=1, capacity=50)
+        pipeline.add_stage('sink', emit, workers=1, capacity=50)
+        pipeline.start()
+        for row in rows:
+            with pipeline.working():
+                fetch(row)
+            pipeline.submit(row)
+        pipeline.close()
+    """
+
+    def __init__(self, source='source'):
+        """
+        Args:
+            source: 调用方线程所在环节的名称
+        """
+        self.source = StageStats(source)
+        self.stages = []
+
+    def add_stage(self, name, handler, workers=1, capacity=0):
+        """在末尾添加一个环节，返回该环节"""
+        stage = Stage(name, handler, workers, capacity)
+        if self.stages:
+            self.stages[-1].downstream = stage
+        self.stages.append(stage)
+        return stage
+
+    def start(self):
+        self.source.started = time.monotonic()
+        for stage in self.stages:
+            stage.stats.started = self.source.started
+            stage.start()
+
+    @contextmanager
+    def working(self):
+        """记录源环节的一次处理耗时"""
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self.source.add(time.monotonic() - started)
+
+    def submit(self, item):
+        """源环节的数据传给第一个环节，队列满时等待(背压)"""
+        put(self.stages[0], item, self.source)
+
+    def close(self):
+        """按顺序等待各环节处理完全部数据后停止"""
+        for stage in self.stages:
+            stage.stop()
+            metrics.set_gauge('pipeline_queue_depth', 0, stage=stage.name)
+
+    def all_stats(self):
+        return [self.source] + [stage.stats for stage in self.stages]
+
+    def summary(self):
+        """
+        Returns:
+            str: 各环节的处理数、利用率和等待时间，标出利用率最高的环节
+        """
+        stats = self.all_stats()
+        slowest = max(stats, key=lambda item: item.utilization())
+        parts = [f"{item.name}(线程{item.workers}) 处理{item.processed} 利用率{item.utilization():.0%} "
+                 f"等待下游{item.blocked:.1f}s" for item in stats]
+        return f"流水线各环节: {'; '.join(parts)}；最慢环节: {slowest.name}"
@@ -3,9 +3,13 @@
 
 import logging
 import re
-from bs4 import BeautifulSoup
-from utils.browser_handler import browser
-from config import CONFIG, get_price_xpath
+from utils.fetch_backend import current_backend
+from utils.metrics import metrics
+from core.retry_policy import RetryPolicy, call_with_retry
+from core.api_parser import find_price
+from core.fetch_outcome import (FetchOutcome, FailureCategory, classify_navigation_error,
+                                check_blocked_page, classify_missing_element)
+from config import CONFIG, get_price_xpath, get_panel_selector
 
 logger = logging.getLogger('taobao_price_checker.price_fetcher')
 
@@ -13,8 +17,7 @@ class PriceFetcher:
     """价格获取类"""
     
     def __init__(self):
-        self.retry_times = CONFIG['task']['retry_times']
-        self.retry_delay = CONFIG['task']['retry_delay']
+        self.retry_policy = RetryPolicy()
     
     def get_price(self, url):
         """
@@ -26,33 +29,77 @@ class PriceFetcher:
         Returns:
             float: 商品价格，如果获取失败返回0.0
         """
+        return self.fetch_price(url).value
+    
+    def fetch_price(self, url):
+        """
+        从淘宝页面获取价格，失败时给出失败分类
+        
+        Args:
+            url: 商品页面URL
+            
+        Returns:
+            FetchOutcome: 获取结果，失败时value为0.0
+        """
         try:
             # 打开页面
-            if not browser.get_page(url):
+            backend = current_backend()
+            if not backend.navigate(url):
                 logger.error(f"无法打开页面: {url}")
-                return 0.0
+                return FetchOutcome.failure(classify_navigation_error(backend.last_error), 0.0, "无法打开页面")
+            
+            # 登录页、验证页、下架页不必等待元素超时
+            category = check_blocked_page(backend)
+            if category:
+                logger.error(f"页面被拦截或商品不存在({category.value}): {url}")
+                return FetchOutcome.failure(category, 0.0, "页面被拦截或商品不存在")
+            
+            # 优先从商品详情接口数据中读取(extract.mode为network时)
+            payload = backend.api_payload(url)
+            if payload is not None:
+                price = find_price(payload)
+                if price:
+                    metrics.inc('extract_source_total', source='network')
+                    return FetchOutcome.success(price)
             
             # 获取价格面板ID
             panel_id = self._get_panel_id()
             if not panel_id:
                 logger.error("无法获取价格面板ID")
-                return 0.0
+                return FetchOutcome.failure(classify_missing_element(backend), 0.0, "无法获取价格面板ID")
             
             # 使用XPath获取价格
             xpath = get_price_xpath(panel_id)
-            price_element = browser.find_element_by_xpath(xpath)
+            price_element = backend.wait_for('xpath', xpath)
             
             if price_element is None:
                 logger.error("无法找到价格元素")
-                return 0.0
+                return FetchOutcome.failure(classify_missing_element(backend), 0.0, "无法找到价格元素")
             
             # 获取价格文本并处理
-            price_text = browser.get_element_text(price_element)
-            return self._parse_price(price_text)
+            with metrics.span('extract'):
+                price_text = backend.element_text(price_element)
+                price = self._parse_price(price_text)
+            if not price:
+                return FetchOutcome.failure(FailureCategory.SELECTOR_DRIFT, 0.0, "价格文本无法解析")
+            metrics.inc('extract_source_total', source='dom')
+            return FetchOutcome.success(price)
             
         except Exception as e:
             logger.error(f"获取价格时出错: {str(e)}")
-            return 0.0
+            return FetchOutcome.failure(FailureCategory.UNKNOWN, 0.0, str(e))
+    
+    def get_price_with_retry(self, url):
+        """
+        带重试机制的价格获取(指数退避加随机抖动，同步等待)
+        
+        Args:
+            url: 商品页面URL
+            
+        Returns:
+            float: 商品价格，如果所有重试都失败则返回0.0
+        """
+        return call_with_retry(self.fetch_price, url, self.retry_policy, "获取价格") or 0.0
     
     def _get_panel_id(self):
         """
@@ -63,19 +110,22 @@ class PriceFetcher:
         """
         try:
             # 查找具有特定class的元素
-            panel_class = CONFIG['price']['panel_class']
-            panel = browser.find_element_by_class(panel_class.replace('class=', '').strip('"'))
+            backend = current_backend()
+            selector = get_panel_selector()
+            panel = backend.wait_for('css selector', selector)
             
             if panel:
                 # 从元素的id属性中提取ID
-                panel_id = panel.get_attribute('id')
+                panel_id = backend.element_attribute(panel, 'id')
                 if panel_id:
                     return panel_id
             
-            # 如果上面的方法失败，尝试从页面源码中提取
-            page_source = browser.driver.page_source
-            soup = BeautifulSoup(page_source, 'html.parser')
-            panel = soup.find('div', {'class': panel_class.replace('class=', '').strip('"')})
+            # 如果上面的方法失败，尝试从页面源码中提取(bs4只在此备用路径中导入)
+            from bs4 import BeautifulSoup
+            with metrics.span('parse'):
+                page_source = backend.page_source
+                soup = BeautifulSoup(page_source, 'html.parser')
+                panel = soup.select_one(selector)
             
             if panel and 'id' in panel.attrs:
                 return panel['id']
@@ -0,0 +1,234 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+多进程任务执行
+
+单个进程中解析页面、比较数据和驱动调度都受GIL限制。多进程模式把表格的行
+按轮流方式分成N个分片，每个工作进程用自己的浏览器处理一个分片，结果、警告
+和日志通过进程间队列实时传回主进程，主进程的回调与TaskRunner相同。
+
+工作进程使用spawn方式启动(与PyQt、Chrome驱动共存更安全)，启动时复制主进程的CONFIG。
+"""
+
+import os
+import copy
+import queue
+import signal
+import logging
+import multiprocessing
+from utils.excel_handler import ExcelHandler
+from utils.metrics import metrics
+from utils.log_setup import setup_worker_logging, start_worker_log_listener
+from core.task_runner import TaskRunner, STATUS_FIELDS
+from core.fetch_state import FetchState
+from core.result_buffer import ResultBuffer
+from core.run_diff import RunDiff
+from core.run_planner import plan_rows, run_deadline
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.process_runner')
+
+# 队列消息类型
+MSG_RESULT = 'result'
+MSG_ALERT = 'alert'
+MSG_DONE = 'done'
+
+# 任务结束后等待工作进程退出的时间(秒)
+JOIN_TIMEOUT = 30
+
+
+def shard_rows(rows, count):
+    """
+    按行轮流分配到count个分片，各分片的行数尽量均匀
+
+    Args:
+        rows: (行序号, 单行数据)列表
+        count: 分片数
+
+    Returns:
+        list: 非空分片列表
+    """
+    return [rows[index::count] for index in range(count) if rows[index::count]]
+
+
+def _worker_main(worker_id, rows, config, message_queue, log_queue, stop_event, initializer, deadline=None):
+    """工作进程入口：处理一个分片，结果逐行放入队列，最后回传状态和指标"""
+    # Ctrl+C由主进程处理，通过stop_event通知工作进程停止
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    CONFIG.update(config)
+    setup_worker_logging(log_queue)
+    if initializer is not None:
+        initializer()
+
+    runner = TaskRunner(
+        on_result=lambda result: message_queue.put((MSG_RESULT, worker_id, result)),
+        on_alert=lambda alert_type, result: message_queue.put((MSG_ALERT, worker_id, alert_type, result)),
+        stop_event=stop_event
+    )
+    runner.fetch_state = FetchState()
+    error = None
+    try:
+        runner.run_rows(rows, deadline=deadline)
+    except Exception as e:
+        error = str(e)
+
+    urls = [item[link_field] for _, item in rows for link_field in STATUS_FIELDS]
+    message_queue.put((MSG_DONE, worker_id, {
+        'state': runner.fetch_state.export(urls),
+        'metrics': metrics.snapshot(),
+        'error': error
+    }))
+
+
+class ProcessTaskRunner:
+    """多进程任务执行类，接口与TaskRunner相同"""
+
+    def __init__(self, on_progress=None, on_result=None, on_alert=None, processes=None, initializer=None):
+        """
+        Args:
+            on_progress: 进度回调，参数为进度百分比(int)
+            on_result: 结果回调，参数为单行结果(ResultRecord)
+            on_alert: 警告回调，参数为警告类型和单行结果
+            processes: 工作进程数，None则使用配置，0表示CPU核数
+            initializer: 工作进程启动后调用的函数(需可pickle)，例如替换浏览器驱动
+        """
+        self.on_progress = on_progress
+        self.on_result = on_result
+        self.on_alert = on_alert
+        if processes is None:
+            processes = CONFIG['task']['processes']
+        self.processes = processes or os.cpu_count() or 1
+        self.initializer = initializer
+
+        self.excel_handler = ExcelHandler()
+        self._context = multiprocessing.get_context('spawn')
+        self._stop_event = self._context.Event()
+        self.changes = None  # 最近一轮的变化集(ChangeSet)
+
+    def stop(self):
+        """请求停止当前任务，各工作进程在当前行处理完成后退出"""
+        self._stop_event.set()
+
+    def run(self, file_path, budget=None):
+        """
+        执行一次完整的比较任务
+
+        Args:
+            file_path: Excel文件路径
+            budget: 时间预算(秒)，通常为任务重复间隔，None表示不限制
+
+        Returns:
+            ResultBuffer: 每行比较结果，按行序号排序
+        """
+        self._stop_event.clear()
+        metrics.start_run()
+        results = ResultBuffer()
+
+        data = self.excel_handler.read_excel(file_path)
+        if not data:
+            logger.error("无法读取Excel文件")
+            return results
+
+        rows = list(enumerate(data, 1))
+        items = dict(rows)
+        # 警告由工作进程全部发回，在主进程中与上一轮结果比较
+        diff = RunDiff(data)
+        # 按优先级排序后再轮流分片，每个分片内同样是重要的行在前
+        shards = shard_rows(plan_rows(rows, diff.snapshot), min(self.processes, len(rows)))
+        deadline = run_deadline(budget)
+        message_queue = self._context.Queue()
+        log_queue = self._context.Queue()
+        listener = start_worker_log_listener(log_queue)
+        fetch_state = FetchState()
+        config = copy.deepcopy(CONFIG)
+        workers = []
+
+        try:
+            for worker_id, shard in enumerate(shards):
+                worker = self._context.Process(
+                    target=_worker_main,
+                    args=(worker_id, shard, config, message_queue, log_queue,
+                          self._stop_event, self.initializer, deadline),
+                    name=f'price-worker-{worker_id}',
+                    daemon=True
+                )
+                worker.start()
+                workers.append(worker)
+            logger.info(f"已启动{len(workers)}个工作进程，共{len(rows)}行")
+
+            running = set(range(len(workers)))
+            while running:
+                try:
+                    message = message_queue.get(timeout=1.0)
+                except queue.Empty:
+                    for worker_id in list(running):
+                        if not workers[worker_id].is_alive():
+                            running.discard(worker_id)
+                            logger.error(f"工作进程{worker_id}异常退出，退出码: {workers[worker_id].exitcode}")
+                    continue
+
+                kind, worker_id = message[0], message[1]
+                if kind == MSG_RESULT:
+                    results.append(message[2])
+                    diff.observe_result(items[message[2]['sequence']], message[2])
+                    self._emit(self.on_result, message[2])
+                    self._emit(self.on_progress, int((len(results) / len(rows)) * 100))
+                elif kind == MSG_ALERT:
+                    if diff.observe_alert(items[message[3]['sequence']], message[2], message[3]):
+                        self._emit(self.on_alert, message[2], message[3])
+                    else:
+                        metrics.inc('alerts_suppressed_total', type=message[2])
+                elif kind == MSG_DONE:
+                    running.discard(worker_id)
+                    payload = message[2]
+                    fetch_state.merge(payload['state'])
+                    metrics.merge(payload['metrics'])
+                    if payload['error']:
+                        logger.error(f"工作进程{worker_id}执行出错: {payload['error']}")
+
+            logger.info("任务执行完成")
+            return results
+
+        except Exception as e:
+            logger.error(f"执行多进程任务时出错: {str(e)}")
+            self._stop_event.set()
+            return results
+        finally:
+            for worker in workers:
+                worker.join(JOIN_TIMEOUT)
+                if worker.is_alive():
+                    logger.warning(f"工作进程{worker.name}未能按时退出，强制结束")
+                    worker.terminate()
+            listener.stop()
+            fetch_state.save()
+            self.changes = diff.finish()
+            results.sort()
+            logger.info(metrics.summary())
+
+    def _emit(self, callback, *args):
+        """调用回调函数，回调中的异常不影响任务继续执行"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"执行回调时出错: {str(e)}")
+
+
+def create_runner(on_progress=None, on_result=None, on_alert=None, processes=None):
+    """
+    按进程数创建任务执行器
+
+    Args:
+        processes: 工作进程数，None则使用配置；1为单进程TaskRunner，0表示CPU核数
+
+    Returns:
+        TaskRunner或ProcessTaskRunner
+    """
+    if processes is None:
+        processes = CONFIG['task']['processes']
+    if processes == 1:
+        return TaskRunner(on_progress=on_progress, on_result=on_result, on_alert=on_alert)
+    return ProcessTaskRunner(on_progress=on_progress, on_result=on_result, on_alert=on_alert,
+                             processes=processes)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+对归档的页面重新提取价格和SKU
+
+修改config.py中的选择器后，用PriceFetcher/SkuFetcher原有的提取逻辑重新解析归档的页面
+(见utils/page_archive.py)，获取后端换成从归档读取页面的HttpBackend，不联网也不启动Chrome。
+页面分批交给多个工作进程解析，几千个页面在数秒内完成，可以先验证选择器修改，
+再用新提取的值补全选择器失效期间的结果。
+"""
+
+import os
+import logging
+import multiprocessing
+from utils.page_archive import PageArchive
+from utils.metrics import metrics
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.reextractor')
+
+# 重新提取结果的比较
+VERDICT_SAME = 'same'            # 与归档时提取的值相同
+VERDICT_FIXED = 'fixed'          # 归档时提取失败，现在提取成功
+VERDICT_CHANGED = 'changed'      # 两次都成功但值不同
+VERDICT_BROKEN = 'broken'        # 归档时成功，现在提取失败
+VERDICT_FAILED = 'failed'        # 两次都失败
+
+FIELD_KINDS = ('price', 'sku')
+
+# 选择器失效时这些模块对每个页面都会记录错误，重新提取时只看汇总结果
+QUIET_LOGGERS = ('taobao_price_checker.price_fetcher', 'taobao_price_checker.sku_fetcher',
+                 'taobao_price_checker.fetch_backend')
+
+# 工作进程中的归档和当前页面(URL -> 页面摘要)，由_init_worker设置
+_archive = None
+_pages = {}
+
+
+def _verdict(old, new):
+    """
+    Args:
+        old: 归档时的(值, 状态)，没有记录时为None
+        new: 重新提取的(值, 状态)
+    """
+    old_ok = old is not None and old[1] == 'ok'
+    new_ok = new[1] == 'ok'
+    if old_ok and new_ok:
+        return VERDICT_SAME if old[0] == new[0] else VERDICT_CHANGED
+    if new_ok:
+        return VERDICT_FIXED
+    return VERDICT_BROKEN if old_ok else VERDICT_FAILED
+
+
+def _init_worker(config, root):
+    """工作进程初始化：复制配置，获取后端换成从归档读取页面的静态后端"""
+    CONFIG.update(config)
+    # 归档中只有页面HTML，没有接口数据
+    CONFIG['extract']['mode'] = 'dom'
+    # 归档的页面已经完整，找不到元素时不必等待
+    CONFIG['browser']['timeout'] = 0
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.CRITICAL)
+
+    from utils.fetch_backend import HttpBackend, use_backend
+    global _archive
+    _archive = PageArchive(root)
+    use_backend(HttpBackend(page_loader=lambda url: _archive.get(_pages[url])))
+
+
+def _extract_chunk(chunk):
+    """
+    重新提取一批页面
+
+    Args:
+        chunk: (URL, 页面摘要)列表
+
+    Returns:
+        list: (URL, {获取类型: (值, 状态)})列表
+    """
+    from core.price_fetcher import PriceFetcher
+    from core.sku_fetcher import SkuFetcher
+    price_fetcher = PriceFetcher()
+    sku_fetcher = SkuFetcher()
+
+    extracted = []
+    for url, digest in chunk:
+        _pages[url] = digest
+        price = price_fetcher.fetch_price(url)
+        sku = sku_fetcher.fetch_sku(url)
+        del _pages[url]
+        extracted.append((url, {'price': (price.value, price.category.value),
+                                'sku': (sku.value, sku.category.value)}))
+    return extracted
+
+
+def reextract(archive=None, since=None, processes=None, chunk_size=None):
+    """
+    对每个链接最近归档的页面重新提取价格和SKU
+
+    只有一个工作进程时在当前进程中解析，当前进程的获取后端和配置会被替换，只应在命令行中这样调用。
+
+    Args:
+        archive: PageArchive，None则使用默认归档目录
+        since: 只处理该时间(YYYY-mm-dd HH:MM:SS)之后归档的页面，None则全部处理
+        processes: 工作进程数，None或0为CPU核数
+        chunk_size: 每次分给工作进程的页面数，None则按页面数和进程数计算(最多50)
+
+    Returns:
+        list: 每个页面一条记录，包含url、digest、time，以及price/sku的
+              old、new(值)、status(新状态)和verdict
+    """
+    archive = archive or PageArchive()
+    pages = archive.latest_pages(since)
+    if not pages:
+        logger.info("没有归档的页面")
+        return []
+
+    items = [(url, page['digest']) for url, page in pages.items()]
+    processes = processes or os.cpu_count() or 1
+    if chunk_size is None:
+        chunk_size = max(1, min(50, len(items) // (processes * 4)))
+    chunks = [items[index:index + chunk_size] for index in range(0, len(items), chunk_size)]
+    processes = min(processes, len(chunks))
+    logger.info(f"重新提取{len(items)}个归档页面(工作进程{processes}个)")
+
+    with metrics.span('reextract'):
+        if processes <= 1:
+            _init_worker(CONFIG, archive.root)
+            extracted = [entry for chunk in chunks for entry in _extract_chunk(chunk)]
+        else:
+            context = multiprocessing.get_context('spawn')
+            with context.Pool(processes, initializer=_init_worker, initargs=(CONFIG, archive.root)) as pool:
+                extracted = [entry for batch in pool.imap_unordered(_extract_chunk, chunks) for entry in batch]
+
+    records = []
+    for url, values in extracted:
+        page = pages[url]
+        record = {'url': url, 'digest': page['digest'], 'time': page['time']}
+        for kind in FIELD_KINDS:
+            old = page['values'].get(kind)
+            new = values[kind]
+            record[kind] = {'old': old[0] if old else None, 'new': new[0], 'status': new[1],
+                            'verdict': _verdict(old, new)}
+        records.append(record)
+    records.sort(key=lambda record: record['url'])
+    return records
+
+
+def summarize(records):
+    """
+    Returns:
+        dict: 获取类型 -> {比较结果: 页面数}
+    """
+    summary = {kind: {} for kind in FIELD_KINDS}
+    for record in records:
+        for kind in FIELD_KINDS:
+            verdict = record[kind]['verdict']
+            summary[kind][verdict] = summary[kind].get(verdict, 0) + 1
+    return summary
+
+
+def backfill(data, records):
+    """
+    用重新提取的值生成表格各行的结果
+
+    Args:
+        data: Excel中读取的各行数据
+        records: reextract的返回值
+
+    Returns:
+        ResultBuffer: 每行结果，链接没有归档页面或重新提取失败时状态为失败分类(没有归档时为unknown)
+    """
+    from core.result_buffer import ResultRecord, ResultBuffer
+    by_url = {record['url']: record for record in records}
+    results = ResultBuffer()
+    for sequence, item in enumerate(data, 1):
+        values = {}
+        for side, link_field in (('a', 'link_a'), ('b', 'link_b')):
+            record = by_url.get(item.get(link_field))
+            if record is None:
+                values.update({f'{side}_price': 0.0, f'{side}_sku': "", f'{side}_status': 'unknown'})
+                continue
+            failed = [record[kind]['status'] for kind in FIELD_KINDS if record[kind]['status'] != 'ok']
+            values.update({f'{side}_price': record['price']['new'], f'{side}_sku': record['sku']['new'],
+                           f'{side}_status': failed[0] if failed else 'ok'})
+        results.append(ResultRecord(sequence, **values))
+    return results
@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+比较结果的紧凑存储
+
+ResultRecord是单行结果，只有固定的几个字段(__slots__)，可以像字典一样按字段名读取，
+回调和已有的按result['a_price']读取的代码不需要修改。
+
+ResultBuffer按列保存一轮任务的全部结果：序号和价格存放在array中，价格换算为
+按配置精度的整数(精度为2时单位为分)，SKU和状态字符串去重后只保存编号。
+10万行时比每行一个字典占用的内存少数倍；导出直接读取列，不必逐行生成字典。
+"""
+
+from array import array
+from collections.abc import Mapping
+from decimal import Decimal, ROUND_HALF_UP
+from config import CONFIG
+
+# 结果字段，顺序即导出时的列顺序
+RESULT_FIELDS = ('sequence', 'a_price', 'a_sku', 'b_price', 'b_sku', 'a_status', 'b_status')
+
+PRICE_FIELDS = ('a_price', 'b_price')
+STRING_FIELDS = ('a_sku', 'b_sku', 'a_status', 'b_status')
+
+
+def price_scale():
+    """价格换算为整数时的倍数，由compare.price_precision决定"""
+    return 10 ** CONFIG['compare']['price_precision']
+
+
+def price_to_units(price, scale=None):
+    """
+    把价格换算为整数(精度为2时单位为分)，舍入方式与DataComparator一致
+
+    Args:
+        price: 价格
+        scale: 倍数，None则按配置计算
+
+    Returns:
+        int: 整数价格，无法转换时为0
+    """
+    scale = price_scale() if scale is None else scale
+    try:
+        value = Decimal(str(price)) * scale
+    except Exception:
+        return 0
+    return int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+class ResultRecord(Mapping):
+    """单行比较结果"""
+
+    __slots__ = RESULT_FIELDS
+
+    def __init__(self, sequence, a_price=0.0, a_sku="", b_price=0.0, b_sku="",
+                 a_status='ok', b_status='ok'):
+        self.sequence = sequence
+        self.a_price = a_price
+        self.a_sku = a_sku
+        self.b_price = b_price
+        self.b_sku = b_sku
+        self.a_status = a_status
+        self.b_status = b_status
+
+    @classmethod
+    def from_dict(cls, data):
+        """由结果字典(例如任务队列中JSON格式的结果)创建"""
+        return cls(**{field: data[field] for field in RESULT_FIELDS if field in data})
+
+    def to_dict(self):
+        """转换为字典，用于JSON序列化"""
+        return {field: getattr(self, field) for field in RESULT_FIELDS}
+
+    def __getitem__(self, key):
+        if key not in RESULT_FIELDS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self):
+        return iter(RESULT_FIELDS)
+
+    def __len__(self):
+        return len(RESULT_FIELDS)
+
+    def __getstate__(self):
+        return tuple(getattr(self, field) for field in RESULT_FIELDS)
+
+    def __setstate__(self, state):
+        for field, value in zip(RESULT_FIELDS, state):
+            setattr(self, field, value)
+
+    def __repr__(self):
+        return f"ResultRecord({self.to_dict()!r})"
+
+
+class ResultBuffer:
+    """
+    按列保存的结果，只追加
+
+    按下标或迭代读取时临时生成ResultRecord；导出使用columns()直接读取底层的列。
+    """
+
+    def __init__(self, records=()):
+        self.scale = price_scale()
+        self.sequences = array('q')
+        self.prices = {field: array('q') for field in PRICE_FIELDS}
+        self.strings = {field: array('I') for field in STRING_FIELDS}
+        self._string_table = []
+        self._string_ids = {}
+        for record in records:
+            self.append(record)
+
+    def _intern(self, text):
+        text = "" if text is None else str(text)
+        string_id = self._string_ids.get(text)
+        if string_id is None:
+            string_id = self._string_ids[text] = len(self._string_table)
+            self._string_table.append(text)
+        return string_id
+
+    def append(self, record):
+        """
+        追加一行结果
+
+        Args:
+            record: ResultRecord或结果字典
+        """
+        self.sequences.append(record['sequence'])
+        for field in PRICE_FIELDS:
+            self.prices[field].append(price_to_units(record[field], self.scale))
+        for field in STRING_FIELDS:
+            self.strings[field].append(self._intern(record.get(field, 'ok' if 'status' in field else "")))
+
+    def extend(self, records):
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self.sequences)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        table = self._string_table
+        return ResultRecord(
+            self.sequences[index],
+            a_price=self.prices['a_price'][index] / self.scale,
+            a_sku=table[self.strings['a_sku'][index]],
+            b_price=self.prices['b_price'][index] / self.scale,
+            b_sku=table[self.strings['b_sku'][index]],
+            a_status=table[self.strings['a_status'][index]],
+            b_status=table[self.strings['b_status'][index]]
+        )
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def sort(self):
+        """按行序号排序(多标签页、多进程时结果按完成顺序追加)"""
+        order = sorted(range(len(self)), key=self.sequences.__getitem__)
+        if all(position == index for index, position in enumerate(order)):
+            return
+        self.sequences = array('q', (self.sequences[i] for i in order))
+        for columns in (self.prices, self.strings):
+            for field, column in columns.items():
+                columns[field] = array(column.typecode, (column[i] for i in order))
+
+    def columns(self):
+        """
+        按列导出，用于生成DataFrame
+
+        安装了numpy时序号和价格列直接引用底层array(价格列按精度换算一次)，
+        字符串列按编号从字符串表中取出。
+
+        Returns:
+            dict: 字段名 -> 列数据，顺序与RESULT_FIELDS一致
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            np = None
+        if not len(self):
+            np = None
+
+        table = self._string_table
+        data = {}
+        for field in RESULT_FIELDS:
+            if field == 'sequence':
+                data[field] = np.frombuffer(self.sequences, dtype=np.int64) if np else list(self.sequences)
+            elif field in PRICE_FIELDS:
+                column = self.prices[field]
+                if np:
+                    data[field] = np.frombuffer(column, dtype=np.int64) / self.scale
+                else:
+                    data[field] = [units / self.scale for units in column]
+            else:
+                data[field] = [table[string_id] for string_id in self.strings[field]]
+        return data
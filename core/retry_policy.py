@@ -0,0 +1,247 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+价格和SKU获取共用的重试策略：指数退避加随机抖动、每轮任务的重试预算，
+以及按域名统计错误率的熔断器。
+
+TaskRunner不在工作线程中等待退避时间，而是把失败的行推迟到可重试时间后
+再处理，期间继续处理其他行；熔断器打开的域名同样推迟，降低对被限流站点的压力。
+"""
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from urllib.parse import urlparse
+from utils.metrics import metrics
+from core.fetch_outcome import RetryPolicyType
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.retry_policy')
+
+# 熔断器状态
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+class RetryPolicy:
+    """指数退避加全抖动(full jitter)的重试策略"""
+
+    def __init__(self, max_attempts=None, base_delay=None, max_delay=None, multiplier=None):
+        settings = CONFIG['retry']
+        self.max_attempts = CONFIG['task']['retry_times'] if max_attempts is None else max_attempts
+        self.base_delay = CONFIG['task']['retry_delay'] if base_delay is None else base_delay
+        self.max_delay = settings['max_delay'] if max_delay is None else max_delay
+        self.multiplier = settings['multiplier'] if multiplier is None else multiplier
+
+    def should_retry(self, attempts):
+        """
+        Args:
+            attempts: 已经尝试的次数
+
+        Returns:
+            bool: 是否还可以重试
+        """
+        return attempts < self.max_attempts
+
+    def next_delay(self, attempts):
+        """
+        计算第attempts次失败后的等待时间
+
+        Returns:
+            float: 等待秒数，在[0, min(max_delay, base_delay * multiplier^(attempts-1))]中随机
+        """
+        ceiling = min(self.max_delay, self.base_delay * self.multiplier ** max(attempts - 1, 0))
+        return random.uniform(0, ceiling)
+
+
+class RetryBudget:
+    """每轮任务的重试预算，避免大面积失败时重试把整轮时间拖长数倍"""
+
+    def __init__(self, total):
+        self.total = total
+        self.used = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def for_pages(cls, page_count):
+        """按本轮页面数和配置比例创建预算"""
+        settings = CONFIG['retry']
+        return cls(max(settings['min_budget'], int(page_count * settings['budget_ratio'])))
+
+    def try_acquire(self):
+        """
+        Returns:
+            bool: 预算未用完时占用一次并返回True
+        """
+        with self._lock:
+            if self.used >= self.total:
+                metrics.inc('retry_budget_exhausted_total')
+                return False
+            self.used += 1
+            return True
+
+
+class CircuitBreaker:
+    """单个域名的熔断器，按最近window次请求的失败比例判断是否熔断"""
+
+    def __init__(self, host, window=None, min_requests=None, failure_ratio=None,
+                 cooldown=None, max_cooldown=None, max_open=None):
+        settings = CONFIG['retry']['circuit_breaker']
+        self.host = host
+        self.window = settings['window'] if window is None else window
+        self.min_requests = settings['min_requests'] if min_requests is None else min_requests
+        self.failure_ratio = settings['failure_ratio'] if failure_ratio is None else failure_ratio
+        self.base_cooldown = settings['cooldown'] if cooldown is None else cooldown
+        self.max_cooldown = settings['max_cooldown'] if max_cooldown is None else max_cooldown
+        self.max_open = settings['max_open'] if max_open is None else max_open
+        self.opened_at = None  # 本次熔断开始的时间(time.monotonic)，恢复后清空
+
+        self.state = STATE_CLOSED
+        self.open_until = 0.0
+        self.cooldown = self.base_cooldown
+        self._outcomes = deque(maxlen=self.window)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """
+        Returns:
+            bool: 当前是否允许向该域名发起请求；熔断冷却结束后只放行一个探测请求
+        """
+        with self._lock:
+            if self.state == STATE_CLOSED:
+                return True
+            if self.state == STATE_OPEN and time.monotonic() >= self.open_until:
+                self.state = STATE_HALF_OPEN
+                self._probe_in_flight = False
+            if self.state == STATE_HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                return True
+            return False
+
+    def gave_up(self):
+        """
+        Returns:
+            bool: 熔断(含探测失败后再次熔断)已持续超过max_open秒，等待的行不应再推迟
+        """
+        with self._lock:
+            return (self.state != STATE_CLOSED and self.opened_at is not None and bool(self.max_open)
+                    and time.monotonic() - self.opened_at >= self.max_open)
+
+    def retry_at(self):
+        """熔断时下次可以尝试的时间(time.monotonic)，不晚于熔断持续max_open秒的时间"""
+        with self._lock:
+            if self.state == STATE_OPEN:
+                if self.max_open and self.opened_at is not None:
+                    return min(self.open_until, self.opened_at + self.max_open)
+                return self.open_until
+            # 半开状态下探测请求尚未返回，稍后再看
+            return time.monotonic() + 1.0
+
+    def record(self, success):
+        """记录一次请求结果"""
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+                if success:
+                    self._close()
+                else:
+                    # 探测失败，冷却时间加倍
+                    self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+                    self._open()
+                return
+
+            self._outcomes.append(bool(success))
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_requests
+                    and failures / len(self._outcomes) >= self.failure_ratio):
+                self._open()
+
+    def _open(self):
+        self.state = STATE_OPEN
+        if self.opened_at is None:
+            self.opened_at = time.monotonic()
+        self.open_until = time.monotonic() + self.cooldown
+        self._outcomes.clear()
+        metrics.inc('circuit_open_total', host=self.host)
+        metrics.set_gauge('circuit_open', 1, host=self.host)
+        logger.warning(f"域名{self.host}错误率过高，暂停请求{self.cooldown:.0f}秒")
+
+    def _close(self):
+        self.state = STATE_CLOSED
+        self.opened_at = None
+        self.cooldown = self.base_cooldown
+        self._outcomes.clear()
+        metrics.set_gauge('circuit_open', 0, host=self.host)
+        logger.info(f"域名{self.host}已恢复请求")
+
+
+class CircuitBreakerRegistry:
+    """按域名管理熔断器"""
+
+    def __init__(self):
+        self._breakers = {}
+        self._lock = threading.Lock()
+
+    def for_url(self, url):
+        host = urlparse(url).hostname or ''
+        with self._lock:
+            breaker = self._breakers.get(host)
+            if breaker is None:
+                breaker = self._breakers[host] = CircuitBreaker(host)
+            return breaker
+
+
+# 全局实例，各获取类和TaskRunner共用
+breakers = CircuitBreakerRegistry()
+
+
+def call_with_retry(fetch, url, policy=None, description="获取数据"):
+    """
+    同步调用fetch(url)，失败时按策略退避重试(会阻塞当前线程)
+
+    供单独调用获取类时使用；TaskRunner使用不阻塞的推迟重试。
+
+    Args:
+        fetch: 获取函数，返回FetchOutcome
+        url: 商品页面URL
+        policy: 重试策略，None则使用默认配置
+        description: 日志中的操作描述
+
+    Returns:
+        获取到的值，所有重试都失败时返回最后一次的结果
+    """
+    policy = policy or RetryPolicy()
+    breaker = breakers.for_url(url)
+    outcome = None
+    attempts = 0
+    while True:
+        while not breaker.allow():
+            if breaker.gave_up():
+                logger.error(f"域名{breaker.host}熔断时间过长，放弃{description}")
+                return outcome.value if outcome is not None else None
+            time.sleep(max(0.0, breaker.retry_at() - time.monotonic()))
+
+        attempts += 1
+        outcome = fetch(url)
+        breaker.record(outcome.host_healthy)
+        if outcome.ok:
+            return outcome.value
+        # 商品下架、登录拦截等短时间内重试没有意义
+        if outcome.policy != RetryPolicyType.RETRY_SOON:
+            logger.error(f"{description}失败({outcome.category.value})，不再重试")
+            return outcome.value
+        if not policy.should_retry(attempts):
+            break
+
+        delay = policy.next_delay(attempts)
+        metrics.inc('retries_total')
+        logger.warning(f"{description}失败，{delay:.1f}秒后进行第{attempts + 1}次尝试")
+        time.sleep(delay)
+
+    logger.error(f"在{attempts}次尝试后仍无法{description}")
+    return outcome.value
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+与上一轮结果比较，只对变化发出警告
+
+每轮结束后把各行的价格、SKU和警告类型保存为快照(state_dir/run_snapshot.json)，
+按规范化的链接和SKU作为行的标识，表格中插入或调整行的顺序不影响比较。
+下一轮同一行的差异已经存在时不再重复警告，结束时生成变化集(ChangeSet)：
+新出现的差异、已消失的差异和价格变动，界面高亮和结果导出按变化集进行。
+任一链接获取失败的行只有占位值(价格0、SKU为空)，不产生警告和变化，快照中保留上一轮的记录。
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from urllib.parse import urlparse, parse_qs
+from core.result_buffer import price_scale, price_to_units
+from core.fetch_outcome import FailureCategory
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.run_diff')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 警告模式
+ALERTS_CHANGES = 'changes'  # 只在差异新出现时警告
+ALERTS_ALL = 'all'          # 每轮对所有存在差异的行警告
+
+
+def canonical_url(url):
+    """
+    规范化商品链接：忽略协议、大小写和跟踪参数，商品页只保留id参数
+
+    Args:
+        url: 商品页面URL
+
+    Returns:
+        str: 规范化的链接
+    """
+    text = str(url or '').strip()
+    parsed = urlparse(text if '://' in text else f'//{text}')
+    host = (parsed.hostname or '').lower()
+    item_ids = parse_qs(parsed.query).get('id')
+    if item_ids:
+        return f"{host}{parsed.path}?id={item_ids[0]}"
+    return f"{host}{parsed.path}"
+
+
+def row_key(item):
+    """
+    行的标识：本店和竞店的规范化链接及表格中的SKU
+
+    Args:
+        item: Excel中读取的单行数据
+
+    Returns:
+        str: 行标识
+    """
+    parts = (canonical_url(item.get('link_a')), ' '.join(str(item.get('sku_a') or '').split()),
+             canonical_url(item.get('link_b')), ' '.join(str(item.get('sku_b') or '').split()))
+    return '|'.join(parts)
+
+
+def fetch_failed(result):
+    """
+    Args:
+        result: 单行结果(ResultRecord或字典)
+
+    Returns:
+        bool: 是否有链接获取失败，此时该行的价格和SKU是占位值
+    """
+    return any(result.get(field, FailureCategory.OK.value) != FailureCategory.OK.value
+               for field in ('a_status', 'b_status'))
+
+
+class PriceMove:
+    """一行的价格变动"""
+
+    __slots__ = ('key', 'sequence', 'side', 'old', 'new')
+
+    def __init__(self, key, sequence, side, old, new):
+        self.key = key
+        self.sequence = sequence
+        self.side = side  # 'a'本店 / 'b'竞店
+        self.old = old
+        self.new = new
+
+    @property
+    def delta(self):
+        return round(self.new - self.old, CONFIG['compare']['price_precision'])
+
+    def to_dict(self):
+        return {'key': self.key, 'sequence': self.sequence, 'side': self.side,
+                'old': self.old, 'new': self.new, 'delta': self.delta}
+
+
+class AlertChange:
+    """一行某类差异的出现或消失"""
+
+    __slots__ = ('key', 'sequence', 'alert_type')
+
+    def __init__(self, key, sequence, alert_type):
+        self.key = key
+        self.sequence = sequence
+        self.alert_type = alert_type
+
+    def to_dict(self):
+        return {'key': self.key, 'sequence': self.sequence, 'type': self.alert_type}
+
+
+class ChangeSet:
+    """一轮任务相对上一轮的变化"""
+
+    __slots__ = ('new_alerts', 'resolved_alerts', 'price_moves', 'new_rows', 'checked_rows')
+
+    def __init__(self):
+        self.new_alerts = []       # AlertChange：新出现的差异
+        self.resolved_alerts = []  # AlertChange：上一轮存在、本轮已消失的差异
+        self.price_moves = []      # PriceMove：价格变动
+        self.new_rows = 0          # 上一轮快照中没有的行数
+        self.checked_rows = 0      # 本轮获取的行数
+
+    def __bool__(self):
+        return bool(self.new_alerts or self.resolved_alerts or self.price_moves)
+
+    def sequences(self):
+        """
+        Returns:
+            set: 有变化的行序号，用于界面高亮
+        """
+        changes = self.new_alerts + self.resolved_alerts + self.price_moves
+        return {change.sequence for change in changes}
+
+    def records(self):
+        """
+        按条输出变化，用于导出
+
+        Returns:
+            list: 字典列表，change字段为new_alert/resolved_alert/price_move
+        """
+        records = [dict(change.to_dict(), change='new_alert') for change in self.new_alerts]
+        records += [dict(change.to_dict(), change='resolved_alert') for change in self.resolved_alerts]
+        records += [dict(change.to_dict(), change='price_move') for change in self.price_moves]
+        records.sort(key=lambda record: record['sequence'])
+        return records
+
+    def summary(self):
+        return (f"本轮变化: 新差异{len(self.new_alerts)}个，差异消失{len(self.resolved_alerts)}个，"
+                f"价格变动{len(self.price_moves)}个(共检查{self.checked_rows}行，新增{self.new_rows}行)")
+
+
+class RunSnapshot:
+    """上一轮结果的快照，保存在state_dir下"""
+
+    def __init__(self, path=None):
+        if path is None:
+            path = os.path.join(BASE_DIR, CONFIG['task']['state_dir'], CONFIG['diff']['snapshot_file'])
+        self.path = path
+        self.rows = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        """读取快照文件，文件不存在或损坏时从空快照开始(第一轮的差异全部视为新差异)"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, encoding='utf-8') as f:
+                    self.rows = json.load(f).get('rows', {})
+        except Exception as e:
+            logger.error(f"读取上一轮结果快照出错，本轮差异将全部视为新差异: {str(e)}")
+            self.rows = {}
+
+    def save(self):
+        """写回快照文件"""
+        with self._lock:
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                temp_file = self.path + '.tmp'
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump({'rows': self.rows}, f, ensure_ascii=False, separators=(',', ':'))
+                os.replace(temp_file, self.path)
+            except Exception as e:
+                logger.error(f"保存结果快照出错: {str(e)}")
+
+    def get(self, key):
+        return self.rows.get(key)
+
+    def retain(self, keys):
+        """只保留表格中仍存在的行，删除的行不再参与比较"""
+        with self._lock:
+            for key in [key for key in self.rows if key not in keys]:
+                del self.rows[key]
+
+
+class RunDiff:
+    """
+    一轮任务的差异比较
+
+    任务执行过程中对每个警告调用observe_alert决定是否发出，对每行结果调用observe_result；
+    结束时调用finish生成变化集并更新快照。本轮没有获取的行(任务中途停止)和获取失败的行
+    保留上一轮的记录。
+    """
+
+    def __init__(self, items=None, snapshot=None, mode=None):
+        """
+        Args:
+            items: 本轮表格的全部行，用于清除快照中已从表格删除的行；None则不清除
+            snapshot: 上一轮快照，None则从默认路径读取
+            mode: 警告模式，None则使用diff.alerts配置
+        """
+        self.snapshot = snapshot if snapshot is not None else RunSnapshot()
+        self.mode = mode or CONFIG['diff']['alerts']
+        if items is not None:
+            self.snapshot.retain({row_key(item) for item in items})
+        self._alerts = {}   # 行标识 -> 本轮的警告类型列表
+        self._results = {}  # 行标识 -> (行序号, 本店价格, 竞店价格, 本店SKU, 竞店SKU)
+        self._lock = threading.Lock()
+
+    def observe_alert(self, item, alert_type, result):
+        """
+        记录一个警告
+
+        Returns:
+            bool: 是否需要发出该警告(changes模式下上一轮已存在的差异、获取失败的行返回False)
+        """
+        if fetch_failed(result):
+            # 占位值与另一侧比较得到的差异不是真实差异
+            return False
+        key = row_key(item)
+        with self._lock:
+            self._alerts.setdefault(key, []).append(alert_type)
+        if self.mode == ALERTS_ALL:
+            return True
+        previous = self.snapshot.get(key)
+        return previous is None or alert_type not in previous['alerts']
+
+    def observe_result(self, item, result):
+        """记录一行结果，获取失败的行不记录"""
+        if fetch_failed(result):
+            return
+        key = row_key(item)
+        with self._lock:
+            self._results[key] = (result['sequence'], result['a_price'], result['b_price'],
+                                  result['a_sku'], result['b_sku'])
+
+    def finish(self, save=True):
+        """
+        生成变化集并更新快照
+
+        Args:
+            save: 是否写回快照文件
+
+        Returns:
+            ChangeSet: 本轮相对上一轮的变化
+        """
+        changes = ChangeSet()
+        scale = price_scale()
+        checked = time.strftime("%Y-%m-%d %H:%M:%S")
+        with self._lock:
+            for key, (sequence, a_price, b_price, a_sku, b_sku) in self._results.items():
+                alerts = self._alerts.get(key, [])
+                previous = self.snapshot.get(key)
+                changes.checked_rows += 1
+                if previous is None:
+                    changes.new_rows += 1
+                    previous = {'alerts': []}
+                else:
+                    for side, old, new in (('a', previous['a_price'], a_price), ('b', previous['b_price'], b_price)):
+                        # 获取失败(价格为0)不算价格变动
+                        if old and new and price_to_units(old, scale) != price_to_units(new, scale):
+                            changes.price_moves.append(PriceMove(key, sequence, side, old, new))
+
+                changes.new_alerts += [AlertChange(key, sequence, alert_type)
+                                       for alert_type in alerts if alert_type not in previous['alerts']]
+                changes.resolved_alerts += [AlertChange(key, sequence, alert_type)
+                                            for alert_type in previous['alerts'] if alert_type not in alerts]
+
+                self.snapshot.rows[key] = {
+                    'sequence': sequence,
+                    'a_price': a_price,
+                    'b_price': b_price,
+                    'a_sku': a_sku,
+                    'b_sku': b_sku,
+                    'alerts': alerts,
+                    'checked': checked
+                }
+            self._alerts = {}
+            self._results = {}
+
+        if save:
+            self.snapshot.save()
+        logger.info(changes.summary())
+        return changes
@@ -0,0 +1,140 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+按优先级安排获取顺序，并在时间预算内完成
+
+表格很大而重复间隔较短时，一轮可能来不及处理完全部行。按表格顺序处理时，
+表格底部的行总是被截掉；按优先级处理后，截止时间到达时已完成的是最重要的行：
+    1. 上一轮存在差异的行
+    2. 上一轮没有获取到的行：先是从未获取过的行，再是因截止时间未处理的行
+    3. 价格较高的商品
+优先级相同时保持表格顺序。上一轮的情况来自结果快照(见core/run_diff.py)。
+
+截止时间按最近每行的耗时预测：下一行预计无法在截止时间前完成时停止本轮，
+未处理的行在快照中保留上一轮的记录，下一轮优先处理。
+"""
+
+import time
+import logging
+from utils.metrics import metrics
+from core.run_diff import row_key
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.run_planner')
+
+
+def plan_rows(rows, snapshot):
+    """
+    按优先级排列本轮要处理的行
+
+    Args:
+        rows: (行序号, 单行数据)列表，按表格顺序
+        snapshot: 上一轮结果快照(RunSnapshot)
+
+    Returns:
+        list: 排序后的(行序号, 单行数据)列表
+    """
+    if not CONFIG['plan']['priority']:
+        return list(rows)
+
+    latest = max((entry.get('checked', '') for entry in snapshot.rows.values()), default='')
+
+    def priority(row):
+        sequence, item = row
+        entry = snapshot.get(row_key(item))
+        if entry is None:
+            # 从未获取过的行数据最旧
+            return (1, 0, 0.0, sequence)
+        differed = 0 if entry.get('alerts') else 1
+        stale = 1 if entry.get('checked', '') < latest else 2
+        value = max(entry.get('a_price') or 0.0, entry.get('b_price') or 0.0)
+        return (differed, stale, -value, sequence)
+
+    return sorted(rows, key=priority)
+
+
+def run_deadline(budget):
+    """
+    根据时间预算计算本轮的截止时间
+
+    Args:
+        budget: 时间预算(秒)，通常为任务重复间隔；None或0表示不限制
+
+    Returns:
+        float: 截止时间(time.time()，多进程之间通用)，不限制时返回None
+    """
+    if not budget or budget <= 0:
+        return None
+    return time.time() + budget * CONFIG['plan']['budget_ratio']
+
+
+class LatencyEstimator:
+    """按指数加权平均估计每行的耗时"""
+
+    def __init__(self, alpha=None):
+        self.alpha = CONFIG['plan']['latency_alpha'] if alpha is None else alpha
+        self.average = None
+        self.count = 0
+
+    def observe(self, seconds):
+        """记录一行的耗时"""
+        self.count += 1
+        if self.average is None:
+            self.average = seconds
+        else:
+            self.average += self.alpha * (seconds - self.average)
+
+    def expected(self, rows=1):
+        """
+        Returns:
+            float: 处理rows行预计需要的秒数，还没有样本时为0
+        """
+        return (self.average or 0.0) * rows
+
+
+class DeadlineTracker:
+    """
+    截止时间检查
+
+    每处理完一行后记录耗时；下一行预计无法在截止时间前完成时should_stop返回True，
+    预计本轮无法全部完成时输出一次警告。
+    """
+
+    def __init__(self, deadline):
+        """
+        Args:
+            deadline: 截止时间(time.time())，None表示不限制
+        """
+        self.deadline = deadline
+        self.latency = LatencyEstimator()
+        self._warned = False
+
+    def row_done(self, seconds, remaining):
+        """
+        记录一行的耗时并预测完成时间
+
+        Args:
+            seconds: 该行耗时
+            remaining: 剩余行数
+        """
+        self.latency.observe(seconds)
+        if self.deadline is None:
+            return
+        predicted = time.time() + self.latency.expected(remaining)
+        metrics.set_gauge('predicted_finish_seconds', max(0.0, predicted - time.time()))
+        if (not self._warned and remaining and predicted > self.deadline
+                and self.latency.count >= CONFIG['plan']['min_samples']):
+            self._warned = True
+            doable = int(max(0.0, self.deadline - time.time()) / max(self.latency.average, 1e-6))
+            logger.warning(f"按最近每行{self.latency.average:.2f}秒预计，截止时间前还能处理约{doable}行，"
+                           f"剩余{remaining}行中优先级较低的行本轮将不处理")
+
+    def should_stop(self):
+        """
+        Returns:
+            bool: 截止时间已到，或下一行预计无法在截止时间前完成
+        """
+        if self.deadline is None:
+            return False
+        return time.time() + self.latency.expected() > self.deadline
@@ -2,9 +2,13 @@
 # -*- coding: utf-8 -*-
 
 import logging
-import time
-from utils.browser_handler import browser
-from config import CONFIG, get_sku_selector
+from utils.fetch_backend import current_backend
+from utils.metrics import metrics
+from core.retry_policy import RetryPolicy, call_with_retry
+from core.api_parser import find_sku
+from core.fetch_outcome import (FetchOutcome, FailureCategory, classify_navigation_error,
+                                check_blocked_page, classify_missing_element)
+from config import get_sku_selector
 
 logger = logging.getLogger('taobao_price_checker.sku_fetcher')
 
@@ -12,8 +16,7 @@ class SkuFetcher:
     """SKU获取类"""
     
     def __init__(self):
-        self.retry_times = CONFIG['task']['retry_times']
-        self.retry_delay = CONFIG['task']['retry_delay']
+        self.retry_policy = RetryPolicy()
     
     def get_sku(self, url):
         """
@@ -25,27 +28,59 @@ class SkuFetcher:
         Returns:
             str: 商品SKU，如果获取失败返回空字符串
         """
+        return self.fetch_sku(url).value
+    
+    def fetch_sku(self, url):
+        """
+        从淘宝页面获取SKU，失败时给出失败分类
+        
+        Args:
+            url: 商品页面URL
+            
+        Returns:
+            FetchOutcome: 获取结果，失败时value为空字符串
+        """
         try:
             # 打开页面
-            if not browser.get_page(url):
+            backend = current_backend()
+            if not backend.navigate(url):
                 logger.error(f"无法打开页面: {url}")
-                return ""
+                return FetchOutcome.failure(classify_navigation_error(backend.last_error), "", "无法打开页面")
+            
+            # 登录页、验证页、下架页不必等待元素超时
+            category = check_blocked_page(backend)
+            if category:
+                logger.error(f"页面被拦截或商品不存在({category.value}): {url}")
+                return FetchOutcome.failure(category, "", "页面被拦截或商品不存在")
+            
+            # 优先从商品详情接口数据中读取(extract.mode为network时)
+            payload = backend.api_payload(url)
+            if payload is not None:
+                sku = find_sku(payload)
+                if sku:
+                    metrics.inc('extract_source_total', source='network')
+                    return FetchOutcome.success(sku)
             
             # 获取SKU元素
             selector = get_sku_selector()
-            sku_element = browser.find_element_by_selector(selector)
+            sku_element = backend.wait_for('css selector', selector)
             
             if sku_element is None:
                 logger.error("无法找到SKU元素")
-                return ""
+                return FetchOutcome.failure(classify_missing_element(backend), "", "无法找到SKU元素")
             
             # 获取SKU文本
-            sku_text = browser.get_element_text(sku_element)
-            return self._clean_sku(sku_text)
+            with metrics.span('extract'):
+                sku_text = backend.element_text(sku_element)
+                sku = self._clean_sku(sku_text)
+            if not sku:
+                return FetchOutcome.failure(FailureCategory.SELECTOR_DRIFT, "", "SKU文本为空")
+            metrics.inc('extract_source_total', source='dom')
+            return FetchOutcome.success(sku)
             
         except Exception as e:
             logger.error(f"获取SKU时出错: {str(e)}")
-            return ""
+            return FetchOutcome.failure(FailureCategory.UNKNOWN, "", str(e))
     
     def _clean_sku(self, sku_text):
         """
@@ -78,7 +113,7 @@ class SkuFetcher:
     
     def get_sku_with_retry(self, url):
         """
-        带重试机制的SKU获取
+        带重试机制的SKU获取(指数退避加随机抖动，同步等待)
         
         Args:
             url: 商品页面URL
@@ -86,21 +121,4 @@ class SkuFetcher:
         Returns:
             str: 商品SKU，如果所有重试都失败则返回空字符串
         """
-        for attempt in range(self.retry_times):
-            try:
-                sku = self.get_sku(url)
-                if sku:
-                    return sku
-                
-                # 如果获取失败且不是最后一次尝试，等待后重试
-                if attempt < self.retry_times - 1:
-                    logger.warning(f"获取SKU失败，{self.retry_delay}秒后进行第{attempt + 2}次尝试")
-                    time.sleep(self.retry_delay)
-                
-            except Exception as e:
-                logger.error(f"第{attempt + 1}次获取SKU时出错: {str(e)}")
-                if attempt < self.retry_times - 1:
-                    time.sleep(self.retry_delay)
-        
-        logger.error(f"在{self.retry_times}次尝试后仍无法获取SKU")
-        return ""
+        return call_with_retry(self.fetch_sku, url, self.retry_policy, "获取SKU") or ""
@@ -0,0 +1,575 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+任务执行模块，负责 读取Excel → 获取价格/SKU → 数据比较 的完整流程。
+
+本模块不依赖任何界面库，图形界面(main.py)和命令行(cli.py)都通过回调函数接收
+进度、结果和警告。获取、比较和回调分环节执行(见core/pipeline.py)，回调较慢时不影响获取。
+"""
+
+import time
+import heapq
+import itertools
+import logging
+import threading
+from collections import deque
+from utils.excel_handler import ExcelHandler
+from utils.fetch_backend import current_backend
+from core.price_fetcher import PriceFetcher
+from core.sku_fetcher import SkuFetcher
+from core.variant_fetcher import VariantFetcher, VariantMatrix
+from core.data_comparator import DataComparator
+from core.retry_policy import RetryPolicy, RetryBudget, breakers
+from core.fetch_outcome import FetchOutcome, FailureCategory, RetryPolicyType
+from core.fetch_state import FetchState, row_fingerprint
+from core.result_buffer import ResultRecord, ResultBuffer
+from core.run_diff import RunDiff, fetch_failed
+from core.run_planner import plan_rows, run_deadline, DeadlineTracker
+from core.concurrency import AimdController
+from core.change_probe import ChangeProbe
+from core.pipeline import Pipeline
+from utils.page_archive import PageArchive
+from utils.metrics import metrics
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.task_runner')
+
+# 警告类型
+ALERT_PRICE = 'price'
+ALERT_SKU = 'sku'
+ALERT_LOCAL_SKU = 'local_sku'
+ALERT_COMPETITOR_SKU = 'competitor_sku'
+
+# 每行需要获取的字段：(结果字段, 链接字段, 获取类型)
+FETCH_FIELDS = [
+    ('a_price', 'link_a', 'price'),
+    ('b_price', 'link_b', 'price'),
+    ('a_sku', 'link_a', 'sku'),
+    ('b_sku', 'link_b', 'sku')
+]
+
+# 获取失败时的默认值
+FAILED_VALUES = {'price': 0.0, 'sku': ""}
+
+# 链接字段对应的状态字段，值为FailureCategory的值
+STATUS_FIELDS = {'link_a': 'a_status', 'link_b': 'b_status'}
+
+# 链接字段对应的表格SKU字段，按SKU获取时用于匹配
+SKU_FIELDS = {'link_a': 'sku_a', 'link_b': 'sku_b'}
+
+# 页面正常打开的获取结果，开启页面归档时保存这些页面，修改选择器后可以重新提取
+ARCHIVE_CATEGORIES = (FailureCategory.OK, FailureCategory.SELECTOR_DRIFT)
+
+ALERT_MESSAGES = {
+    ALERT_PRICE: "本店和竞店价格不同",
+    ALERT_SKU: "本店和竞店SKU不同",
+    ALERT_LOCAL_SKU: "本店SKU和链接中本店的SKU不同",
+    ALERT_COMPETITOR_SKU: "竞店SKU和链接中竞店的SKU不同"
+}
+
+
+class PendingRow:
+    """处理中的一行数据，记录已获取的字段、各字段的尝试次数、各链接的失败分类，比较后记录结果和要发出的警告"""
+
+    __slots__ = ('sequence', 'item', 'fingerprint', 'values', 'attempts', 'statuses', 'result', 'alerts')
+
+    def __init__(self, sequence, item):
+        self.sequence = sequence
+        self.item = item
+        self.fingerprint = row_fingerprint(item)
+        self.values = {}
+        self.attempts = {}
+        self.statuses = {}
+        self.result = None
+        self.alerts = ()
+
+    def __lt__(self, other):
+        return self.sequence < other.sequence
+
+
+class TaskRunner:
+    """任务执行类"""
+
+    def __init__(self, on_progress=None, on_result=None, on_alert=None, stop_event=None, save_state=True):
+        """
+        Args:
+            on_progress: 进度回调，参数为进度百分比(int)
+            on_result: 结果回调，参数为单行结果(ResultRecord，可按字段名读取)
+            on_alert: 警告回调，参数为警告类型和单行结果
+            stop_event: 停止事件，None则新建；多进程模式下传入进程间共享的事件
+            save_state: run()结束时是否写回状态文件和上一轮结果快照；基准测试等传False，
+                        不影响正式任务的跨轮次状态
+        """
+        self.on_progress = on_progress
+        self.save_state = save_state
+        self.on_result = on_result
+        self.on_alert = on_alert
+
+        self.excel_handler = ExcelHandler()
+        self.price_fetcher = PriceFetcher()
+        self.sku_fetcher = SkuFetcher()
+        self.variant_fetcher = VariantFetcher(self.price_fetcher, self.sku_fetcher)
+        self.data_comparator = DataComparator()
+        self.retry_policy = RetryPolicy()
+        self.retry_budget = None
+        self.fetch_state = None
+        self.diff = None      # 与上一轮结果的比较，只在run()中使用；多进程时由主进程比较
+        self.changes = None   # 最近一轮的变化集(ChangeSet)
+        self._pending = deque()
+        self._variants = {}  # URL -> VariantMatrix，按SKU获取时本轮已打开过的链接
+        self.concurrency = None  # 同时加载页面数的控制器，多标签页时在run_rows中创建
+        self.archive = PageArchive() if CONFIG['archive']['enabled'] else None
+        self.backend = None   # 页面获取后端(backend.name)，在run_rows中取得
+        self._validators = {}  # URL -> 本轮探测到的版本标识，开启变化探测时在run_rows中生成
+
+        self._stop_event = stop_event if stop_event is not None else threading.Event()
+
+    def stop(self):
+        """请求停止当前任务，当前行处理完成后退出"""
+        self._stop_event.set()
+
+    def run(self, file_path, budget=None):
+        """
+        执行一次完整的比较任务
+
+        获取失败的行按失败分类处理：超时、网络错误、限流按退避时间推迟重试，等待期间
+        继续处理其他行；登录拦截、选择器失效本轮不再重试；确认下架的链接记录到状态文件，
+        在表格中该行内容变化之前不再打开。结果按完成顺序回调，返回值按行序号排序。
+        上一轮已经存在的差异不再重复警告，本轮的变化集保存在self.changes中。
+        各行按优先级处理(见core/run_planner.py)，指定时间预算时在截止时间前停止。
+        开启变化探测时，页面未变化的链接直接使用上次获取的值(见core/change_probe.py)。
+
+        Args:
+            file_path: Excel文件路径
+            budget: 时间预算(秒)，通常为任务重复间隔，None表示不限制
+
+        Returns:
+            ResultBuffer: 每行比较结果，按行序号排序
+        """
+        self._stop_event.clear()
+        metrics.start_run()
+
+        data = self.excel_handler.read_excel(file_path)
+        if not data:
+            logger.error("无法读取Excel文件")
+            return ResultBuffer()
+
+        # 每轮重新读取状态文件，期间表格可能已被修改
+        self.fetch_state = FetchState()
+        self.diff = RunDiff(data)
+        try:
+            rows = plan_rows(list(enumerate(data, 1)), self.diff.snapshot)
+            return self.run_rows(rows, deadline=run_deadline(budget))
+        finally:
+            if self.save_state:
+                self.fetch_state.save()
+            self.changes = self.diff.finish(save=self.save_state)
+            self.diff = None
+
+    def run_rows(self, rows, close_browser=True, deadline=None):
+        """
+        处理已读取的行，多进程模式下每个工作进程处理其中一个分片
+
+        Args:
+            rows: (行序号, 单行数据)列表，按处理顺序
+            close_browser: 结束后是否关闭浏览器，分布式工作进程在多批任务之间保留浏览器
+            deadline: 截止时间(time.time())，下一行预计无法在此之前完成时停止；None表示不限制
+
+        Returns:
+            ResultBuffer: 每行比较结果，按行序号排序
+        """
+        results = ResultBuffer()
+        if self.fetch_state is None:
+            self.fetch_state = FetchState()
+        pipeline = None
+
+        try:
+            # 初始化浏览器
+            self.backend = current_backend()
+            self.backend.setup()
+
+            total_items = len(rows)
+            self._variants = {}
+            tabs = self.backend.max_loads
+            if tabs > 1 and CONFIG['concurrency']['adaptive'] and self.concurrency is None:
+                # 跨批次保留，分布式工作进程的每批任务沿用已调节的并发
+                self.concurrency = AimdController(maximum=tabs)
+            self.retry_budget = RetryBudget.for_pages(total_items * len(FETCH_FIELDS))
+            pending = self._pending = deque(PendingRow(sequence, item) for sequence, item in rows)
+            self._validators = self._probe_rows(pending)
+            deferred = []  # (可重试时间, 行)
+            tracker = DeadlineTracker(deadline)
+            last_done = time.monotonic()
+            fetched = 0
+            pipeline = self._start_pipeline(results, total_items)
+
+            while pending or deferred:
+                if self._stop_event.is_set():
+                    logger.info(f"任务已停止，共获取{fetched}行")
+                    break
+                if tracker.should_stop():
+                    # 未处理的行优先级较低，下一轮在快照中仍是未获取的行，会被优先处理
+                    metrics.inc('deadline_stops_total')
+                    logger.warning(f"已到本轮截止时间，共获取{fetched}行，"
+                                   f"剩余{len(pending) + len(deferred)}行本轮不处理")
+                    break
+
+                now = time.monotonic()
+                if deferred and deferred[0][0] <= now:
+                    row = heapq.heappop(deferred)[1]
+                elif pending:
+                    row = pending.popleft()
+                else:
+                    # 只剩等待重试的行，等到最早的可重试时间(不超过截止时间)
+                    wait = deferred[0][0] - now
+                    if deadline is not None:
+                        wait = min(wait, max(0.0, deadline - time.time()))
+                    self._stop_event.wait(wait)
+                    continue
+
+                with pipeline.working(), metrics.span('row'):
+                    retry_at = self.process_row(row)
+                # 行与行之间检查是否需要回收浏览器(页面数或内存超过阈值)
+                self.backend.maybe_recycle()
+                if retry_at is not None:
+                    heapq.heappush(deferred, (retry_at, row))
+                    metrics.set_gauge('deferred_rows', len(deferred))
+                    continue
+
+                # 交给比较环节，下游队列满时在此等待
+                pipeline.submit(row)
+                fetched += 1
+                metrics.set_gauge('deferred_rows', len(deferred))
+
+                # 添加延时避免请求过快
+                self._stop_event.wait(CONFIG['task']['request_delay'])
+
+                # 按相邻两行完成的间隔(含重试等待和延时)预测剩余耗时
+                now = time.monotonic()
+                tracker.row_done(now - last_done, len(pending) + len(deferred))
+                last_done = now
+
+            logger.info("任务执行完成")
+            return results
+
+        except Exception as e:
+            logger.error(f"执行任务时出错: {str(e)}")
+            return results
+        finally:
+            # 已获取的行在返回前全部完成比较和回调
+            if pipeline is not None:
+                pipeline.close()
+                logger.info(pipeline.summary())
+            results.sort()
+            if close_browser and self.backend is not None:
+                self.backend.close()
+            logger.info(metrics.summary())
+
+    def _start_pipeline(self, results, total_items):
+        """
+        启动比较和输出环节
+
+        Args:
+            results: 输出环节把每行结果追加到其中
+            total_items: 本次处理的总行数，用于计算进度
+
+        Returns:
+            Pipeline: 已启动的流水线，源环节为调用方线程中的获取
+        """
+        settings = CONFIG['pipeline']
+        lock = threading.Lock()
+
+        def compare(row):
+            row.result, row.alerts = self.compare_row(row.sequence, row.item, row.values, row.statuses)
+            return row
+
+        def sink(row):
+            with metrics.span('sink'):
+                for alert_type in row.alerts:
+                    self._emit(self.on_alert, alert_type, row.result)
+                with lock:
+                    results.append(row.result)
+                    done = len(results)
+                metrics.inc('rows_total')
+                self._emit(self.on_result, row.result)
+                self._emit(self.on_progress, int((done / total_items) * 100))
+
+        pipeline = Pipeline('fetch')
+        pipeline.add_stage('compare', compare, settings['compare_workers'], settings['queue_size'])
+        pipeline.add_stage('sink', sink, settings['sink_workers'], settings['queue_size'])
+        pipeline.start()
+        return pipeline
+
+    def process_row(self, row):
+        """
+        获取一行中尚未获取的字段
+
+        Args:
+            row: 处理中的行
+
+        Returns:
+            float: 需要推迟时返回可重试时间(time.monotonic)，全部字段已获取(含失败的默认值)返回None
+        """
+        for field, link_field, kind in FETCH_FIELDS:
+            if field in row.values:
+                continue
+
+            url = row.item[link_field]
+            if self.fetch_state.is_dead(url, row.fingerprint):
+                # 已确认下架且该行未修改，不再打开页面
+                metrics.inc('skipped_dead_total')
+                row.statuses[link_field] = FailureCategory.DELISTED.value
+                row.values[field] = FAILED_VALUES[kind]
+                continue
+
+            # 按SKU获取时，同一链接本轮已打开过则直接按SKU名称匹配
+            matrix = self._variants.get(url)
+            if matrix is not None:
+                metrics.inc('variant_cache_hits_total')
+                row.values[field] = self._variant_value(matrix, kind, row.item, link_field)
+                continue
+
+            # 探测到页面未变化，使用上次获取的值
+            value = self._unchanged_value(kind, url, row.item, link_field)
+            if value is not None:
+                metrics.inc('probe_skips_total')
+                row.values[field] = value
+                continue
+
+            breaker = breakers.for_url(url)
+            if not breaker.allow():
+                if breaker.gave_up():
+                    # 熔断时间过长，本轮不再等待该域名，下一轮再试
+                    metrics.inc('circuit_gave_up_total')
+                    logger.warning(f"第{row.sequence}行{field}所在域名熔断时间过长，本轮不再获取")
+                    row.statuses[link_field] = FailureCategory.NETWORK.value
+                    row.values[field] = FAILED_VALUES[kind]
+                    continue
+                # 域名熔断中，推迟整行，不计入尝试次数
+                return breaker.retry_at()
+
+            limit = self.concurrency.current if self.concurrency is not None else None
+            self.backend.prefetch(self._upcoming_urls(row), limit)
+            started = time.monotonic()
+            outcome = self._fetch(kind, url, row.item, link_field)
+            if self.concurrency is not None:
+                self.concurrency.record(time.monotonic() - started, outcome.category)
+            breaker.record(outcome.host_healthy)
+            if outcome.ok:
+                row.values[field] = outcome.value
+                self.fetch_state.clear(url)
+                continue
+
+            metrics.inc('fetch_failures_total', category=outcome.category.value)
+            row.statuses[link_field] = outcome.category.value
+            if outcome.policy == RetryPolicyType.RETRY_SOON:
+                attempts = row.attempts.get(field, 0) + 1
+                row.attempts[field] = attempts
+                if self.retry_policy.should_retry(attempts) and self.retry_budget.try_acquire():
+                    delay = self.retry_policy.next_delay(attempts)
+                    metrics.inc('retries_total')
+                    logger.warning(f"第{row.sequence}行{field}获取失败({outcome.category.value})，"
+                                   f"{delay:.1f}秒后进行第{attempts + 1}次尝试")
+                    return time.monotonic() + delay
+            elif outcome.policy == RetryPolicyType.NEVER:
+                self.fetch_state.mark_dead(url, row.fingerprint, outcome.category.value)
+                logger.warning(f"第{row.sequence}行商品已下架，该行修改前不再获取: {url}")
+            else:
+                logger.warning(f"第{row.sequence}行{field}获取失败({outcome.category.value})，本轮不再重试")
+
+            row.values[field] = FAILED_VALUES[kind]
+
+        return None
+
+    def _probe_rows(self, rows):
+        """
+        开启变化探测时，探测各行需要打开的链接(已确认下架的除外)
+
+        Returns:
+            dict: URL -> 版本标识(探测失败时为None)，未开启时为空字典
+        """
+        if not CONFIG['probe']['enabled']:
+            return {}
+        urls = [row.item[link_field] for row in rows for link_field in STATUS_FIELDS
+                if not self.fetch_state.is_dead(row.item[link_field], row.fingerprint)]
+        return ChangeProbe(self.fetch_state).probe_all(urls, self._stop_event)
+
+    def _unchanged_value(self, kind, url, item, link_field):
+        """
+        页面版本与上次完整获取时相同时，上次获取到的值
+
+        Returns:
+            上次的价格或SKU，未探测、页面已变化或没有记录时返回None
+        """
+        validator = self._validators.get(url)
+        if validator is None:
+            return None
+        if CONFIG['task']['fetch_mode'] == 'variants':
+            cached = self.fetch_state.cached_value(url, validator, 'variants')
+            if cached is None:
+                return None
+            # 同一链接的其他行直接按SKU名称匹配
+            matrix = self._variants[url] = VariantMatrix(cached['default_price'], cached['variants'])
+            return self._variant_value(matrix, kind, item, link_field)
+        return self.fetch_state.cached_value(url, validator, kind)
+
+    def _remember(self, url, kind, value):
+        """完整获取成功后记录本轮探测到的版本标识和获取到的值"""
+        validator = self._validators.get(url)
+        if validator is not None:
+            self.fetch_state.remember(url, validator, kind, value)
+
+    def _upcoming_urls(self, row):
+        """
+        当前行剩余字段和后续几行需要打开的URL，按获取顺序排列，用于多标签页预加载
+
+        Args:
+            row: 当前处理的行
+
+        Returns:
+            list: URL列表，第一个为当前字段的URL
+        """
+        urls = []
+        for upcoming in itertools.chain([row], itertools.islice(self._pending, self.backend.max_loads)):
+            for field, link_field, _ in FETCH_FIELDS:
+                url = upcoming.item[link_field]
+                if field in upcoming.values or url in self._variants:
+                    continue
+                validator = self._validators.get(url)
+                if validator is not None and validator == self.fetch_state.probe_validator(url):
+                    continue  # 页面未变化，不会打开
+                if not self.fetch_state.is_dead(url, upcoming.fingerprint):
+                    urls.append(url)
+        return urls
+
+    def compare_row(self, sequence, item, values, statuses=None):
+        """
+        生成单行结果并判断需要发出的警告，可在多个线程中同时调用
+
+        Args:
+            sequence: 行序号(从1开始)
+            item: Excel中读取的单行数据
+            values: 已获取的价格和SKU
+            statuses: 各链接字段的失败分类，未记录的视为成功
+
+        Returns:
+            tuple: (单行比较结果ResultRecord, 需要发出的警告类型列表)
+        """
+        statuses = statuses or {}
+        result = ResultRecord(
+            sequence,
+            a_price=values['a_price'],
+            a_sku=values['a_sku'],
+            b_price=values['b_price'],
+            b_sku=values['b_sku'],
+            a_status=statuses.get('link_a', FailureCategory.OK.value),
+            b_status=statuses.get('link_b', FailureCategory.OK.value)
+        )
+
+        if fetch_failed(result):
+            # 获取失败的一侧是占位值，比较结果不代表真实差异
+            metrics.inc('compare_skipped_total')
+            alerts = []
+        else:
+            with metrics.span('compare'):
+                alerts = self.check_alerts(item, result)
+        emitted = []
+        for alert_type in alerts:
+            metrics.inc('alerts_total', type=alert_type)
+            if self.diff is not None and not self.diff.observe_alert(item, alert_type, result):
+                # 上一轮已经存在的差异
+                metrics.inc('alerts_suppressed_total', type=alert_type)
+                continue
+            emitted.append(alert_type)
+        if self.diff is not None:
+            self.diff.observe_result(item, result)
+
+        return result, emitted
+
+    def _fetch(self, kind, url, item, link_field):
+        """按类型获取价格或SKU，返回FetchOutcome"""
+        if CONFIG['task']['fetch_mode'] == 'variants':
+            outcome = self.variant_fetcher.fetch_variants(url)
+            matrix = outcome.value
+            self._archive_page(url, outcome, {
+                'price': matrix.default_price if matrix else FAILED_VALUES['price'],
+                'sku': (matrix.names[0] if matrix.names else "") if matrix else FAILED_VALUES['sku']
+            })
+            if not outcome.ok:
+                return FetchOutcome.failure(outcome.category, FAILED_VALUES[kind], outcome.detail)
+            self._variants[url] = matrix
+            self._remember(url, 'variants', matrix.to_dict())
+            return FetchOutcome.success(self._variant_value(matrix, kind, item, link_field))
+        if kind == 'price':
+            outcome = self.price_fetcher.fetch_price(url)
+        else:
+            outcome = self.sku_fetcher.fetch_sku(url)
+        self._archive_page(url, outcome, {kind: outcome.value})
+        if outcome.ok:
+            self._remember(url, kind, outcome.value)
+        return outcome
+
+    def _archive_page(self, url, outcome, values):
+        """
+        开启页面归档时保存当前页面，只保存页面正常打开的获取(成功或选择器失效)
+
+        Args:
+            url: 商品页面URL
+            outcome: 获取结果
+            values: 获取类型 -> 当时提取的值，与PriceFetcher/SkuFetcher的结果对应
+        """
+        if self.archive is None or outcome.category not in ARCHIVE_CATEGORIES:
+            return
+        try:
+            html = self.backend.page_source
+        except Exception as e:
+            logger.warning(f"读取页面源码失败，不归档: {str(e)}")
+            return
+        for kind, value in values.items():
+            self.archive.record(url, kind, html, value, outcome.category.value)
+
+    def _variant_value(self, matrix, kind, item, link_field):
+        """按表格中该链接对应的SKU名称，从SKU→价格表中取价格或SKU"""
+        expected = item.get(SKU_FIELDS[link_field], '')
+        if kind == 'price':
+            return matrix.price_for(expected)
+        return matrix.sku_for(expected)
+
+    def check_alerts(self, item, result):
+        """
+        根据比较结果判断需要发出的警告
+
+        Args:
+            item: Excel中读取的单行数据
+            result: 单行比较结果
+
+        Returns:
+            list: 警告类型列表
+        """
+        alerts = []
+
+        # 检查价格差异
+        if self.data_comparator.check_price_difference(result['a_price'], result['b_price']):
+            alerts.append(ALERT_PRICE)
+
+        # 检查SKU差异
+        if self.data_comparator.check_sku_difference(result['a_sku'], result['b_sku']):
+            alerts.append(ALERT_SKU)
+
+            # 检查具体的SKU差异类型
+            if self.data_comparator.check_local_sku_difference(item.get('sku_a', ''), result['a_sku']):
+                alerts.append(ALERT_LOCAL_SKU)
+            if self.data_comparator.check_competitor_sku_difference(item.get('sku_b', ''), result['b_sku']):
+                alerts.append(ALERT_COMPETITOR_SKU)
+
+        return alerts
+
+    def _emit(self, callback, *args):
+        """调用回调函数，回调中的异常不影响任务继续执行"""
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"执行回调时出错: {str(e)}")
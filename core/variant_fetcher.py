@@ -0,0 +1,244 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+一次打开页面获取商品全部SKU及其价格、库存
+
+同一商品的多个SKU在表格中通常是多行，按字段获取时每行都要重新打开页面。
+VariantFetcher打开一次页面得到完整的SKU→价格表(VariantMatrix)，TaskRunner
+在task.fetch_mode为variants时按URL缓存该表，各行按表格中的SKU名称匹配。
+"""
+
+import time
+import logging
+from array import array
+from utils.fetch_backend import current_backend
+from utils.metrics import metrics
+from core.price_fetcher import PriceFetcher
+from core.sku_fetcher import SkuFetcher
+from core.retry_policy import RetryPolicy, call_with_retry
+from core.api_parser import find_price, find_variants
+from core.fetch_outcome import (FetchOutcome, FailureCategory, classify_navigation_error,
+                                check_blocked_page, classify_missing_element)
+from config import CONFIG, get_price_xpath, get_sku_selector
+
+logger = logging.getLogger('taobao_price_checker.variant_fetcher')
+
+# 库存未知
+UNKNOWN_STOCK = -1
+
+
+def normalize_sku(name):
+    """SKU名称匹配时忽略首尾空白、连续空白和大小写"""
+    return ' '.join(str(name or '').split()).casefold()
+
+
+class VariantMatrix:
+    """
+    单个商品的SKU→价格/库存表
+
+    名称、价格、库存按列存放，价格缺失时为0.0，库存未知时为UNKNOWN_STOCK。
+    """
+
+    __slots__ = ('default_price', 'names', 'prices', 'stocks', '_index')
+
+    def __init__(self, default_price, variants):
+        """
+        Args:
+            default_price: 页面显示的价格，匹配不到SKU或SKU没有单独价格时使用
+            variants: (SKU名称, 价格, 库存)列表，顺序与页面上的SKU顺序一致
+        """
+        self.default_price = default_price
+        self.names = tuple(name for name, _, _ in variants)
+        self.prices = array('d', (price or 0.0 for _, price, _ in variants))
+        self.stocks = array('l', (UNKNOWN_STOCK if stock is None else stock for _, _, stock in variants))
+        self._index = {}
+        for position, name in enumerate(self.names):
+            self._index.setdefault(normalize_sku(name), position)
+
+    def __len__(self):
+        return len(self.names)
+
+    def lookup(self, name):
+        """
+        按名称查找SKU
+
+        先按完整名称匹配；多属性组合(如"红色 XL")也可以只按其中一个属性值匹配，
+        此时优先返回有库存的组合。
+
+        Returns:
+            int: SKU位置，找不到时返回None
+        """
+        key = normalize_sku(name)
+        if not key:
+            return None
+        position = self._index.get(key)
+        if position is not None:
+            return position
+
+        matches = [position for position, variant in enumerate(self.names)
+                   if key in normalize_sku(variant).split(' ')]
+        for position in matches:
+            if self.stocks[position] != 0:
+                return position
+        return matches[0] if matches else None
+
+    def price_for(self, name):
+        """
+        Returns:
+            float: 名称对应SKU的价格，匹配不到或没有单独价格时返回页面显示的价格
+        """
+        position = self.lookup(name)
+        if position is not None and self.prices[position]:
+            return self.prices[position]
+        return self.default_price
+
+    def sku_for(self, name):
+        """
+        Returns:
+            str: 名称对应的SKU名称，匹配不到时返回页面上的第一个SKU(与按字段获取一致)
+        """
+        position = self.lookup(name)
+        if position is not None:
+            return self.names[position]
+        return self.names[0] if self.names else ""
+
+    def to_dict(self):
+        """转换为可JSON序列化的字典"""
+        return {
+            'default_price': self.default_price,
+            'variants': [[name, price, None if stock == UNKNOWN_STOCK else stock]
+                         for name, price, stock in zip(self.names, self.prices, self.stocks)]
+        }
+
+    def __repr__(self):
+        return f"VariantMatrix({self.default_price!r}, {len(self)} variants)"
+
+
+class VariantFetcher:
+    """商品全部SKU获取类"""
+
+    def __init__(self, price_fetcher=None, sku_fetcher=None):
+        """
+        Args:
+            price_fetcher: 从页面读取价格时使用的PriceFetcher，None则新建
+            sku_fetcher: 清理SKU文本时使用的SkuFetcher，None则新建
+        """
+        self.price_fetcher = price_fetcher or PriceFetcher()
+        self.sku_fetcher = sku_fetcher or SkuFetcher()
+        self.retry_policy = RetryPolicy()
+
+    def get_variants(self, url):
+        """
+        打开一次页面获取全部SKU
+
+        Args:
+            url: 商品页面URL
+
+        Returns:
+            VariantMatrix: SKU→价格表，获取失败时返回None
+        """
+        return self.fetch_variants(url).value
+
+    def fetch_variants(self, url):
+        """
+        打开一次页面获取全部SKU，失败时给出失败分类
+
+        Args:
+            url: 商品页面URL
+
+        Returns:
+            FetchOutcome: 获取结果，成功时value为VariantMatrix，失败时为None
+        """
+        try:
+            # 打开页面
+            backend = current_backend()
+            if not backend.navigate(url):
+                logger.error(f"无法打开页面: {url}")
+                return FetchOutcome.failure(classify_navigation_error(backend.last_error), None, "无法打开页面")
+
+            # 登录页、验证页、下架页不必等待元素超时
+            category = check_blocked_page(backend)
+            if category:
+                logger.error(f"页面被拦截或商品不存在({category.value}): {url}")
+                return FetchOutcome.failure(category, None, "页面被拦截或商品不存在")
+
+            # 优先从商品详情接口数据中读取(extract.mode为network时)，接口数据包含每个SKU的价格和库存
+            payload = backend.api_payload(url)
+            if payload is not None:
+                price = find_price(payload)
+                variants = find_variants(payload)
+                if price and variants:
+                    metrics.inc('extract_source_total', source='network')
+                    metrics.inc('variants_total', len(variants))
+                    return FetchOutcome.success(VariantMatrix(price, variants))
+
+            return self._fetch_from_page(backend)
+
+        except Exception as e:
+            logger.error(f"获取SKU列表时出错: {str(e)}")
+            return FetchOutcome.failure(FailureCategory.UNKNOWN, None, str(e))
+
+    def _fetch_from_page(self, backend):
+        """
+        从页面元素读取显示的价格和全部SKU名称
+
+        页面上只显示当前选中SKU的价格；extract.click_variants开启时依次点击每个SKU
+        读取价格(仍是同一次页面加载)，否则各SKU使用页面显示的价格，SKU名称一次批量读取。
+        """
+        panel_id = self.price_fetcher._get_panel_id()
+        if not panel_id:
+            logger.error("无法获取价格面板ID")
+            return FetchOutcome.failure(classify_missing_element(backend), None, "无法获取价格面板ID")
+
+        xpath = get_price_xpath(panel_id)
+        price = self._read_price(backend, xpath)
+        if not price:
+            logger.error("无法读取页面价格")
+            return FetchOutcome.failure(classify_missing_element(backend), None, "无法读取页面价格")
+
+        selector = get_sku_selector()
+        variants = []
+        if backend.wait_for('css selector', selector) is not None:
+            with metrics.span('extract'):
+                if CONFIG['extract']['click_variants']:
+                    for element in backend.find_all('css selector', selector):
+                        name = self.sku_fetcher._clean_sku(backend.element_text(element))
+                        if name:
+                            variants.append((name, self._click_and_read(backend, element, xpath), None))
+                else:
+                    texts = backend.extract_batch({'skus': ('css selector', selector)})['skus']
+                    variants = [(name, 0.0, None) for name in map(self.sku_fetcher._clean_sku, texts) if name]
+
+        if not variants:
+            return FetchOutcome.failure(classify_missing_element(backend), None, "无法找到SKU元素")
+        metrics.inc('extract_source_total', source='dom')
+        metrics.inc('variants_total', len(variants))
+        return FetchOutcome.success(VariantMatrix(price, variants))
+
+    def _read_price(self, backend, xpath, timeout=None):
+        """读取价格元素并解析，失败时返回0.0"""
+        element = backend.wait_for('xpath', xpath, timeout)
+        return self.price_fetcher._parse_price(backend.element_text(element))
+
+    def _click_and_read(self, backend, element, xpath):
+        """点击SKU后等待价格刷新并读取，失败时返回0.0(使用页面显示的价格)"""
+        try:
+            backend.click(element)
+            time.sleep(CONFIG['extract']['click_wait'])
+            return self._read_price(backend, xpath, timeout=CONFIG['extract']['click_wait'])
+        except Exception as e:
+            logger.warning(f"点击SKU读取价格失败: {str(e)}")
+            return 0.0
+
+    def get_variants_with_retry(self, url):
+        """
+        带重试机制的SKU列表获取(指数退避加随机抖动，同步等待)
+
+        Args:
+            url: 商品页面URL
+
+        Returns:
+            VariantMatrix: SKU→价格表，所有重试都失败时返回None
+        """
+        return call_with_retry(self.fetch_variants, url, self.retry_policy, "获取SKU列表")
@@ -2,50 +2,29 @@
 # -*- coding: utf-8 -*-
 
 import sys
-import os
+
+# 启动耗时分析需要在其他导入之前开启(python main.py --startup-report)
+from utils.startup_profiler import profiler
+profiler.install_if_requested(sys.argv)
+
 import logging
 from datetime import datetime
 import threading
-import time
+import multiprocessing
 
 from PyQt5.QtWidgets import (QApplication, QMessageBox, QTableWidgetItem)
 from PyQt5.QtCore import QObject, pyqtSignal, QTimer, Qt
 
-from ui import (MainWindow, PriceDifferentAlert, SkuDifferentAlert, 
-               LocalSkuDifferentAlert, CompetitorSkuDifferentAlert)
-from utils.excel_handler import ExcelHandler
-from core.price_fetcher import PriceFetcher
-from core.sku_fetcher import SkuFetcher
-from core.data_comparator import DataComparator
-from config import CONFIG
-from utils.browser_handler import browser
+from ui.main_window import MainWindow
+from core.task_runner import (ALERT_PRICE, ALERT_SKU,
+                              ALERT_LOCAL_SKU, ALERT_COMPETITOR_SKU)
+from core.process_runner import create_runner
+from utils.log_setup import setup_logging
+from utils.metrics import start_exporter
 
 # 确保应用程序只有一个实例
 app = None
 
-# 配置日志
-def setup_logging():
-    """设置日志"""
-    try:
-        log_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'logs')
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
-        
-        log_file = os.path.join(log_dir, 'app.log')
-        
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(log_file, encoding='utf-8'),
-                logging.StreamHandler()
-            ]
-        )
-        return logging.getLogger('taobao_price_checker')
-    except Exception as e:
-        print(f"设置日志时出错: {str(e)}")
-        sys.exit(1)
-
 
 class SignalBridge(QObject):
     """信号桥接器，用于在线程间传递信号"""
@@ -56,6 +35,7 @@ class SignalBridge(QObject):
     show_local_sku_alert = pyqtSignal()
     show_competitor_sku_alert = pyqtSignal()
     update_table = pyqtSignal(list)
+    highlight_rows = pyqtSignal(list)
 
 
 class PriceCheckerApp:
@@ -68,6 +48,7 @@ class PriceCheckerApp:
         if app is None:
             app = QApplication(sys.argv)
         self.app = app
+        profiler.mark('QApplication创建')
         
         try:
             self.main_window = MainWindow()
@@ -80,13 +61,18 @@ class PriceCheckerApp:
             self.worker_thread = None
             self.is_running = False
             self.selected_file = None
+            self.run_budget = None  # 本轮时间预算(秒)
             self.run_count = 0  # 初始化运行次数
             
-            # 数据处理器
-            self.excel_handler = ExcelHandler()
-            self.price_fetcher = PriceFetcher()
-            self.sku_fetcher = SkuFetcher()
-            self.data_comparator = DataComparator()
+            # 指标导出(按配置启动)
+            self.metrics_exporter = start_exporter()
+            
+            # 任务执行器(按配置的进程数选择单进程或多进程)
+            self.task_runner = create_runner(
+                on_progress=self.signals.update_progress.emit,
+                on_result=self.on_runner_result,
+                on_alert=self.on_runner_alert
+            )
             
             # 记录任务时间
             self.first_run_time = None
@@ -112,6 +98,7 @@ class PriceCheckerApp:
             self.signals.show_local_sku_alert.connect(self.show_local_sku_alert)
             self.signals.show_competitor_sku_alert.connect(self.show_competitor_sku_alert)
             self.signals.update_table.connect(self.main_window.update_table)
+            self.signals.highlight_rows.connect(self.main_window.highlight_rows)
                 
         except Exception as e:
             self.logger.error(f"设置信号连接时出错: {str(e)}")
@@ -153,18 +140,21 @@ class PriceCheckerApp:
             # 清空表格
             self.main_window.table.setRowCount(0)
             
+            # 任务间隔同时作为本轮的时间预算，到下一轮开始前结束本轮
+            try:
+                interval_minutes = int(self.main_window.interval_input.text())
+            except ValueError:
+                interval_minutes = 0
+            self.run_budget = interval_minutes * 60 if interval_minutes > 0 else None
+            
             # 创建并启动工作线程
             self.worker_thread = threading.Thread(target=self.run_task)
             self.worker_thread.daemon = True
             self.worker_thread.start()
             
             # 设置下一次任务的定时器
-            try:
-                interval_minutes = int(self.main_window.interval_input.text())
-                if interval_minutes > 0:
-                    QTimer.singleShot(interval_minutes * 60 * 1000, self.start_task)
-            except ValueError:
-                pass
+            if interval_minutes > 0:
+                QTimer.singleShot(interval_minutes * 60 * 1000, self.start_task)
             
             self.logger.info("任务已启动")
             
@@ -174,74 +164,35 @@ class PriceCheckerApp:
             raise
     
     def run_task(self):
-        """执行任务的主要逻辑"""
+        """执行任务的主要逻辑，由TaskRunner完成，界面只接收回调"""
         try:
-            # 读取Excel文件
-            data = self.excel_handler.read_excel(self.selected_file)
-            if not data:
-                self.logger.error("无法读取Excel文件")
-                return
-            
-            # 初始化浏览器
-            browser.setup_browser()
-            
-            total_items = len(data)
-            results = []
-            
-            for i, item in enumerate(data, 1):
-                # 更新进度
-                progress = int((i / total_items) * 100)
-                self.signals.update_progress.emit(progress)
-                
-                # 获取价格和SKU信息
-                a_price = self.price_fetcher.get_price(item['link_a'])
-                b_price = self.price_fetcher.get_price(item['link_b'])
-                a_sku = self.sku_fetcher.get_sku(item['link_a'])
-                b_sku = self.sku_fetcher.get_sku(item['link_b'])
-                
-                # 比较数据
-                result = {
-                    'sequence': i,
-                    'a_price': a_price,
-                    'b_price': b_price,
-                    'a_sku': a_sku,
-                    'b_sku': b_sku
-                }
-                
-                # 检查价格差异
-                if self.data_comparator.check_price_difference(a_price, b_price):
-                    self.signals.show_price_alert.emit()
-                
-                # 检查SKU差异
-                if self.data_comparator.check_sku_difference(a_sku, b_sku):
-                    self.signals.show_sku_alert.emit()
-                    
-                    # 检查具体的SKU差异类型
-                    if self.data_comparator.check_local_sku_difference(a_sku):
-                        self.signals.show_local_sku_alert.emit()
-                    if self.data_comparator.check_competitor_sku_difference(b_sku):
-                        self.signals.show_competitor_sku_alert.emit()
-                
-                results.append(result)
-                
-                # 每处理一项后更新表格
-                self.signals.update_table.emit(results)
-                
-                # 添加延时避免请求过快
-                time.sleep(CONFIG['request_delay'])
-            
+            self.task_runner.run(self.selected_file, budget=self.run_budget)
+            # 高亮与上一轮相比有变化的行
+            changes = self.task_runner.changes
+            if changes:
+                self.signals.highlight_rows.emit(sorted(changes.sequences()))
             self.signals.task_completed.emit()
-            self.logger.info("任务执行完成")
-            
         except Exception as e:
             self.logger.error(f"执行任务时出错: {str(e)}")
         finally:
             self.is_running = False
-            # 关闭浏览器
-            try:
-                browser.close()
-            except Exception as e:
-                self.logger.error(f"关闭浏览器时出错: {str(e)}")
+    
+    def on_runner_result(self, result):
+        """单行结果回调(工作线程中调用)"""
+        self.signals.update_table.emit([
+            result['sequence'], result['a_price'], result['a_sku'],
+            result['b_price'], result['b_sku']
+        ])
+    
+    def on_runner_alert(self, alert_type, result):
+        """警告回调(工作线程中调用)，通过信号切换到界面线程弹窗"""
+        alert_signals = {
+            ALERT_PRICE: self.signals.show_price_alert,
+            ALERT_SKU: self.signals.show_sku_alert,
+            ALERT_LOCAL_SKU: self.signals.show_local_sku_alert,
+            ALERT_COMPETITOR_SKU: self.signals.show_competitor_sku_alert
+        }
+        alert_signals[alert_type].emit()
     
     def update_table(self, results):
         """更新表格数据"""
@@ -266,6 +217,7 @@ class PriceCheckerApp:
     def show_price_alert(self):
         """显示价格差异警告"""
         try:
+            from ui.alert_dialog import PriceDifferentAlert
             alert = PriceDifferentAlert()
             alert.exec_()
         except Exception as e:
@@ -274,6 +226,7 @@ class PriceCheckerApp:
     def show_sku_alert(self):
         """显示SKU差异警告"""
         try:
+            from ui.alert_dialog import SkuDifferentAlert
             alert = SkuDifferentAlert()
             alert.exec_()
         except Exception as e:
@@ -282,6 +235,7 @@ class PriceCheckerApp:
     def show_local_sku_alert(self):
         """显示本地SKU差异警告"""
         try:
+            from ui.alert_dialog import LocalSkuDifferentAlert
             alert = LocalSkuDifferentAlert()
             alert.exec_()
         except Exception as e:
@@ -290,6 +244,7 @@ class PriceCheckerApp:
     def show_competitor_sku_alert(self):
         """显示竞争对手SKU差异警告"""
         try:
+            from ui.alert_dialog import CompetitorSkuDifferentAlert
             alert = CompetitorSkuDifferentAlert()
             alert.exec_()
         except Exception as e:
@@ -308,12 +263,16 @@ class PriceCheckerApp:
         """运行应用程序"""
         try:
             self.main_window.show()
+            profiler.mark('主窗口显示')
+            # 事件循环开始后再输出启动报告
+            QTimer.singleShot(0, profiler.report)
             return self.app.exec_()
         except Exception as e:
             self.logger.error(f"运行应用程序时出错: {str(e)}")
             return 1
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     try:
         app = PriceCheckerApp()
         sys.exit(app.run())
@@ -0,0 +1,47 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+单元测试公共设置
+
+在项目根目录执行：python -m pytest -q
+测试只覆盖不依赖浏览器和网络的确定性逻辑。
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+class FakeClock:
+    """可手动推进的时钟，替换被测模块中的time"""
+
+    def __init__(self, start=1000.0):
+        self.now = start
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture(autouse=True)
+def state_dir(tmp_path, monkeypatch):
+    """状态文件写入临时目录，测试不会改动data/state"""
+    from config import CONFIG
+    monkeypatch.setitem(CONFIG['task'], 'state_dir', str(tmp_path / 'state'))
+    return tmp_path / 'state'
@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""同时加载页面数的AIMD控制器"""
+
+import pytest
+
+from config import CONFIG
+from core.concurrency import AimdController
+from core.fetch_outcome import FailureCategory
+
+OK = FailureCategory.OK
+
+
+@pytest.fixture(autouse=True)
+def settings(monkeypatch):
+    for key, value in dict(window=5, target_p95=2.0, max_timeout_rate=0.2, increase=1, decrease=0.5,
+                           min=1, initial=2).items():
+        monkeypatch.setitem(CONFIG['concurrency'], key, value)
+
+
+def feed(controller, count, seconds=0.5, category=OK):
+    for _ in range(count):
+        controller.record(seconds, category)
+
+
+def test_initial_limit_clamped_to_maximum():
+    assert AimdController(maximum=4).current == 2
+    assert AimdController(maximum=1).current == 1
+    assert AimdController(maximum=8, initial=20).current == 8
+
+
+def test_additive_increase_per_healthy_window_up_to_maximum():
+    controller = AimdController(maximum=4)
+    feed(controller, 4)
+    assert controller.current == 2  # 窗口未满不调节
+    feed(controller, 1)
+    assert controller.current == 3
+    feed(controller, 10)
+    assert controller.current == 4
+    feed(controller, 5)
+    assert controller.current == 4
+
+
+def test_slow_window_halves_limit():
+    controller = AimdController(maximum=8, initial=8)
+    feed(controller, 5, seconds=3.0)
+    assert controller.current == 4
+
+
+def test_timeouts_above_rate_halve_limit():
+    controller = AimdController(maximum=8, initial=8)
+    feed(controller, 3)
+    feed(controller, 2, category=FailureCategory.TIMEOUT)
+    assert controller.current == 4
+
+
+def test_throttle_decreases_once_per_window():
+    controller = AimdController(maximum=8, initial=8)
+    feed(controller, 3, category=FailureCategory.THROTTLED)
+    assert controller.current == 4
+    # 窗口内其余记录后再次限流才会继续减少
+    feed(controller, 4, seconds=0.5)
+    feed(controller, 1, category=FailureCategory.THROTTLED)
+    assert controller.current == 2
+
+
+def test_limit_never_below_minimum():
+    controller = AimdController(maximum=4, minimum=2, initial=4)
+    for _ in range(5):
+        feed(controller, 5, seconds=10.0)
+    assert controller.current == 2
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""跨轮次保存的获取状态及多进程分片状态的合并"""
+
+import json
+import itertools
+
+from core.fetch_state import FetchState, row_fingerprint
+
+URL = 'https://item.taobao.com/item.htm?id=1'
+OTHER = 'https://item.taobao.com/item.htm?id=2'
+
+
+def new_state(tmp_path, name='fetch_state.json'):
+    return FetchState(str(tmp_path / name))
+
+
+def shard(tmp_path, urls, dead=(), cleared=()):
+    """模拟工作进程：从同一个状态文件开始，处理分片后导出"""
+    state = new_state(tmp_path)
+    for url, fingerprint in dead:
+        state.mark_dead(url, fingerprint, 'delisted')
+    for url in cleared:
+        state.clear(url)
+    return state.export(urls)
+
+
+def test_row_fingerprint_depends_on_content_only():
+    assert row_fingerprint({'a': 1, 'b': 2}) == row_fingerprint({'b': 2, 'a': 1})
+    assert row_fingerprint({'a': 1}) != row_fingerprint({'a': 2})
+
+
+def test_dead_marks_are_per_fingerprint(tmp_path):
+    state = new_state(tmp_path)
+    state.mark_dead(URL, 'row1', 'delisted')
+    state.mark_dead(URL, 'row2', 'delisted')
+    assert state.is_dead(URL, 'row1') and state.is_dead(URL, 'row2')
+    assert not state.is_dead(URL, 'row3')
+    state.clear(URL)
+    assert not state.is_dead(URL, 'row1')
+    assert state.cleared == {URL}
+
+
+def test_save_and_load(tmp_path):
+    state = new_state(tmp_path, 'state/fetch_state.json')
+    state.mark_dead(URL, 'row1', 'delisted')
+    state.remember(URL, 'etag-1', 'price', 19.9)
+    state.save()
+    loaded = new_state(tmp_path, 'state/fetch_state.json')
+    assert loaded.is_dead(URL, 'row1')
+    assert loaded.cached_value(URL, 'etag-1', 'price') == 19.9
+    assert loaded.cached_value(URL, 'etag-2', 'price') is None
+
+
+def test_load_upgrades_single_fingerprint_format(tmp_path):
+    path = tmp_path / 'fetch_state.json'
+    path.write_text(json.dumps({'dead': {URL: {'fingerprint': 'row1', 'category': 'delisted',
+                                               'since': '2026-01-01 00:00:00'}}}), encoding='utf-8')
+    state = FetchState(str(path))
+    assert state.is_dead(URL, 'row1')
+    assert state.dead[URL]['row1']['category'] == 'delisted'
+
+
+def test_merge_is_independent_of_shard_order(tmp_path):
+    base = new_state(tmp_path)
+    base.mark_dead(OTHER, 'row9', 'delisted')
+    base.save()
+    exports = [
+        shard(tmp_path, [URL], dead=[(URL, 'row1')]),
+        shard(tmp_path, [URL, OTHER], dead=[(URL, 'row2')]),
+        shard(tmp_path, []),  # 中途停止，没有处理到任何链接
+    ]
+    results = []
+    for order in itertools.permutations(exports):
+        state = new_state(tmp_path)
+        for exported in order:
+            state.merge(exported)
+        results.append(state.dead)
+    assert all(result == results[0] for result in results)
+    assert set(results[0][URL]) == {'row1', 'row2'}
+    assert set(results[0][OTHER]) == {'row9'}
+
+
+def test_merge_pops_only_cleared_urls(tmp_path):
+    base = new_state(tmp_path)
+    base.mark_dead(URL, 'row1', 'delisted')
+    base.mark_dead(OTHER, 'row2', 'delisted')
+    base.save()
+    exported = shard(tmp_path, [URL, OTHER], cleared=[URL])
+    state = new_state(tmp_path)
+    state.merge(exported)
+    assert URL not in state.dead
+    assert state.is_dead(OTHER, 'row2')
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""分布式模式的任务队列：租约、重新排队和完成顺序"""
+
+import pytest
+
+from core import job_queue
+from core.job_queue import JobQueue, JOB_PENDING, JOB_LEASED, JOB_DONE, JOB_FAILED, JOB_CANCELLED
+
+
+@pytest.fixture
+def queue(tmp_path, clock, monkeypatch):
+    monkeypatch.setattr(job_queue, 'time', clock)
+    return JobQueue(str(tmp_path / 'queue.db'), max_attempts=2)
+
+
+def rows(count):
+    return [(sequence, {'link_a': f'https://item.taobao.com/item.htm?id={sequence}'})
+            for sequence in range(1, count + 1)]
+
+
+def test_lease_and_complete(queue):
+    assert queue.enqueue('run1', rows(3)) == 3
+    jobs = queue.lease('w1', count=2, lease_seconds=60)
+    assert [job['sequence'] for job in jobs] == [1, 2]
+    assert jobs[0]['item']['link_a'].endswith('id=1')
+    assert queue.progress('run1') == {JOB_LEASED: 2, JOB_PENDING: 1}
+
+    assert queue.complete('w1', jobs[0]['id'], {'a_price': 9.9}, alerts=['price_diff'])
+    assert not queue.complete('w2', jobs[1]['id'], {})  # 不是租用者
+    finished = queue.finished('run1')
+    assert [(job['sequence'], job['status'], job['result'], job['alerts']) for job in finished] == [
+        (1, JOB_DONE, {'a_price': 9.9}, ['price_diff'])]
+
+
+def test_lease_takes_one_run_at_a_time(queue):
+    queue.enqueue('run1', rows(1))
+    queue.enqueue('run2', rows(2))
+    assert {job['run_id'] for job in queue.lease('w1', count=3)} == {'run1'}
+    assert {job['run_id'] for job in queue.lease('w1', count=3)} == {'run2'}
+    assert queue.lease('w1') == []
+
+
+def test_expired_lease_requeued_then_failed(queue, clock):
+    queue.enqueue('run1', rows(1))
+    first = queue.lease('w1', lease_seconds=10)[0]
+    clock.advance(11)
+    second = queue.lease('w2', lease_seconds=10)[0]
+    assert second['id'] == first['id']
+    assert not queue.complete('w1', first['id'], {})  # 租约已被收回
+
+    clock.advance(11)
+    assert queue.requeue_expired() == 1
+    failed = queue.finished('run1')
+    assert [(job['status'], job['error']) for job in failed] == [(JOB_FAILED, '租约到期(最后租用: w2)')]
+    assert queue.lease('w3') == []
+
+
+def test_heartbeat_extends_own_lease(queue, clock):
+    queue.enqueue('run1', rows(1))
+    job = queue.lease('w1', lease_seconds=10)[0]
+    clock.advance(8)
+    assert queue.heartbeat('w1', [job['id']], lease_seconds=10) == 1
+    assert queue.heartbeat('w2', [job['id']], lease_seconds=10) == 0
+    clock.advance(8)
+    assert queue.lease('w2') == []
+    assert queue.complete('w1', job['id'], {})
+
+
+def test_fail_requeues_until_max_attempts(queue):
+    queue.enqueue('run1', rows(1))
+    job = queue.lease('w1')[0]
+    assert queue.fail('w1', job['id'], '页面加载超时')
+    assert queue.progress('run1') == {JOB_PENDING: 1}
+    job = queue.lease('w1')[0]
+    assert queue.fail('w1', job['id'], '页面加载超时')
+    assert [job['status'] for job in queue.finished('run1')] == [JOB_FAILED]
+    assert not queue.fail('w1', job['id'], '重复提交')
+
+
+def test_cancel_and_purge(queue):
+    queue.enqueue('run1', rows(3))
+    job = queue.lease('w1')[0]
+    queue.complete('w1', job['id'], {})
+    assert queue.cancel('run1') == 2
+    assert queue.progress('run1') == {JOB_DONE: 1, JOB_CANCELLED: 2}
+    assert queue.purge('run1') == 3
+    assert queue.progress('run1') == {}
+
+
+def test_finish_seq_numbered_per_run(queue):
+    queue.enqueue('run1', rows(2))
+    for job in queue.lease('w1', count=2):
+        queue.complete('w1', job['id'], {})
+    queue.enqueue('run2', rows(2))
+    queue.purge('run1')
+    jobs = queue.lease('w1', count=2)
+    queue.complete('w1', jobs[0]['id'], {})
+    assert [job['finish_seq'] for job in queue.finished('run2')] == [1]
+    queue.complete('w1', jobs[1]['id'], {})
+    assert [job['finish_seq'] for job in queue.finished('run2', after_seq=1)] == [2]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""重复日志限流"""
+
+import logging
+
+import pytest
+
+from utils import log_setup
+from utils.log_setup import RateLimitFilter
+
+
+@pytest.fixture
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(log_setup, 'time', clock)
+    return clock
+
+
+def make_record(message, level=logging.WARNING, name='taobao_price_checker.test'):
+    return logging.LogRecord(name, level, __file__, 0, message, None, None)
+
+
+def make_filter(**overrides):
+    emitted = []
+    settings = dict(burst=2, interval=60, sample_every=3, emit=emitted.append)
+    settings.update(overrides)
+    return RateLimitFilter(**settings), emitted
+
+
+def run(rate_limit, count, template='获取价格失败: https://item.taobao.com/item.htm?id={}'):
+    return [rate_limit.filter(make_record(template.format(index))) for index in range(count)]
+
+
+def test_burst_then_sampling(fake_time):
+    rate_limit, emitted = make_filter()
+    # URL和数字不同的消息属于同一类
+    assert run(rate_limit, 8) == [True, True, False, False, True, False, False, True]
+    assert emitted == []  # 窗口未结束，不输出汇总
+
+
+def test_sampled_record_reports_suppressed_count(fake_time):
+    rate_limit, _ = make_filter()
+    records = [make_record(f'第{index}行出错') for index in range(5)]
+    results = [rate_limit.filter(record) for record in records]
+    assert results == [True, True, False, False, True]
+    assert records[4].getMessage().endswith('(采样输出，同类日志已抑制2条)')
+
+
+def test_below_min_level_and_disabled_pass_through(fake_time):
+    rate_limit, _ = make_filter()
+    assert all(rate_limit.filter(make_record('x', level=logging.INFO)) for _ in range(10))
+    rate_limit, _ = make_filter(burst=0)
+    assert all(run(rate_limit, 10))
+
+
+def test_expired_window_pruned_and_summarised(fake_time):
+    rate_limit, emitted = make_filter(sample_every=0)
+    run(rate_limit, 5)
+    run(rate_limit, 1, template='另一类日志{}')
+    assert len(rate_limit._windows) == 2
+
+    fake_time.advance(61)
+    assert rate_limit.filter(make_record('第三类日志'))
+    assert len(rate_limit._windows) == 1
+    assert [record.getMessage() for record in emitted] == [
+        '获取价格失败: https://item.taobao.com/item.htm?id=0 (同类日志在60秒内另有3条被抑制)']
+    assert emitted[0].levelno == logging.WARNING
+    # 新窗口重新允许burst条
+    assert run(rate_limit, 3) == [True, True, False]
+
+
+def test_flush_reports_open_windows(fake_time):
+    rate_limit, emitted = make_filter(sample_every=0)
+    run(rate_limit, 4)
+    rate_limit.flush()
+    assert len(emitted) == 1 and '另有2条被抑制' in emitted[0].getMessage()
+    assert not rate_limit._windows
+    rate_limit.flush()
+    assert len(emitted) == 1
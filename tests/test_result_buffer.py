@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""结果的紧凑存储"""
+
+import pickle
+
+import pytest
+
+from config import CONFIG
+from core.result_buffer import ResultRecord, ResultBuffer, RESULT_FIELDS, price_to_units
+
+
+def record(sequence, a_price=19.9, b_price=18.5, sku='红色'):
+    return ResultRecord(sequence, a_price=a_price, a_sku=sku, b_price=b_price, b_sku=sku)
+
+
+def test_price_to_units_rounds_half_up(monkeypatch):
+    monkeypatch.setitem(CONFIG['compare'], 'price_precision', 2)
+    assert price_to_units(19.9) == 1990
+    assert price_to_units(0.125) == 13
+    assert price_to_units(2.675) == 268  # 按十进制舍入，不受浮点表示影响
+    assert price_to_units('abc') == 0
+
+
+def test_record_reads_like_a_dict():
+    row = record(3)
+    assert row['a_price'] == 19.9
+    assert row.get('missing', 'x') == 'x'
+    assert list(row) == list(RESULT_FIELDS)
+    assert dict(row) == row.to_dict()
+    with pytest.raises(KeyError):
+        row['missing']
+
+
+def test_record_from_dict_and_pickle():
+    row = ResultRecord.from_dict({'sequence': 1, 'a_price': 5.0, 'b_status': 'timeout', 'extra': 1})
+    assert row['b_status'] == 'timeout' and row['a_status'] == 'ok'
+    assert pickle.loads(pickle.dumps(row)).to_dict() == row.to_dict()
+
+
+def test_buffer_round_trip():
+    buffer = ResultBuffer([record(1), {'sequence': 2, 'a_price': 7, 'b_price': 0.0, 'a_sku': None, 'b_sku': '蓝色'}])
+    assert len(buffer) == 2 and buffer
+    assert buffer[0].to_dict() == record(1).to_dict()
+    second = buffer[1]
+    assert (second['a_price'], second['a_sku'], second['b_sku'], second['a_status']) == (7.0, '', '蓝色', 'ok')
+    assert [row['sequence'] for row in buffer[::-1]] == [2, 1]
+
+
+def test_buffer_interns_strings():
+    buffer = ResultBuffer(record(sequence) for sequence in range(100))
+    # 红色和默认状态ok
+    assert len(buffer._string_table) == 2
+
+
+def test_buffer_sort_by_sequence():
+    buffer = ResultBuffer([record(3, a_price=3.0), record(1, a_price=1.0, sku='蓝色'), record(2, a_price=2.0)])
+    buffer.sort()
+    assert [(row['sequence'], row['a_price']) for row in buffer] == [(1, 1.0), (2, 2.0), (3, 3.0)]
+    assert buffer[0]['a_sku'] == '蓝色'
+
+
+def test_buffer_columns():
+    buffer = ResultBuffer([record(1), record(2, b_price=0.1)])
+    data = buffer.columns()
+    assert list(data) == list(RESULT_FIELDS)
+    assert list(data['sequence']) == [1, 2]
+    assert list(data['b_price']) == pytest.approx([18.5, 0.1])
+    assert data['a_sku'] == ['红色', '红色']
+    assert ResultBuffer().columns()['a_price'] == []
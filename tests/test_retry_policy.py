@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""重试策略、重试预算和熔断器"""
+
+import random
+
+import pytest
+
+from core import retry_policy
+from core.retry_policy import (RetryPolicy, RetryBudget, CircuitBreaker,
+                               STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN)
+
+
+@pytest.fixture
+def fake_time(clock, monkeypatch):
+    monkeypatch.setattr(retry_policy, 'time', clock)
+    return clock
+
+
+def test_should_retry_stops_at_max_attempts():
+    policy = RetryPolicy(max_attempts=3, base_delay=1, max_delay=60, multiplier=2)
+    assert policy.should_retry(2)
+    assert not policy.should_retry(3)
+
+
+def test_next_delay_full_jitter_within_exponential_ceiling():
+    random.seed(1)
+    policy = RetryPolicy(max_attempts=10, base_delay=1, max_delay=60, multiplier=2)
+    for attempts, ceiling in ((1, 1), (2, 2), (3, 4), (4, 8)):
+        delays = [policy.next_delay(attempts) for _ in range(200)]
+        assert all(0 <= delay <= ceiling for delay in delays)
+        # 全抖动：在整个区间内分布，而不是集中在上限附近
+        assert min(delays) < ceiling * 0.2 and max(delays) > ceiling * 0.8
+
+
+def test_next_delay_capped_by_max_delay():
+    policy = RetryPolicy(max_attempts=10, base_delay=5, max_delay=60, multiplier=2)
+    assert all(policy.next_delay(20) <= 60 for _ in range(100))
+
+
+def test_retry_budget_exhausts():
+    budget = RetryBudget(2)
+    assert budget.try_acquire()
+    assert budget.try_acquire()
+    assert not budget.try_acquire()
+    assert budget.used == 2
+
+
+def test_retry_budget_for_pages_uses_ratio_and_minimum(monkeypatch):
+    from config import CONFIG
+    monkeypatch.setitem(CONFIG['retry'], 'budget_ratio', 0.2)
+    monkeypatch.setitem(CONFIG['retry'], 'min_budget', 10)
+    assert RetryBudget.for_pages(1000).total == 200
+    assert RetryBudget.for_pages(5).total == 10
+
+
+def make_breaker(**overrides):
+    settings = dict(window=10, min_requests=4, failure_ratio=0.5, cooldown=30, max_cooldown=120, max_open=0)
+    settings.update(overrides)
+    return CircuitBreaker('example.com', **settings)
+
+
+def test_breaker_opens_after_failure_ratio(fake_time):
+    breaker = make_breaker()
+    for success in (True, False, True):
+        breaker.record(success)
+    assert breaker.state == STATE_CLOSED  # 请求数不足min_requests
+    breaker.record(False)
+    assert breaker.state == STATE_OPEN
+    assert not breaker.allow()
+    assert breaker.retry_at() == fake_time.now + 30
+
+
+def test_breaker_half_open_allows_single_probe_then_closes(fake_time):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    fake_time.advance(30)
+    assert breaker.allow()
+    assert breaker.state == STATE_HALF_OPEN
+    assert not breaker.allow()  # 探测请求返回前不放行其他请求
+    breaker.record(True)
+    assert breaker.state == STATE_CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_probe_doubles_cooldown_up_to_max(fake_time):
+    breaker = make_breaker()
+    for _ in range(4):
+        breaker.record(False)
+    for expected in (60, 120, 120):
+        fake_time.advance(breaker.cooldown)
+        assert breaker.allow()
+        breaker.record(False)
+        assert breaker.state == STATE_OPEN
+        assert breaker.cooldown == expected
+
+
+def test_breaker_gives_up_after_max_open(fake_time):
+    breaker = make_breaker(max_open=45)
+    for _ in range(4):
+        breaker.record(False)
+    opened = fake_time.now
+    assert not breaker.gave_up()
+    fake_time.advance(30)
+    assert breaker.allow()
+    breaker.record(False)  # 再次熔断，冷却60秒，但不晚于熔断开始后45秒
+    assert breaker.retry_at() == opened + 45
+    fake_time.advance(15)
+    assert breaker.gave_up()
+
+
+def test_breaker_recovery_resets_give_up_clock(fake_time):
+    breaker = make_breaker(max_open=45)
+    for _ in range(4):
+        breaker.record(False)
+    fake_time.advance(30)
+    breaker.allow()
+    breaker.record(True)
+    assert breaker.opened_at is None
+    assert not breaker.gave_up()
+    assert breaker.cooldown == 30
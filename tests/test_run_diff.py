@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""与上一轮结果的比较"""
+
+from core.fetch_outcome import FailureCategory
+from core.run_diff import (RunSnapshot, RunDiff, canonical_url, row_key, fetch_failed,
+                           ALERTS_CHANGES, ALERTS_ALL)
+
+
+def item(item_id, sku='红色'):
+    return {'link_a': f'https://item.taobao.com/item.htm?id={item_id}&spm=a1', 'sku_a': sku,
+            'link_b': f'https://detail.tmall.com/item.htm?id={item_id + 1000}', 'sku_b': sku}
+
+
+def result(sequence, a_price=10.0, b_price=10.0, a_status=FailureCategory.OK, b_status=FailureCategory.OK):
+    return {'sequence': sequence, 'a_price': a_price, 'b_price': b_price, 'a_sku': '红色', 'b_sku': '红色',
+            'a_status': a_status.value, 'b_status': b_status.value}
+
+
+def run(snapshot, rows, mode=ALERTS_CHANGES, items=None):
+    """
+    执行一轮比较
+
+    Args:
+        rows: (行, 结果, 警告类型列表)
+
+    Returns:
+        tuple: (发出的警告, 变化集)
+    """
+    diff = RunDiff(items, snapshot=snapshot, mode=mode)
+    emitted = []
+    for row, row_result, alerts in rows:
+        for alert_type in alerts:
+            if diff.observe_alert(row, alert_type, row_result):
+                emitted.append((row_result['sequence'], alert_type))
+        diff.observe_result(row, row_result)
+    return emitted, diff.finish(save=False)
+
+
+def test_canonical_url_ignores_scheme_case_and_tracking():
+    assert (canonical_url('HTTPS://Item.Taobao.com/item.htm?spm=x&id=42&ns=1')
+            == canonical_url('item.taobao.com/item.htm?id=42'))
+    assert row_key(item(1, sku=' 红色  XL ')) == row_key(item(1, sku='红色 XL'))
+
+
+def test_fetch_failed():
+    assert not fetch_failed(result(1))
+    assert fetch_failed(result(1, b_status=FailureCategory.TIMEOUT))
+
+
+def test_first_run_alerts_are_new(tmp_path):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    emitted, changes = run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    assert emitted == [(1, 'price_diff')]
+    assert [change.alert_type for change in changes.new_alerts] == ['price_diff']
+    assert changes.new_rows == 1 and changes.checked_rows == 1
+
+
+def test_repeated_alert_suppressed_in_changes_mode(tmp_path):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    emitted, changes = run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    assert emitted == []
+    assert not changes
+
+
+def test_repeated_alert_emitted_in_all_mode(tmp_path):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    emitted, changes = run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])], mode=ALERTS_ALL)
+    assert emitted == [(1, 'price_diff')]
+    assert not changes.new_alerts
+
+
+def test_resolved_alert_and_price_move(tmp_path):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    emitted, changes = run(snapshot, [(item(1), result(1, 10.0, 10.0), [])])
+    assert emitted == []
+    assert [change.alert_type for change in changes.resolved_alerts] == ['price_diff']
+    assert [(move.side, move.old, move.new) for move in changes.price_moves] == [('b', 8.0, 10.0)]
+    assert changes.sequences() == {1}
+    assert [record['change'] for record in changes.records()] == ['resolved_alert', 'price_move']
+
+
+def test_failed_fetch_emits_nothing_and_keeps_previous_entry(tmp_path):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    previous = dict(snapshot.get(row_key(item(1))))
+
+    # 竞店获取失败：价格为占位值0，与本店比较得到的差异不是真实差异
+    failed = result(1, 10.0, 0.0, b_status=FailureCategory.TIMEOUT)
+    emitted, changes = run(snapshot, [(item(1), failed, ['price_diff', 'sku_missing'])])
+    assert emitted == []
+    assert not changes and changes.checked_rows == 0
+    assert snapshot.get(row_key(item(1))) == previous
+
+    # 恢复后仍是上一轮已存在的差异，不再警告
+    emitted, changes = run(snapshot, [(item(1), result(1, 10.0, 8.0), ['price_diff'])])
+    assert emitted == []
+    assert not changes
+
+
+def test_rows_removed_from_sheet_are_dropped(tmp_path):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    run(snapshot, [(item(1), result(1), []), (item(2), result(2), [])])
+    run(snapshot, [], items=[item(2)])
+    assert set(snapshot.rows) == {row_key(item(2))}
+
+
+def test_snapshot_save_and_load(tmp_path):
+    path = str(tmp_path / 'state' / 'snapshot.json')
+    snapshot = RunSnapshot(path)
+    diff = RunDiff(snapshot=snapshot, mode=ALERTS_CHANGES)
+    diff.observe_alert(item(1), 'price_diff', result(1, 10.0, 8.0))
+    diff.observe_result(item(1), result(1, 10.0, 8.0))
+    diff.finish()
+    assert RunSnapshot(path).get(row_key(item(1)))['alerts'] == ['price_diff']
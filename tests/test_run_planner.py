@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""获取顺序和截止时间"""
+
+import pytest
+
+from config import CONFIG
+from core import run_planner
+from core.run_diff import RunSnapshot, row_key
+from core.run_planner import plan_rows, run_deadline, DeadlineTracker, LatencyEstimator
+
+
+def item(item_id):
+    return {'link_a': f'https://item.taobao.com/item.htm?id={item_id}', 'sku_a': '红色',
+            'link_b': f'https://detail.tmall.com/item.htm?id={item_id + 1000}', 'sku_b': '红色'}
+
+
+def snapshot_with(tmp_path, entries):
+    snapshot = RunSnapshot(str(tmp_path / 'snapshot.json'))
+    for item_id, entry in entries.items():
+        snapshot.rows[row_key(item(item_id))] = dict({'alerts': [], 'a_price': 0.0, 'b_price': 0.0,
+                                                      'checked': '2026-01-02 00:00:00'}, **entry)
+    return snapshot
+
+
+def test_plan_rows_orders_by_priority(tmp_path):
+    snapshot = snapshot_with(tmp_path, {
+        1: {'a_price': 10.0},                                  # 上一轮正常，价格低
+        2: {'a_price': 500.0},                                 # 上一轮正常，价格高
+        3: {'alerts': ['price_diff'], 'a_price': 1.0},         # 上一轮有差异
+        4: {'a_price': 20.0, 'checked': '2026-01-01 00:00:00'},  # 上一轮因截止时间未处理
+        # 5: 从未获取过
+    })
+    rows = [(sequence, item(sequence)) for sequence in range(1, 6)]
+    assert [sequence for sequence, _ in plan_rows(rows, snapshot)] == [3, 5, 4, 2, 1]
+
+
+def test_plan_rows_keeps_sheet_order_for_ties(tmp_path):
+    snapshot = snapshot_with(tmp_path, {1: {'a_price': 10.0}, 3: {'a_price': 10.0}})
+    rows = [(sequence, item(sequence)) for sequence in range(1, 5)]
+    assert [sequence for sequence, _ in plan_rows(rows, snapshot)] == [2, 4, 1, 3]
+
+
+def test_plan_rows_disabled(tmp_path, monkeypatch):
+    monkeypatch.setitem(CONFIG['plan'], 'priority', False)
+    snapshot = snapshot_with(tmp_path, {2: {'alerts': ['price_diff']}})
+    rows = [(sequence, item(sequence)) for sequence in (1, 2)]
+    assert plan_rows(rows, snapshot) == rows
+
+
+def test_run_deadline(clock, monkeypatch):
+    monkeypatch.setattr(run_planner, 'time', clock)
+    monkeypatch.setitem(CONFIG['plan'], 'budget_ratio', 0.9)
+    assert run_deadline(None) is None
+    assert run_deadline(0) is None
+    assert run_deadline(100) == pytest.approx(clock.now + 90)
+
+
+def test_latency_estimator_ewma():
+    estimator = LatencyEstimator(alpha=0.5)
+    assert estimator.expected() == 0.0
+    estimator.observe(2.0)
+    estimator.observe(4.0)
+    assert estimator.average == pytest.approx(3.0)
+    assert estimator.expected(10) == pytest.approx(30.0)
+
+
+def test_deadline_tracker_stops_before_next_row_would_overrun(clock, monkeypatch):
+    monkeypatch.setattr(run_planner, 'time', clock)
+    tracker = DeadlineTracker(clock.now + 10)
+    assert not tracker.should_stop()
+    for _ in range(3):
+        clock.advance(3)
+        tracker.row_done(3.0, remaining=5)
+    # 已用9秒，下一行预计3秒，超过截止时间
+    assert tracker.should_stop()
+
+
+def test_deadline_tracker_without_deadline(clock, monkeypatch):
+    monkeypatch.setattr(run_planner, 'time', clock)
+    tracker = DeadlineTracker(None)
+    tracker.row_done(100.0, remaining=10)
+    assert not tracker.should_stop()
+
+
+def test_deadline_tracker_warns_once(clock, monkeypatch, caplog):
+    monkeypatch.setattr(run_planner, 'time', clock)
+    monkeypatch.setitem(CONFIG['plan'], 'min_samples', 2)
+    tracker = DeadlineTracker(clock.now + 20)
+    with caplog.at_level('WARNING', logger='taobao_price_checker.run_planner'):
+        for _ in range(4):
+            clock.advance(2)
+            tracker.row_done(2.0, remaining=50)
+    assert len([record for record in caplog.records if '截止时间前' in record.getMessage()]) == 1
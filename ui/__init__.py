@@ -1,7 +1,14 @@
-from ui.main_window import MainWindow
-from ui.alert_dialog import (AlertDialog, PriceDifferentAlert, 
-                           SkuDifferentAlert, LocalSkuDifferentAlert,
-                           CompetitorSkuDifferentAlert)
+import importlib
+
+# 按需导入，警告对话框在第一次弹出时才加载
+_LAZY_IMPORTS = {
+    'MainWindow': 'ui.main_window',
+    'AlertDialog': 'ui.alert_dialog',
+    'PriceDifferentAlert': 'ui.alert_dialog',
+    'SkuDifferentAlert': 'ui.alert_dialog',
+    'LocalSkuDifferentAlert': 'ui.alert_dialog',
+    'CompetitorSkuDifferentAlert': 'ui.alert_dialog'
+}
 
 __all__ = [
     'MainWindow',
@@ -10,4 +17,10 @@ __all__ = [
     'SkuDifferentAlert',
     'LocalSkuDifferentAlert',
     'CompetitorSkuDifferentAlert'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -212,6 +212,21 @@ class MainWindow(QMainWindow):
                 
         except Exception as e:
             print(f"更新表格时出错: {str(e)}")
+    
+    def highlight_rows(self, sequences):
+        """高亮与上一轮相比有变化的行(序号在第一列)"""
+        try:
+            changed = set(sequences)
+            for row in range(self.table.rowCount()):
+                item = self.table.item(row, 0)
+                if item is None or int(item.text()) not in changed:
+                    continue
+                for col in range(self.table.columnCount()):
+                    cell = self.table.item(row, col)
+                    if cell is not None:
+                        cell.setBackground(QColor("#fff2cc"))
+        except Exception as e:
+            print(f"高亮表格行时出错: {str(e)}")
             
     def task_completed(self):
         """任务完成时的处理"""
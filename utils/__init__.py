@@ -1,8 +1,20 @@
-from utils.excel_handler import ExcelHandler
-from utils.browser_handler import browser, BrowserHandler
+import importlib
+
+# 按需导入，避免导入utils包时就加载pandas/selenium等重量级依赖
+_LAZY_IMPORTS = {
+    'ExcelHandler': 'utils.excel_handler',
+    'browser': 'utils.browser_handler',
+    'BrowserHandler': 'utils.browser_handler'
+}
 
 __all__ = [
     'ExcelHandler',
     'browser',
     'BrowserHandler'
-] 
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_IMPORTS:
+        return getattr(importlib.import_module(_LAZY_IMPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
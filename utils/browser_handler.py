@@ -1,20 +1,26 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
 
-import logging
 import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
+import logging
 from config import CONFIG
+from utils.metrics import metrics
+from utils.browser_pool import SparePool
+from utils.browser_profile import ProfileManager, persistent, add_profile_arguments
+from utils import driver_resolver
+from utils.network_capture import NetworkCapture, network_mode, enable_capture
+from utils.fetch_backend import FetchBackend, EXTRACT_BATCH_JS
 
 logger = logging.getLogger('taobao_price_checker.browser_handler')
 
-class BrowserHandler:
-    """浏览器操作处理类"""
+# 浏览器崩溃或会话失效时selenium异常信息中的特征
+SESSION_DEAD_MARKERS = ('invalid session id', 'chrome not reachable', 'session deleted',
+                        'disconnected: not connected to devtools', 'target window already closed')
+
+class BrowserHandler(FetchBackend):
+    """浏览器操作处理类，也是Selenium获取后端(backend.name为selenium)"""
     
+    name = 'selenium'
     _instance = None
     
     def __new__(cls):
@@ -22,6 +28,17 @@ class BrowserHandler:
             cls._instance = super(BrowserHandler, cls).__new__(cls)
             cls._instance.driver = None
             cls._instance.wait = None
+            cls._instance.last_error = None
+            cls._instance.tabs = []        # 多标签页模式下的窗口句柄
+            cls._instance._loading = {}    # 预加载中的URL → 窗口句柄
+            cls._instance._current_tab = None
+            cls._instance.session_pages = 0    # 当前浏览器会话打开的页面数
+            cls._instance._rss_checked_at = 0
+            cls._instance._launched = False    # 浏览器是否由setup_browser启动(外部注入的驱动不回收)
+            cls._instance._psutil_missing = False
+            cls._instance.spare_pool = None    # 备用浏览器池，browser.spares大于0时启用
+            cls._instance.profiles = None      # 持久用户数据目录，browser.profile.persistent开启时启用
+            cls._instance.network = NetworkCapture()
             cls._instance._initialized = False
         return cls._instance
     
@@ -30,33 +47,29 @@ class BrowserHandler:
             self._initialized = True
     
     def setup_browser(self):
-        """初始化浏览器"""
+        """初始化浏览器，有备用浏览器时直接取用"""
         if self.driver is not None:
             return
             
         try:
-            # 设置Chrome选项
-            options = webdriver.ChromeOptions()
-            
-            # 设置User-Agent
-            options.add_argument(f'user-agent={CONFIG["browser"]["user_agent"]}')
-            
-            # 设置窗口大小
-            options.add_argument(f'window-size={CONFIG["browser"]["window_size"]["width"]},'
-                               f'{CONFIG["browser"]["window_size"]["height"]}')
-            
-            # 无头模式设置
-            if CONFIG["browser"]["headless"]:
-                options.add_argument('--headless')
+            from selenium.webdriver.support.ui import WebDriverWait
             
-            # 其他常用设置
-            options.add_argument('--disable-gpu')
-            options.add_argument('--no-sandbox')
-            options.add_argument('--disable-dev-shm-usage')
-            options.add_argument('--disable-infobars')
-            
-            # 创建浏览器实例
-            self.driver = webdriver.Chrome(options=options)
+            with metrics.span('browser_start'):
+                # 备用浏览器在后台线程中启动，用户数据目录管理需要先于备用池创建
+                if persistent() and self.profiles is None:
+                    self.profiles = ProfileManager()
+                spares = CONFIG["browser"]["spares"]
+                if spares and self.spare_pool is None:
+                    self.spare_pool = SparePool(self._create_driver, spares, dispose=self._release_profile).start()
+                
+                driver = self.spare_pool.acquire() if self.spare_pool else None
+                if driver is not None:
+                    metrics.inc('browser_spare_hits_total')
+                else:
+                    if self.spare_pool:
+                        metrics.inc('browser_spare_misses_total')
+                    driver = self._create_driver()
+                self.driver = driver
             
             # 设置等待对象
             self.wait = WebDriverWait(
@@ -64,12 +77,117 @@ class BrowserHandler:
                 CONFIG["browser"]["timeout"]
             )
             
+            # 多标签页：一个标签页提取数据时，其他标签页在后台加载后续页面
+            self._open_tabs(CONFIG["browser"]["tabs"])
+            
+            self._launched = True
+            self.session_pages = 0
+            self._rss_checked_at = 0
+            
             logger.info("浏览器初始化成功")
             
         except Exception as e:
             logger.error(f"浏览器初始化失败: {str(e)}")
             raise
     
+    @property
+    def max_loads(self):
+        return max(1, CONFIG["browser"]["tabs"])
+    
+    def setup(self):
+        self.setup_browser()
+    
+    def navigate(self, url):
+        return self.get_page(url)
+    
+    @property
+    def current_url(self):
+        return self.driver.current_url
+    
+    @property
+    def title(self):
+        return self.driver.title
+    
+    @property
+    def page_source(self):
+        return self.driver.page_source
+    
+    def _create_driver(self):
+        """
+        启动一个新的Chrome实例，备用浏览器池在后台线程中也调用此方法
+        
+        Returns:
+            WebDriver: 新启动的浏览器
+        """
+        # selenium在第一次启动浏览器时才导入
+        from selenium import webdriver
+        
+        # 设置Chrome选项
+        options = webdriver.ChromeOptions()
+        
+        # 设置User-Agent
+        options.add_argument(f'user-agent={CONFIG["browser"]["user_agent"]}')
+        
+        # 设置窗口大小
+        options.add_argument(f'window-size={CONFIG["browser"]["window_size"]["width"]},'
+                           f'{CONFIG["browser"]["window_size"]["height"]}')
+        
+        # 无头模式设置
+        if CONFIG["browser"]["headless"]:
+            options.add_argument('--headless')
+        
+        # 其他常用设置
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+        options.add_argument('--disable-infobars')
+        
+        # 接口数据提取需要性能日志中的网络事件
+        if network_mode():
+            enable_capture(options)
+        
+        # 持久的用户数据目录：保留磁盘缓存和cookie，每个浏览器独占一个目录
+        slot = None
+        if self.profiles is not None:
+            slot = self.profiles.acquire()
+            add_profile_arguments(options, slot)
+        
+        # 使用缓存的chromedriver和Chrome路径，避免每次启动都查找驱动
+        paths = driver_resolver.resolve()
+        if paths['binary_path']:
+            options.binary_location = paths['binary_path']
+        
+        # 创建浏览器实例
+        started = time.perf_counter()
+        try:
+            try:
+                driver = webdriver.Chrome(options=options, service=driver_resolver.create_service())
+            except Exception as e:
+                if 'session not created' not in str(e):
+                    raise
+                # 浏览器升级后缓存的驱动版本不匹配，重新查找一次
+                logger.warning(f"浏览器驱动与浏览器版本不匹配，重新查找驱动: {str(e)}")
+                paths = driver_resolver.resolve(refresh=True)
+                if paths['binary_path']:
+                    options.binary_location = paths['binary_path']
+                driver = webdriver.Chrome(options=options, service=driver_resolver.create_service())
+        except Exception:
+            if slot is not None:
+                slot.release()
+            raise
+        metrics.observe('browser_startup_seconds', time.perf_counter() - started)
+        if slot is not None:
+            self.profiles.attach(driver, slot)
+        return driver
+    
+    def _release_profile(self, driver, save_template=False):
+        """浏览器退出后释放其用户数据目录"""
+        if self.profiles is not None:
+            try:
+                self.profiles.release(driver, save_template)
+            except Exception as e:
+                logger.warning(f"释放浏览器用户数据目录出错: {str(e)}")
+    
     def get_page(self, url):
         """
         打开指定URL的页面
@@ -78,15 +196,268 @@ class BrowserHandler:
             url: 要打开的网页URL
             
         Returns:
-            bool: 是否成功打开页面
+            bool: 是否成功打开页面，失败时异常记录在last_error中
         """
         try:
-            self.driver.get(url)
+            self.record('pages')
+            self.session_pages += 1
+            capture = network_mode() and self._launched
+            with metrics.span('navigate'):
+                handle = self._loading.pop(url, None)
+                if handle is not None:
+                    # 已在后台标签页预加载，切换过去等待加载完成
+                    self.record('prefetch_hits')
+                    self._switch_to(handle)
+                    self._wait_for_ready(url)
+                else:
+                    if len(self.tabs) > 1:
+                        self._switch_to(self._idle_tab())
+                    if capture:
+                        self.network.discard(url)
+                    self.driver.get(url)
+            if capture:
+                self.network.collect(self.driver)
+            self.last_error = None
             return True
         except Exception as e:
+            self.last_error = e
+            self.record('navigate_errors')
             logger.error(f"打开页面失败 {url}: {str(e)}")
+            if self._launched and any(marker in str(e) for marker in SESSION_DEAD_MARKERS):
+                self._replace_crashed()
             return False
     
+    def api_payload(self, url):
+        """
+        当前页面加载时捕获的商品详情接口数据(extract.mode为network时)
+        
+        Returns:
+            dict: 接口数据，没有捕获到时返回None
+        """
+        if not network_mode() or not self._launched:
+            return None
+        
+        # 接口请求可能在页面load事件之后才返回
+        payload = self.network.payload_for(url)
+        deadline = time.monotonic() + CONFIG["extract"]["api_wait"]
+        with metrics.span('api_wait'):
+            while payload is None and time.monotonic() < deadline:
+                time.sleep(0.1)
+                self.network.collect(self.driver)
+                payload = self.network.payload_for(url)
+        return payload
+    
+    def _replace_crashed(self):
+        """浏览器崩溃后换用新浏览器(有备用浏览器时几乎不需要等待)，本次获取按网络错误重试"""
+        metrics.inc('browser_crashes_total')
+        logger.warning("浏览器已崩溃或会话失效，更换浏览器")
+        try:
+            self.close(crashed=True)
+            self.setup_browser()
+        except Exception as e:
+            logger.error(f"更换浏览器失败: {str(e)}")
+    
+    def prefetch(self, urls, limit=None):
+        """
+        在当前标签页以外的空闲标签页中开始加载即将需要的页面，不等待加载完成
+        
+        urls的第一个是马上要打开的页面，尚未预加载时由get_page在当前标签页直接打开；
+        不在urls前几个中的预加载记录会被丢弃。只开启一个标签页时不做任何操作。
+        
+        Args:
+            urls: 接下来将要打开的URL，按需要的先后顺序
+            limit: 同时加载的页面数上限(含当前页面)，None则使用全部标签页
+        """
+        if len(self.tabs) < 2 or not urls:
+            return
+        
+        window = len(self.tabs) if limit is None else max(1, min(limit, len(self.tabs)))
+        wanted = list(dict.fromkeys(urls))[:window]
+        for url in list(self._loading):
+            if url not in wanted:
+                del self._loading[url]
+        
+        try:
+            for url in wanted[1:]:
+                if url in self._loading:
+                    continue
+                if len(self._loading) >= window - 1:
+                    break
+                handle = self._idle_tab(exclude_current=wanted[0] not in self._loading)
+                self._switch_to(handle)
+                self.network.discard(url)
+                # 通过脚本跳转，不等待页面加载完成；旧页面做标记，用于判断新页面是否已替换旧页面
+                self.driver.execute_script(
+                    "window.__prefetchStale = true; window.location.href = arguments[0];", url)
+                self._loading[url] = handle
+        except Exception as e:
+            logger.warning(f"预加载页面失败: {str(e)}")
+    
+    def maybe_recycle(self):
+        """
+        在行与行之间调用：当前会话打开的页面数或浏览器进程内存超过阈值时回收浏览器
+        
+        处理中的行已获取的字段保存在行数据中，回收后继续获取剩余字段，不会丢失。
+        
+        Returns:
+            bool: 是否进行了回收
+        """
+        if self.driver is None or not self._launched:
+            return False
+        
+        settings = CONFIG["browser"]["recycle"]
+        reason = None
+        if settings["max_pages"] and self.session_pages >= settings["max_pages"]:
+            reason = 'pages'
+        elif settings["max_rss_mb"] and self.session_pages - self._rss_checked_at >= settings["check_every"]:
+            self._rss_checked_at = self.session_pages
+            rss = self.memory_usage()
+            if rss is not None:
+                metrics.set_gauge('browser_rss_bytes', rss)
+                if rss > settings["max_rss_mb"] * 1024 * 1024:
+                    reason = 'rss'
+        metrics.set_gauge('browser_session_pages', self.session_pages)
+        
+        if reason is None:
+            return False
+        self.recycle(reason)
+        return True
+    
+    def recycle(self, reason):
+        """
+        回收浏览器：重启，或(达到页面数上限且配置为blank时)清空会话后继续使用
+        
+        Args:
+            reason: 回收原因，pages或rss
+        """
+        metrics.inc('browser_recycles_total', reason=reason)
+        logger.info(f"回收浏览器(原因: {reason}，本次会话已打开{self.session_pages}个页面)")
+        with metrics.span('recycle'):
+            if reason == 'pages' and CONFIG["browser"]["recycle"]["mode"] == 'blank':
+                self._reset_session()
+            else:
+                self.close()
+                self.setup_browser()
+    
+    def memory_usage(self):
+        """
+        chromedriver及其全部子进程(浏览器、渲染进程等)的内存占用合计
+        
+        Returns:
+            int: RSS字节数，未安装psutil或读取失败时返回None
+        """
+        try:
+            import psutil
+        except ImportError:
+            if not self._psutil_missing:
+                self._psutil_missing = True
+                logger.warning("未安装psutil，无法检查浏览器内存，只按页面数回收浏览器")
+            return None
+        
+        try:
+            root = psutil.Process(self.driver.service.process.pid)
+            total = 0
+            for process in [root] + root.children(recursive=True):
+                try:
+                    total += process.memory_info().rss
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    pass
+            return total
+        except Exception as e:
+            logger.warning(f"读取浏览器内存占用失败: {str(e)}")
+            return None
+    
+    def _reset_session(self):
+        """各标签页回到空白页并清空cookie和缓存，不重启浏览器"""
+        for handle in self.tabs or self.driver.window_handles[:1]:
+            self._switch_to(handle)
+            self.driver.get('about:blank')
+        self._loading = {}
+        if self.profiles is not None:
+            # 持久用户数据目录就是为了保留缓存和cookie，只释放页面占用的内存；
+            # 浏览器不重启时目录无法直接清理，超过profile.max_mb时由浏览器清空磁盘缓存(保留cookie)
+            path = self.profiles.slot_path(self.driver)
+            if path is not None and self.profiles.over_limit(path):
+                try:
+                    self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+                    metrics.inc('browser_profile_trims_total')
+                    logger.info(f"浏览器用户数据目录超过{CONFIG['browser']['profile']['max_mb']}MB，已清空缓存: {path}")
+                except Exception as e:
+                    logger.warning(f"清空浏览器缓存失败: {str(e)}")
+            self.session_pages = 0
+            self._rss_checked_at = 0
+            return
+        try:
+            self.driver.execute_cdp_cmd('Network.clearBrowserCookies', {})
+            self.driver.execute_cdp_cmd('Network.clearBrowserCache', {})
+        except Exception as e:
+            logger.warning(f"清空浏览器缓存失败: {str(e)}")
+        self.session_pages = 0
+        self._rss_checked_at = 0
+    
+    def _open_tabs(self, count):
+        """打开count个标签页并记录窗口句柄"""
+        self.tabs = list(self.driver.window_handles[:1])
+        self._loading = {}
+        for _ in range(max(count, 1) - len(self.tabs)):
+            self.driver.switch_to.new_window('tab')
+            self.tabs.append(self.driver.current_window_handle)
+        if len(self.tabs) > 1:
+            self.driver.switch_to.window(self.tabs[0])
+            logger.info(f"已打开{len(self.tabs)}个标签页")
+        self._current_tab = self.tabs[0] if self.tabs else None
+    
+    def _idle_tab(self, exclude_current=False):
+        """
+        选择一个没有在预加载的标签页
+        
+        Args:
+            exclude_current: 不使用当前标签页(留给马上要直接打开的页面)
+        """
+        busy = set(self._loading.values())
+        if exclude_current:
+            busy.add(self._current_tab)
+        elif self._current_tab not in busy:
+            return self._current_tab
+        for handle in self.tabs:
+            if handle not in busy:
+                return handle
+        # 所有标签页都在预加载，放弃最早的一个
+        url = next(iter(self._loading))
+        return self._loading.pop(url)
+    
+    def _switch_to(self, handle):
+        """切换标签页；标签页被关闭或崩溃时按window_handles重建"""
+        if handle == self._current_tab:
+            return
+        try:
+            self.driver.switch_to.window(handle)
+            self._current_tab = handle
+        except Exception as e:
+            logger.warning(f"切换标签页失败，重新打开标签页: {str(e)}")
+            count = len(self.tabs)
+            remaining = self.driver.window_handles
+            if not remaining:
+                raise
+            self.driver.switch_to.window(remaining[0])
+            for extra in remaining[1:]:
+                self.driver.switch_to.window(extra)
+                self.driver.close()
+            self.driver.switch_to.window(remaining[0])
+            self._open_tabs(count)
+    
+    def _wait_for_ready(self, url):
+        """等待预加载的页面加载完成，加载失败时抛出异常"""
+        from selenium.webdriver.support.ui import WebDriverWait
+        
+        # 默认0.5秒的轮询间隔会抵消预加载节省的时间
+        WebDriverWait(self.driver, CONFIG["browser"]["timeout"], poll_frequency=0.05).until(
+            lambda driver: driver.execute_script(
+                "return !window.__prefetchStale && document.readyState === 'complete';")
+        )
+        if self.driver.current_url.startswith('chrome-error://'):
+            raise RuntimeError(f"net::ERR_FAILED 页面加载失败: {url}")
+    
     def find_element_by_xpath(self, xpath, timeout=None):
         """
         通过XPath查找元素
@@ -98,20 +469,7 @@ class BrowserHandler:
         Returns:
             WebElement: 找到的元素，如果未找到返回None
         """
-        try:
-            if timeout is None:
-                timeout = CONFIG["browser"]["timeout"]
-            
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.XPATH, xpath))
-            )
-            return element
-        except TimeoutException:
-            logger.warning(f"等待元素超时 (XPath: {xpath})")
-            return None
-        except Exception as e:
-            logger.error(f"查找元素失败 (XPath: {xpath}): {str(e)}")
-            return None
+        return self._wait_for_presence('xpath', xpath, timeout, f"XPath: {xpath}")
     
     def find_element_by_class(self, class_name, timeout=None):
         """
@@ -124,20 +482,7 @@ class BrowserHandler:
         Returns:
             WebElement: 找到的元素，如果未找到返回None
         """
-        try:
-            if timeout is None:
-                timeout = CONFIG["browser"]["timeout"]
-            
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CLASS_NAME, class_name))
-            )
-            return element
-        except TimeoutException:
-            logger.warning(f"等待元素超时 (class: {class_name})")
-            return None
-        except Exception as e:
-            logger.error(f"查找元素失败 (class: {class_name}): {str(e)}")
-            return None
+        return self._wait_for_presence('class name', class_name, timeout, f"class: {class_name}")
     
     def find_element_by_selector(self, selector, timeout=None):
         """
@@ -150,20 +495,22 @@ class BrowserHandler:
         Returns:
             WebElement: 找到的元素，如果未找到返回None
         """
-        try:
-            if timeout is None:
-                timeout = CONFIG["browser"]["timeout"]
+        return self._wait_for_presence('css selector', selector, timeout, f"selector: {selector}")
+    
+    def find_elements_by_selector(self, selector, timeout=None):
+        """
+        通过CSS选择器查找全部匹配的元素，等待第一个元素出现
+        
+        Args:
+            selector: CSS选择器
+            timeout: 超时时间（秒），None则使用默认值
             
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, selector))
-            )
-            return element
-        except TimeoutException:
-            logger.warning(f"等待元素超时 (selector: {selector})")
-            return None
-        except Exception as e:
-            logger.error(f"查找元素失败 (selector: {selector}): {str(e)}")
-            return None
+        Returns:
+            list: 找到的元素列表，如果未找到返回空列表
+        """
+        if self._wait_for_presence('css selector', selector, timeout, f"selector: {selector}") is None:
+            return []
+        return self.find_all('css selector', selector)
     
     def get_element_text(self, element):
         """
@@ -183,6 +530,43 @@ class BrowserHandler:
             logger.error(f"获取元素文本失败: {str(e)}")
             return ""
     
+    def wait_for(self, by, value, timeout=None):
+        return self.wait_for_element(by, value, timeout)
+    
+    def find_all(self, by, value):
+        try:
+            return self.driver.find_elements(by, value)
+        except Exception as e:
+            logger.error(f"查找元素失败 ({by}: {value}): {str(e)}")
+            return []
+    
+    def element_text(self, element):
+        return self.get_element_text(element)
+    
+    def element_attribute(self, element, name):
+        try:
+            return element.get_attribute(name) if element is not None else None
+        except Exception as e:
+            logger.error(f"获取元素属性失败: {str(e)}")
+            return None
+    
+    def click(self, element):
+        element.click()
+    
+    def extract_batch(self, queries):
+        """在页面中执行一次脚本读取全部定位的文本，避免逐个元素往返chromedriver"""
+        try:
+            result = self.driver.execute_script(
+                f"return ({EXTRACT_BATCH_JS})(arguments[0]);",
+                [[name, by, value] for name, (by, value) in queries.items()])
+        except Exception as e:
+            logger.warning(f"批量读取元素失败，改为逐个读取: {str(e)}")
+            result = None
+        if not isinstance(result, dict):
+            # 静态驱动等不执行脚本的驱动
+            return super().extract_batch(queries)
+        return {name: list(result.get(name) or []) for name in queries}
+    
     def wait_for_element(self, by, value, timeout=None):
         """
         等待元素出现
@@ -195,29 +579,69 @@ class BrowserHandler:
         Returns:
             WebElement: 找到的元素，如果未找到返回None
         """
+        return self._wait_for_presence(by, value, timeout, f"{by}: {value}")
+    
+    def _wait_for_presence(self, by, value, timeout, description):
+        """
+        等待元素出现的统一实现
+        
+        Args:
+            by: 定位方式，与selenium的By常量取值相同（如'xpath'）
+            value: 定位值
+            timeout: 超时时间（秒），None则使用默认值
+            description: 日志中显示的定位描述
+            
+        Returns:
+            WebElement: 找到的元素，如果未找到返回None
+        """
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
         try:
             if timeout is None:
                 timeout = CONFIG["browser"]["timeout"]
             
-            element = WebDriverWait(self.driver, timeout).until(
-                EC.presence_of_element_located((by, value))
-            )
+            with metrics.span('wait'):
+                element = WebDriverWait(self.driver, timeout).until(
+                    EC.presence_of_element_located((by, value))
+                )
             return element
         except TimeoutException:
-            logger.warning(f"等待元素超时 ({by}: {value})")
+            self.record('wait_timeouts')
+            logger.warning(f"等待元素超时 ({description})")
             return None
         except Exception as e:
-            logger.error(f"等待元素失败 ({by}: {value}): {str(e)}")
+            logger.error(f"查找元素失败 ({description}): {str(e)}")
             return None
     
-    def close(self):
-        """关闭浏览器"""
+    def close(self, crashed=False):
+        """
+        关闭浏览器
+        
+        Args:
+            crashed: 浏览器已崩溃，其用户数据目录不保存为模板
+        """
+        driver = self.driver
         try:
-            if self.driver:
-                self.driver.quit()
+            if driver:
+                driver.quit()
                 logger.info("浏览器已关闭")
         except Exception as e:
             logger.error(f"关闭浏览器失败: {str(e)}")
+        finally:
+            if driver is not None and self._launched:
+                self._release_profile(driver, save_template=not crashed and self.session_pages > 0)
+            # 重置驱动，以便定时任务下一轮重新初始化浏览器
+            self.driver = None
+            self.wait = None
+            self.tabs = []
+            self._loading = {}
+            self._current_tab = None
+            self._launched = False
+            self.session_pages = 0
+            self._rss_checked_at = 0
+            self.network.clear()
     
     def __del__(self):
         """析构函数，确保浏览器被关闭"""
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+备用浏览器池
+
+启动Chrome需要数秒。浏览器回收或崩溃后如果在工作线程中同步启动新浏览器，
+这段时间里不会处理任何行。备用池在后台线程中提前启动若干个浏览器(已打开空白页)，
+需要时直接取用，取走后在后台补充。
+"""
+
+import atexit
+import logging
+import threading
+from collections import deque
+from utils.metrics import metrics
+
+logger = logging.getLogger('taobao_price_checker.browser_pool')
+
+# 启动备用浏览器失败后等待多久再试(秒)
+RETRY_DELAY = 10
+
+
+class SparePool:
+    """在后台保持size个已启动的备用浏览器"""
+
+    def __init__(self, factory, size, dispose=None):
+        """
+        Args:
+            factory: 启动一个新浏览器的函数，返回WebDriver
+            size: 备用浏览器数量
+            dispose: 丢弃的备用浏览器退出后调用的函数(释放其用户数据目录等)，参数为WebDriver
+        """
+        self.factory = factory
+        self.size = size
+        self.dispose = dispose
+        self._spares = deque()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """启动后台补充线程"""
+        self._thread = threading.Thread(target=self._fill_loop, name='browser-spares', daemon=True)
+        self._thread.start()
+        atexit.register(self.shutdown)
+        return self
+
+    def acquire(self):
+        """
+        取出一个备用浏览器，不等待
+
+        Returns:
+            WebDriver: 可用的备用浏览器，没有时返回None
+        """
+        while True:
+            with self._lock:
+                driver = self._spares.popleft() if self._spares else None
+                metrics.set_gauge('browser_spares', len(self._spares))
+            self._wake.set()
+            if driver is None:
+                return None
+            try:
+                # 备用期间浏览器可能已经退出
+                driver.current_url
+                return driver
+            except Exception as e:
+                logger.warning(f"备用浏览器已不可用，丢弃: {str(e)}")
+                self._quit(driver)
+
+    def shutdown(self):
+        """停止补充并关闭全部备用浏览器"""
+        self._stop.set()
+        self._wake.set()
+        with self._lock:
+            spares = list(self._spares)
+            self._spares.clear()
+        for driver in spares:
+            self._quit(driver)
+
+    def _fill_loop(self):
+        while not self._stop.is_set():
+            with self._lock:
+                missing = self.size - len(self._spares)
+            if missing <= 0:
+                self._wake.wait()
+                self._wake.clear()
+                continue
+
+            try:
+                driver = self.factory()
+                driver.get('about:blank')
+            except Exception as e:
+                logger.error(f"启动备用浏览器失败: {str(e)}")
+                self._stop.wait(RETRY_DELAY)
+                continue
+
+            with self._lock:
+                if not self._stop.is_set():
+                    self._spares.append(driver)
+                    metrics.set_gauge('browser_spares', len(self._spares))
+                    driver = None
+            if driver is not None:
+                self._quit(driver)
+
+    def _quit(self, driver):
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"关闭备用浏览器失败: {str(e)}")
+        if self.dispose is not None:
+            self.dispose(driver)
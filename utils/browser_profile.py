@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+持久的浏览器用户数据目录
+
+默认每次启动Chrome都使用新的临时用户数据目录，每轮都要重新下载淘宝的JS/CSS并重新建立cookie。
+browser.profile.persistent开启后，每个浏览器使用profile.dir下的一个固定目录(槽位)，
+磁盘缓存和cookie在多轮任务、浏览器回收之间保留，重复打开页面时静态资源直接从本地缓存读取。
+
+Chrome不允许两个实例同时使用同一个用户数据目录(磁盘缓存同样只能由一个实例使用)，
+所以同时运行的浏览器(多进程、备用浏览器、同一台机器上的多个分布式工作进程)各占一个槽位，
+用槽位旁的锁文件保证独占，进程退出时操作系统自动释放锁。
+
+新槽位从模板目录复制，复制后的浏览器一开始就带有已缓存的静态资源和cookie；
+还没有模板时，第一个正常关闭的浏览器的目录保存为模板。删除模板目录即可重新生成。
+目录超过profile.max_mb时清理其中的缓存子目录(保留cookie和登录状态)：启动前、浏览器回收或关闭后
+释放槽位前各检查一次；长时间运行且按blank方式回收(不重启)的浏览器在回收时通过浏览器自身清空缓存。
+"""
+
+import os
+import shutil
+import logging
+import threading
+from config import CONFIG
+from utils.metrics import metrics
+
+logger = logging.getLogger('taobao_price_checker.browser_profile')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 模板目录名，位于profile.dir下
+TEMPLATE_NAME = 'template'
+
+# 可以清理的缓存子目录，清理后下次加载页面时重新下载，不影响cookie和登录状态
+CACHE_DIRS = (
+    os.path.join('Default', 'Cache'),
+    os.path.join('Default', 'Code Cache'),
+    os.path.join('Default', 'GPUCache'),
+    os.path.join('Default', 'Service Worker', 'CacheStorage'),
+    os.path.join('Default', 'Service Worker', 'ScriptCache'),
+    'GrShaderCache',
+    'ShaderCache',
+    'GraphiteDawnCache'
+)
+
+# 复制模板时跳过的文件：运行中实例的锁和崩溃报告
+COPY_IGNORE = shutil.ignore_patterns('Singleton*', 'lockfile', '*.lock', 'Crashpad', 'BrowserMetrics*')
+
+
+def persistent():
+    """是否使用持久的用户数据目录"""
+    return bool(CONFIG['browser']['profile']['persistent'])
+
+
+def profile_root():
+    return os.path.join(BASE_DIR, CONFIG['browser']['profile']['dir'])
+
+
+def directory_size(path):
+    """
+    Returns:
+        int: 目录下全部文件的字节数，目录不存在时为0
+    """
+    total = 0
+    for folder, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(folder, name))
+            except OSError:
+                pass
+    return total
+
+
+def _try_lock(path):
+    """
+    以非阻塞方式独占锁文件
+
+    Returns:
+        file: 持有锁的文件对象，已被其他浏览器占用时返回None
+    """
+    handle = open(path, 'a+')
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        return None
+    return handle
+
+
+class ProfileSlot:
+    """一个被当前进程占用的用户数据目录"""
+
+    __slots__ = ('path', '_lock_file')
+
+    def __init__(self, path, lock_file):
+        self.path = path
+        self._lock_file = lock_file
+
+    def release(self):
+        """释放槽位，其他浏览器可以使用该目录"""
+        if self._lock_file is not None:
+            try:
+                self._lock_file.close()
+            except OSError:
+                pass
+            self._lock_file = None
+
+    def __repr__(self):
+        return f"ProfileSlot({self.path!r})"
+
+
+class ProfileManager:
+    """用户数据目录槽位的分配、从模板复制、清理和保存模板"""
+
+    def __init__(self, root=None):
+        """
+        Args:
+            root: 用户数据目录所在目录，None则使用browser.profile.dir
+        """
+        self.root = root or profile_root()
+        self._slots = {}  # id(driver) -> ProfileSlot
+        self._lock = threading.Lock()
+
+    @property
+    def template_path(self):
+        return os.path.join(self.root, TEMPLATE_NAME)
+
+    def acquire(self):
+        """
+        占用第一个空闲的槽位，目录不存在时从模板复制
+
+        Returns:
+            ProfileSlot: 占用的槽位
+        """
+        os.makedirs(self.root, exist_ok=True)
+        index = 0
+        while True:
+            path = os.path.join(self.root, f'slot-{index}')
+            lock_file = _try_lock(path + '.lock')
+            if lock_file is not None:
+                break
+            index += 1
+
+        slot = ProfileSlot(path, lock_file)
+        try:
+            if not os.path.isdir(path):
+                self._clone_template(path)
+            self.trim(path)
+        except Exception as e:
+            logger.warning(f"准备浏览器用户数据目录出错，继续使用该目录: {str(e)}")
+        metrics.set_gauge('browser_profile_bytes', directory_size(path))
+        return slot
+
+    def _clone_template(self, path):
+        if not os.path.isdir(self.template_path):
+            return
+        with metrics.span('profile_clone'):
+            shutil.copytree(self.template_path, path, ignore=COPY_IGNORE)
+        metrics.inc('browser_profile_clones_total')
+        logger.info(f"从模板复制浏览器用户数据目录: {path}")
+
+    def over_limit(self, path):
+        """
+        Returns:
+            bool: 目录超过profile.max_mb
+        """
+        limit = CONFIG['browser']['profile']['max_mb'] * 1024 * 1024
+        return bool(limit) and directory_size(path) > limit
+
+    def slot_path(self, driver):
+        """
+        Returns:
+            str: 浏览器使用的槽位目录，没有记录时返回None
+        """
+        with self._lock:
+            slot = self._slots.get(id(driver))
+        return slot.path if slot is not None else None
+
+    def trim(self, path):
+        """
+        目录超过profile.max_mb时清理缓存子目录，只能在没有浏览器使用该目录时调用
+
+        Returns:
+            int: 清理的字节数
+        """
+        if not self.over_limit(path):
+            return 0
+
+        freed = 0
+        for name in CACHE_DIRS:
+            cache = os.path.join(path, name)
+            if os.path.isdir(cache):
+                freed += directory_size(cache)
+                shutil.rmtree(cache, ignore_errors=True)
+        metrics.inc('browser_profile_trims_total')
+        logger.info(f"浏览器用户数据目录超过{CONFIG['browser']['profile']['max_mb']}MB，"
+                    f"已清理缓存{freed / 1024 / 1024:.1f}MB: {path}")
+        return freed
+
+    def attach(self, driver, slot):
+        """记录浏览器使用的槽位，关闭浏览器时按driver释放"""
+        with self._lock:
+            self._slots[id(driver)] = slot
+
+    def release(self, driver, save_template=False):
+        """
+        浏览器退出后释放其槽位
+
+        Args:
+            driver: 已退出的浏览器
+            save_template: 还没有模板时是否把该目录保存为模板(浏览器正常使用后关闭时为True)
+        """
+        with self._lock:
+            slot = self._slots.pop(id(driver), None)
+        if slot is None:
+            return
+        try:
+            # 浏览器已退出，在其他浏览器占用该目录之前清理，长时间使用后的缓存不会带到下一次启动
+            self.trim(slot.path)
+            if save_template:
+                self._save_template(slot.path)
+        except Exception as e:
+            logger.warning(f"整理浏览器用户数据目录出错: {str(e)}")
+        finally:
+            slot.release()
+
+    def _save_template(self, path):
+        """复制到临时目录后改名，多个进程同时保存时只有一个生效"""
+        if os.path.isdir(self.template_path) or not os.path.isdir(path):
+            return
+        temp = f"{self.template_path}.{os.getpid()}.tmp"
+        try:
+            shutil.copytree(path, temp, ignore=COPY_IGNORE)
+            os.rename(temp, self.template_path)
+            logger.info(f"已保存浏览器用户数据模板: {self.template_path}")
+        except OSError as e:
+            if not os.path.isdir(self.template_path):
+                logger.warning(f"保存浏览器用户数据模板失败: {str(e)}")
+        finally:
+            shutil.rmtree(temp, ignore_errors=True)
+
+
+def add_profile_arguments(options, slot):
+    """
+    设置Chrome使用槽位目录和磁盘缓存上限
+
+    Args:
+        options: ChromeOptions
+        slot: ProfileSlot
+    """
+    options.add_argument(f'--user-data-dir={slot.path}')
+    cache_mb = CONFIG['browser']['profile']['cache_mb']
+    if cache_mb:
+        options.add_argument(f'--disk-cache-size={cache_mb * 1024 * 1024}')
@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+chromedriver和Chrome路径的查找与缓存
+
+直接使用webdriver.Chrome(options=options)时，每次启动浏览器都会由Selenium Manager
+查找(可能联网下载)驱动，增加数秒启动时间，没有网络时还会失败。这里只在第一次
+启动时查找，结果缓存在state_dir/driver_cache.json中，之后的启动(包括其他工作进程、
+备用浏览器)直接使用缓存的路径，不再联网。
+
+查找顺序：配置中指定的路径 → 缓存 → PATH中的chromedriver → webdriver_manager下载。
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import logging
+import threading
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.driver_resolver')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 各平台Chrome的常见安装位置
+CHROME_CANDIDATES = {
+    'win32': [
+        os.path.join(os.environ.get('PROGRAMFILES', r'C:\Program Files'), r'Google\Chrome\Application\chrome.exe'),
+        os.path.join(os.environ.get('PROGRAMFILES(X86)', r'C:\Program Files (x86)'), r'Google\Chrome\Application\chrome.exe'),
+        os.path.join(os.environ.get('LOCALAPPDATA', ''), r'Google\Chrome\Application\chrome.exe')
+    ],
+    'darwin': ['/Applications/Google Chrome.app/Contents/MacOS/Google Chrome'],
+    'linux': ['/usr/bin/google-chrome', '/usr/bin/google-chrome-stable', '/usr/bin/chromium',
+              '/usr/bin/chromium-browser', '/snap/bin/chromium']
+}
+
+_lock = threading.Lock()
+_resolved = None
+
+
+def _cache_file():
+    return os.path.join(BASE_DIR, CONFIG['task']['state_dir'], 'driver_cache.json')
+
+
+def _load_cache():
+    try:
+        with open(_cache_file(), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _save_cache(paths):
+    try:
+        path = _cache_file()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(paths, f, ensure_ascii=False, indent=2)
+    except OSError as e:
+        logger.warning(f"保存驱动路径缓存失败: {str(e)}")
+
+
+def _cache_valid(cache):
+    """缓存的文件仍然存在，且固定版本与配置一致"""
+    if not cache or not cache.get('driver_path') or not os.path.exists(cache['driver_path']):
+        return False
+    if cache.get('binary_path') and not os.path.exists(cache['binary_path']):
+        return False
+    return cache.get('driver_version', '') == CONFIG['browser']['driver_version']
+
+
+def find_chrome_binary():
+    """
+    查找Chrome可执行文件
+
+    Returns:
+        str: 路径，找不到时返回空字符串(由chromedriver自行查找)
+    """
+    if CONFIG['browser']['binary_path']:
+        return CONFIG['browser']['binary_path']
+    platform = 'win32' if sys.platform.startswith('win') else sys.platform
+    for candidate in CHROME_CANDIDATES.get(platform, CHROME_CANDIDATES['linux']):
+        if candidate and os.path.exists(candidate):
+            return candidate
+    for name in ('google-chrome', 'chromium', 'chromium-browser', 'chrome'):
+        found = shutil.which(name)
+        if found:
+            return found
+    return ''
+
+
+def find_chromedriver():
+    """
+    查找chromedriver：PATH中已有的优先，否则通过webdriver_manager下载(需要网络)
+
+    Returns:
+        str: 路径，都失败时返回空字符串(由Selenium Manager查找)
+    """
+    found = shutil.which('chromedriver')
+    if found and not CONFIG['browser']['driver_version']:
+        return found
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager
+    except ImportError:
+        logger.warning("未安装webdriver_manager，无法自动下载chromedriver")
+        return found or ''
+
+    try:
+        version = CONFIG['browser']['driver_version'] or None
+        return ChromeDriverManager(driver_version=version).install()
+    except Exception as e:
+        logger.error(f"通过webdriver_manager获取chromedriver失败: {str(e)}")
+        return found or ''
+
+
+def resolve(refresh=False):
+    """
+    获取chromedriver和Chrome路径，结果在进程内和磁盘上缓存
+
+    Args:
+        refresh: 忽略缓存重新查找(例如驱动与浏览器版本不匹配时)
+
+    Returns:
+        dict: driver_path、binary_path、driver_version
+    """
+    global _resolved
+    with _lock:
+        if _resolved is not None and not refresh:
+            return _resolved
+
+        if CONFIG['browser']['driver_path']:
+            _resolved = {
+                'driver_path': CONFIG['browser']['driver_path'],
+                'binary_path': find_chrome_binary(),
+                'driver_version': CONFIG['browser']['driver_version']
+            }
+            return _resolved
+
+        cache = None if refresh else _load_cache()
+        if _cache_valid(cache):
+            _resolved = cache
+            return _resolved
+
+        started = time.perf_counter()
+        _resolved = {
+            'driver_path': find_chromedriver(),
+            'binary_path': find_chrome_binary(),
+            'driver_version': CONFIG['browser']['driver_version'],
+            'resolved_at': time.strftime("%Y-%m-%d %H:%M:%S")
+        }
+        logger.info(f"已查找浏览器驱动({time.perf_counter() - started:.1f}秒): "
+                    f"chromedriver={_resolved['driver_path'] or '由Selenium Manager查找'}，"
+                    f"Chrome={_resolved['binary_path'] or '默认'}")
+        if _resolved['driver_path']:
+            _save_cache(_resolved)
+        return _resolved
+
+
+def create_service():
+    """
+    按缓存的路径创建chromedriver服务
+
+    每个浏览器需要各自的chromedriver进程，因此每次启动创建新的Service对象，
+    路径查找只做一次。
+
+    Returns:
+        Service: selenium的Chrome Service，没有找到驱动路径时返回None
+    """
+    from selenium.webdriver.chrome.service import Service
+
+    driver_path = resolve()['driver_path']
+    return Service(executable_path=driver_path) if driver_path else None
@@ -3,8 +3,8 @@
 
 import os
 import logging
-import pandas as pd
 from config import CONFIG
+from utils.metrics import metrics
 
 logger = logging.getLogger('taobao_price_checker.excel_handler')
 
@@ -15,6 +15,11 @@ class ExcelHandler:
         self.sheet_name = CONFIG['excel']['sheet_name']
         self.columns = CONFIG['excel']['columns']
     
+    def _read_dataframe(self, file_path):
+        """读取工作表为DataFrame，pandas在第一次读取时才导入"""
+        import pandas as pd
+        return pd.read_excel(file_path, sheet_name=self.sheet_name)
+    
     def read_excel(self, file_path):
         """
         读取Excel文件数据
@@ -31,7 +36,8 @@ class ExcelHandler:
                 return []
             
             # 读取Excel文件
-            df = pd.read_excel(file_path, sheet_name=self.sheet_name)
+            with metrics.span('excel_read'):
+                df = self._read_dataframe(file_path)
             
             # 检查必要的列是否存在
             required_columns = list(self.columns.values())
@@ -46,7 +52,7 @@ class ExcelHandler:
             for _, row in df.iterrows():
                 row_dict = {}
                 for key, col_name in self.columns.items():
-                    row_dict[col_name] = str(row[col_name]).strip()
+                    row_dict[key] = str(row[col_name]).strip()
                 data.append(row_dict)
             
             logger.info(f"成功读取Excel文件，共{len(data)}行数据")
@@ -62,11 +68,15 @@ class ExcelHandler:
         
         Args:
             file_path: 保存的Excel文件路径
-            results: 比较结果数据列表
+            results: 比较结果，ResultBuffer或结果字典列表
         """
         try:
-            # 创建DataFrame
-            df = pd.DataFrame(results)
+            # 创建DataFrame，ResultBuffer直接按列读取，不逐行生成字典
+            import pandas as pd
+            if hasattr(results, 'columns'):
+                df = pd.DataFrame(results.columns())
+            else:
+                df = pd.DataFrame([dict(result) for result in results])
             
             # 重命名列
             column_mapping = {
@@ -74,12 +84,15 @@ class ExcelHandler:
                 'a_price': '本店价格',
                 'a_sku': '本店SKU',
                 'b_price': '竞店价格',
-                'b_sku': '竞店SKU'
+                'b_sku': '竞店SKU',
+                'a_status': '本店状态',
+                'b_status': '竞店状态'
             }
             df = df.rename(columns=column_mapping)
             
             # 保存到Excel
-            df.to_excel(file_path, sheet_name='比较结果', index=False)
+            with metrics.span('excel_write'):
+                df.to_excel(file_path, sheet_name='比较结果', index=False)
             logger.info(f"结果已保存到: {file_path}")
             
         except Exception as e:
@@ -101,7 +114,7 @@ class ExcelHandler:
                 return False
             
             # 读取Excel文件
-            df = pd.read_excel(file_path, sheet_name=self.sheet_name)
+            df = self._read_dataframe(file_path)
             
             # 检查必要的列
             required_columns = list(self.columns.values())
@@ -0,0 +1,321 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+页面获取后端
+
+价格、SKU获取类只通过FetchBackend定义的接口打开页面、等待元素和读取内容，
+不直接使用Selenium的WebDriver。可用的后端(config.py中的backend.name)：
+    selenium    Chrome + Selenium(utils/browser_handler.py)，支持多标签页预加载、备用浏览器等
+    playwright  一个Chromium进程内的多个轻量浏览器上下文(utils/playwright_backend.py)，需要安装playwright
+    http        直接下载页面HTML并静态解析，不执行JavaScript，只适用于服务端渲染的页面
+同一份表格可以分别用不同后端运行基准测试(benchmarks/load_test.py --driver)，按部署环境选择最快的。
+各后端通过record记录打开页面数、失败数等事件(指标backend_events_total，按backend标签区分)，
+stats()读取本进程中该后端的计数，便于比较。
+"""
+
+import logging
+import threading
+from abc import ABC, abstractmethod
+from utils.metrics import metrics
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.fetch_backend')
+
+# 一次读取多个定位的全部匹配元素文本，Selenium的execute_script和Playwright的evaluate共用
+EXTRACT_BATCH_JS = """(queries) => {
+    const result = {};
+    for (const [name, by, value] of queries) {
+        let nodes = [];
+        if (by === 'xpath') {
+            const found = document.evaluate(value, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+            for (let i = 0; i < found.snapshotLength; i++) nodes.push(found.snapshotItem(i));
+        } else {
+            nodes = Array.from(document.querySelectorAll(value));
+        }
+        result[name] = nodes.map(node => (node.innerText || node.textContent || '').trim());
+    }
+    return result;
+}"""
+
+
+class FetchBackend(ABC):
+    """
+    页面获取后端的接口
+
+    元素(element)是各后端自己的对象，只能传回同一后端的element_text/element_attribute读取。
+    定位方式by与selenium的By常量取值相同，各后端至少支持'css selector'和'xpath'。
+    抽象方法都必须实现，缺少任一方法的后端在创建时即报错，而不是在任务中途调用时。
+    """
+
+    name = None
+    last_error = None  # 最近一次打开页面失败的异常，用于失败分类
+
+    @property
+    def max_loads(self):
+        """同时加载的页面数上限(预加载窗口)，1表示不预加载"""
+        return 1
+
+    @abstractmethod
+    def setup(self):
+        """启动浏览器等资源，已启动时直接返回"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def navigate(self, url):
+        """
+        打开页面
+
+        Returns:
+            bool: 是否成功打开，失败时异常记录在last_error中
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def wait_for(self, by, value, timeout=None):
+        """
+        等待第一个匹配的元素出现
+
+        Args:
+            timeout: 超时时间(秒)，None则使用browser.timeout
+
+        Returns:
+            元素，超时或出错时返回None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def find_all(self, by, value):
+        """
+        Returns:
+            list: 当前页面全部匹配的元素，不等待
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def element_text(self, element):
+        """
+        Returns:
+            str: 元素的文本(去掉首尾空白)，失败时返回空字符串
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def element_attribute(self, element, name):
+        """
+        Returns:
+            str: 元素的属性值，没有该属性或失败时返回None
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def click(self, element):
+        """点击元素，失败时抛出异常"""
+        raise NotImplementedError
+
+    def extract_batch(self, queries):
+        """
+        一次读取多个定位的全部匹配元素的文本，不等待
+
+        Args:
+            queries: {名称: (定位方式, 定位值)}
+
+        Returns:
+            dict: 名称 -> 文本列表，出错时该项为空列表
+        """
+        return {name: [self.element_text(element) for element in self.find_all(by, value)]
+                for name, (by, value) in queries.items()}
+
+    @property
+    @abstractmethod
+    def current_url(self):
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def title(self):
+        raise NotImplementedError
+
+    @property
+    @abstractmethod
+    def page_source(self):
+        raise NotImplementedError
+
+    def api_payload(self, url):
+        """
+        当前页面加载时捕获的商品详情接口数据(extract.mode为network时)
+
+        Returns:
+            dict: 接口数据，不支持或没有捕获到时返回None
+        """
+        return None
+
+    def prefetch(self, urls, limit=None):
+        """在后台开始加载接下来要打开的页面，不支持预加载的后端忽略"""
+
+    def maybe_recycle(self):
+        """
+        在行与行之间调用，按需回收浏览器资源
+
+        Returns:
+            bool: 是否进行了回收
+        """
+        return False
+
+    @abstractmethod
+    def close(self):
+        """关闭浏览器等资源，之后可以再次setup"""
+        raise NotImplementedError
+
+    def record(self, event, value=1):
+        """
+        记录后端事件，计入指标backend_events_total{backend, event}
+
+        Args:
+            event: 事件名称，如pages(打开页面)、navigate_errors(打开失败)、
+                   prefetch_hits(预加载命中)、wait_timeouts(等待元素超时)
+            value: 增加的数量
+        """
+        metrics.inc('backend_events_total', value, backend=self.name, event=event)
+
+    def stats(self):
+        """
+        Returns:
+            dict: 事件名称 -> 本进程中该后端的计数
+        """
+        return metrics.counter_values('backend_events_total', 'event', backend=self.name)
+
+
+class HttpBackend(FetchBackend):
+    """直接下载页面HTML并用StaticHtmlDriver解析，不执行JavaScript"""
+
+    name = 'http'
+
+    def __init__(self, page_loader=None):
+        """
+        Args:
+            page_loader: 根据URL返回HTML的函数，None则通过HTTP下载(http_page_loader)
+        """
+        self.page_loader = page_loader
+        self.driver = None
+        self.last_error = None
+
+    def setup(self):
+        if self.driver is not None:
+            return
+        from utils.static_driver import StaticHtmlDriver, http_page_loader
+        self.driver = StaticHtmlDriver(page_loader=self.page_loader or http_page_loader)
+
+    def navigate(self, url):
+        self.setup()
+        try:
+            self.record('pages')
+            with metrics.span('navigate'):
+                self.driver.get(url)
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = e
+            self.record('navigate_errors')
+            logger.error(f"打开页面失败 {url}: {str(e)}")
+            return False
+
+    def wait_for(self, by, value, timeout=None):
+        # 静态页面下载后内容不再变化，不需要等待
+        try:
+            elements = self.driver.find_elements(by, value)
+        except Exception as e:
+            logger.error(f"查找元素失败 ({by}: {value}): {str(e)}")
+            return None
+        if not elements:
+            self.record('wait_timeouts')
+            logger.warning(f"等待元素超时 ({by}: {value})")
+            return None
+        return elements[0]
+
+    def find_all(self, by, value):
+        try:
+            return self.driver.find_elements(by, value)
+        except Exception as e:
+            logger.error(f"查找元素失败 ({by}: {value}): {str(e)}")
+            return []
+
+    def element_text(self, element):
+        try:
+            return element.text.strip() if element is not None else ""
+        except Exception as e:
+            logger.error(f"获取元素文本失败: {str(e)}")
+            return ""
+
+    def element_attribute(self, element, name):
+        try:
+            return element.get_attribute(name) if element is not None else None
+        except Exception as e:
+            logger.error(f"获取元素属性失败: {str(e)}")
+            return None
+
+    def click(self, element):
+        # 静态页面点击不会改变内容
+        element.click()
+
+    @property
+    def current_url(self):
+        return self.driver.current_url if self.driver else ''
+
+    @property
+    def title(self):
+        return self.driver.title if self.driver else ''
+
+    @property
+    def page_source(self):
+        return self.driver.page_source if self.driver else ''
+
+    def close(self):
+        if self.driver is not None:
+            self.driver.quit()
+        self.driver = None
+
+
+_lock = threading.Lock()
+_backends = {}
+_override = None
+
+
+def _create(name):
+    if name == 'selenium':
+        from utils.browser_handler import browser
+        return browser
+    if name == 'playwright':
+        from utils.playwright_backend import PlaywrightBackend
+        return PlaywrightBackend()
+    if name == 'http':
+        return HttpBackend()
+    raise ValueError(f"不支持的获取后端: {name}")
+
+
+def current_backend():
+    """
+    当前进程使用的获取后端：use_backend指定的后端，否则按backend.name创建(每种后端一个实例)
+
+    Returns:
+        FetchBackend: 获取后端
+    """
+    if _override is not None:
+        return _override
+    name = CONFIG['backend']['name']
+    with _lock:
+        backend = _backends.get(name)
+        if backend is None:
+            backend = _backends[name] = _create(name)
+        return backend
+
+
+def use_backend(backend):
+    """
+    指定当前进程使用的获取后端(基准测试、离线重新提取等)，None则恢复按配置选择
+
+    Args:
+        backend: FetchBackend实例或None
+    """
+    global _override
+    _override = backend
@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+日志设置
+
+业务线程只把日志记录放入内存队列(QueueHandler)，由后台线程(QueueListener)
+写入按大小轮转的日志文件和控制台，获取页面的循环中不做同步磁盘和控制台I/O。
+同一类日志在短时间内大量重复时(例如选择器失效导致每行都报错)会被限流采样。
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from collections import OrderedDict
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from config import CONFIG
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# 项目根目录，日志路径相对于该目录
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 归一化日志消息时替换掉的可变部分：URL、数字
+_URL_PATTERN = re.compile(r'https?://\S+')
+_NUMBER_PATTERN = re.compile(r'\d+(?:\.\d+)?')
+
+_listener = None
+_rate_limit = None
+
+
+class JsonFormatter(logging.Formatter):
+    """JSON Lines格式，每条日志一行"""
+
+    def format(self, record):
+        data = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'thread': record.threadName,
+            'message': record.getMessage()
+        }
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        return json.dumps(data, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    重复日志限流
+
+    消息去掉URL和数字后作为同一类；每类在interval秒内前burst条正常输出，
+    之后每sample_every条输出1条。时间窗口结束后删除该类的记录(消息中带URL、行号的
+    类别很多，不会一直累积)，有被抑制的日志时通过emit补一条汇总；停止日志前调用flush
+    输出尚未结束的窗口的汇总。
+    """
+
+    def __init__(self, burst=10, interval=60, sample_every=100, min_level=logging.WARNING, emit=None):
+        """
+        Args:
+            emit: 输出汇总日志记录的函数(不再经过本过滤器)，None则不输出汇总
+        """
+        super().__init__()
+        self.burst = burst
+        self.interval = interval
+        self.sample_every = sample_every
+        self.min_level = min_level
+        self.emit = emit
+        self._lock = threading.Lock()
+        self._windows = OrderedDict()  # 类别 -> 时间窗口，按窗口开始时间排序
+
+    def _key(self, record):
+        message = record.msg if isinstance(record.msg, str) else str(record.msg)
+        message = _URL_PATTERN.sub('<url>', message)
+        message = _NUMBER_PATTERN.sub('<n>', message)
+        return record.name, record.levelno, message
+
+    def _expire(self, now):
+        """删除已结束的时间窗口，返回其中有被抑制日志的窗口"""
+        expired = []
+        while self._windows:
+            key, window = next(iter(self._windows.items()))
+            if now - window['start'] < self.interval:
+                break
+            del self._windows[key]
+            if window['suppressed']:
+                expired.append(window)
+        return expired
+
+    def _report(self, windows):
+        """为被抑制的日志各补一条汇总，在锁外调用"""
+        if self.emit is None:
+            return
+        for window in windows:
+            record = logging.LogRecord(
+                window['name'], window['level'], __file__, 0,
+                f"{window['message']} (同类日志在{self.interval}秒内另有{window['suppressed']}条被抑制)",
+                None, None
+            )
+            try:
+                self.emit(record)
+            except Exception:
+                pass
+
+    def filter(self, record):
+        if record.levelno < self.min_level or self.burst <= 0:
+            return True
+
+        key = self._key(record)
+        now = time.monotonic()
+        with self._lock:
+            expired = self._expire(now)
+            window = self._windows.get(key)
+            if window is None:
+                self._windows[key] = {'start': now, 'count': 1, 'suppressed': 0, 'name': record.name,
+                                      'level': record.levelno, 'message': record.getMessage()}
+                allowed = True
+            else:
+                window['count'] += 1
+                allowed = window['count'] <= self.burst
+                if not allowed and self.sample_every and (window['count'] - self.burst) % self.sample_every == 0:
+                    record.msg = (f"{record.msg} (采样输出，同类日志已抑制{window['suppressed']}条)")
+                    window['suppressed'] = 0
+                    allowed = True
+                elif not allowed:
+                    window['suppressed'] += 1
+        self._report(expired)
+        return allowed
+
+    def flush(self):
+        """输出全部未结束窗口中被抑制日志的汇总并清空记录"""
+        with self._lock:
+            windows = [window for window in self._windows.values() if window['suppressed']]
+            self._windows.clear()
+        self._report(windows)
+
+
+def setup_logging():
+    """
+    设置日志，图形界面和命令行入口共用
+
+    Returns:
+        Logger: 应用程序根日志对象
+    """
+    global _listener, _rate_limit
+    if _listener is not None:
+        return logging.getLogger('taobao_price_checker')
+
+    try:
+        settings = CONFIG['log']
+        log_file = os.path.join(BASE_DIR, settings['file'])
+        log_dir = os.path.dirname(log_file)
+        if not os.path.exists(log_dir):
+            os.makedirs(log_dir)
+
+        # 后台线程中的实际输出
+        file_handler = RotatingFileHandler(
+            log_file,
+            maxBytes=settings['max_size'],
+            backupCount=settings['backup_count'],
+            encoding='utf-8'
+        )
+        if settings.get('format') == 'json':
+            file_handler.setFormatter(JsonFormatter())
+        else:
+            file_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+
+        # 业务线程只做入队
+        log_queue = queue.Queue(-1)
+        queue_handler = QueueHandler(log_queue)
+        rate_limit = settings.get('rate_limit', {})
+        if rate_limit:
+            # 汇总记录直接入队，不再经过限流
+            _rate_limit = RateLimitFilter(
+                burst=rate_limit.get('burst', 10),
+                interval=rate_limit.get('interval', 60),
+                sample_every=rate_limit.get('sample_every', 100),
+                emit=queue_handler.emit
+            )
+            queue_handler.addFilter(_rate_limit)
+
+        root = logging.getLogger()
+        root.setLevel(getattr(logging, settings['level'], logging.INFO))
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(queue_handler)
+
+        _listener = QueueListener(log_queue, file_handler, console_handler,
+                                  respect_handler_level=True)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+        return logging.getLogger('taobao_price_checker')
+    except Exception as e:
+        print(f"设置日志时出错: {str(e)}")
+        sys.exit(1)
+
+
+class _ForwardHandler(logging.Handler):
+    """把其他进程发来的日志记录交给本进程中同名的logger处理"""
+
+    def handle(self, record):
+        logging.getLogger(record.name).handle(record)
+        return True
+
+    def emit(self, record):
+        pass
+
+
+def setup_worker_logging(log_queue):
+    """
+    多进程模式下工作进程的日志设置：日志记录通过进程间队列发给主进程输出，
+    避免多个进程同时写入和轮转同一个日志文件
+
+    Args:
+        log_queue: multiprocessing队列
+    """
+    root = logging.getLogger()
+    root.setLevel(getattr(logging, CONFIG['log']['level'], logging.INFO))
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueHandler(log_queue))
+
+
+def start_worker_log_listener(log_queue):
+    """
+    在主进程中接收工作进程的日志，按主进程的日志设置输出
+
+    Returns:
+        QueueListener: 已启动的监听器，任务结束后调用stop()
+    """
+    listener = QueueListener(log_queue, _ForwardHandler())
+    listener.start()
+    return listener
+
+
+def shutdown_logging():
+    """停止后台日志线程，输出被限流日志的汇总和队列中剩余的日志"""
+    global _listener
+    if _rate_limit is not None:
+        _rate_limit.flush()
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+轻量级耗时统计和指标导出
+
+各环节用 metrics.span('navigate') 记录耗时，汇总为直方图和计数器，可以：
+    - 通过HTTP端点输出Prometheus文本格式(CONFIG['metrics']['http_port'])
+    - 定期写入JSON文件(CONFIG['metrics']['json_file'])
+    - 每轮任务结束后在日志中输出各环节耗时汇总
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import threading
+from contextlib import contextmanager
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.metrics')
+
+# 直方图分桶上限(秒)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# 每个直方图保留的本轮样本数上限(均匀抽样)，只用于计算本轮任务的分位数
+RESERVOIR_SIZE = 4096
+
+PREFIX = 'taobao_price_checker_'
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(key, extra=None):
+    pairs = list(key) + list(extra or [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{value}"' for name, value in pairs) + '}'
+
+
+class Histogram:
+    """
+    累计直方图，另记录本轮任务的次数、合计和抽样样本
+
+    count/sum和run_count/run_sum为精确值；样本超过RESERVOIR_SIZE后按蓄水池抽样保留，
+    只用于估计分位数
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.bucket_counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.run_count = 0
+        self.run_sum = 0.0
+        self.samples = []
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.run_count += 1
+        self.run_sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.bucket_counts[index] += 1
+                break
+        if len(self.samples) < RESERVOIR_SIZE:
+            self.samples.append(value)
+        else:
+            index = random.randrange(self.run_count)
+            if index < RESERVOIR_SIZE:
+                self.samples[index] = value
+
+    def start_run(self):
+        self.run_count = 0
+        self.run_sum = 0.0
+        self.samples = []
+
+    def percentile(self, percent):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        index = max(0, min(len(ordered) - 1, int(round(percent / 100.0 * len(ordered))) - 1))
+        return ordered[index]
+
+
+class Metrics:
+    """指标注册表，线程安全"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.run_started = None
+
+    def inc(self, name, value=1, **labels):
+        """计数器加value"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set_gauge(self, name, value, **labels):
+        """设置当前值"""
+        with self._lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, value, **labels):
+        """记录一次观测值到直方图"""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def counter_values(self, name, label, **labels):
+        """
+        按一个标签读取计数器
+
+        Args:
+            name: 计数器名称
+            label: 作为结果键的标签名
+            labels: 其余需要匹配的标签
+
+        Returns:
+            dict: 标签值 -> 计数
+        """
+        wanted = set(labels.items())
+        values = {}
+        with self._lock:
+            for (counter, key), value in self.counters.items():
+                pairs = dict(key)
+                if counter != name or label not in pairs or not wanted <= set(key):
+                    continue
+                values[pairs[label]] = values.get(pairs[label], 0) + value
+        return values
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """
+        记录一个环节的耗时，出现异常时同时计入错误计数
+
+        用法：
+            with metrics.span('navigate'):
+                driver.get(url)
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception:
+            self.inc('stage_errors_total', stage=stage, **labels)
+            raise
+        finally:
+            self.observe('stage_duration_seconds', time.perf_counter() - started, stage=stage, **labels)
+
+    def snapshot(self):
+        """
+        导出计数器和直方图的原始数据，多进程模式下工作进程回传给主进程合并
+
+        Returns:
+            dict: 可pickle的原始数据
+        """
+        with self._lock:
+            return {
+                'counters': dict(self.counters),
+                'histograms': {key: (list(histogram.bucket_counts), histogram.count, histogram.sum,
+                                     histogram.run_count, histogram.run_sum, list(histogram.samples))
+                               for key, histogram in self.histograms.items()}
+            }
+
+    def merge(self, snapshot):
+        """合并其他进程的snapshot()数据"""
+        with self._lock:
+            for key, value in snapshot['counters'].items():
+                self.counters[key] = self.counters.get(key, 0) + value
+            for key, (bucket_counts, count, total, run_count, run_total, samples) in snapshot['histograms'].items():
+                histogram = self.histograms.get(key)
+                if histogram is None:
+                    histogram = self.histograms[key] = Histogram()
+                histogram.bucket_counts = [a + b for a, b in zip(histogram.bucket_counts, bucket_counts)]
+                histogram.count += count
+                histogram.sum += total
+                histogram.run_count += run_count
+                histogram.run_sum += run_total
+                histogram.samples.extend(samples[:RESERVOIR_SIZE - len(histogram.samples)])
+
+    def start_run(self):
+        """开始新一轮任务：清空各直方图的本轮次数、合计和样本，累计值保持不变"""
+        with self._lock:
+            for histogram in self.histograms.values():
+                histogram.start_run()
+            self.run_started = time.time()
+
+    def to_prometheus(self):
+        """输出Prometheus文本格式"""
+        lines = []
+        declared = set()
+
+        def declare(name, kind):
+            # 同名指标的各组标签共用一行TYPE声明
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# TYPE {PREFIX}{name} {kind}")
+
+        with self._lock:
+            for (name, key), value in sorted(self.counters.items()):
+                declare(name, 'counter')
+                lines.append(f"{PREFIX}{name}{_format_labels(key)} {value}")
+            for (name, key), value in sorted(self.gauges.items()):
+                declare(name, 'gauge')
+                lines.append(f"{PREFIX}{name}{_format_labels(key)} {value}")
+            for (name, key), histogram in sorted(self.histograms.items()):
+                declare(name, 'histogram')
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.bucket_counts):
+                    cumulative += count
+                    lines.append(f"{PREFIX}{name}_bucket{_format_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{PREFIX}{name}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{PREFIX}{name}_sum{_format_labels(key)} {histogram.sum:.6f}")
+                lines.append(f"{PREFIX}{name}_count{_format_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def to_dict(self):
+        """输出可JSON序列化的字典"""
+        with self._lock:
+            return {
+                'time': time.strftime("%Y-%m-%d %H:%M:%S"),
+                'counters': [{'name': name, 'labels': dict(key), 'value': value}
+                             for (name, key), value in sorted(self.counters.items())],
+                'gauges': [{'name': name, 'labels': dict(key), 'value': value}
+                           for (name, key), value in sorted(self.gauges.items())],
+                'histograms': [{
+                    'name': name,
+                    'labels': dict(key),
+                    'count': histogram.count,
+                    'sum': round(histogram.sum, 6),
+                    'p50': round(histogram.percentile(50), 6),
+                    'p95': round(histogram.percentile(95), 6),
+                    'p99': round(histogram.percentile(99), 6)
+                } for (name, key), histogram in sorted(self.histograms.items())]
+            }
+
+    def summary(self):
+        """
+        生成本轮任务的各环节耗时汇总
+
+        Returns:
+            str: 汇总文本
+        """
+        lines = ["各环节耗时汇总(本轮):",
+                 f"  {'环节':<14}{'次数':>8}{'合计(s)':>11}{'p50(ms)':>11}{'p95(ms)':>11}{'p99(ms)':>11}"]
+        with self._lock:
+            for (name, key), histogram in sorted(self.histograms.items()):
+                if name != 'stage_duration_seconds' or not histogram.run_count:
+                    continue
+                stage = ','.join(str(value) for _, value in key)
+                lines.append(f"  {stage:<14}{histogram.run_count:>8}{histogram.run_sum:>11.2f}"
+                             f"{histogram.percentile(50) * 1000:>11.1f}"
+                             f"{histogram.percentile(95) * 1000:>11.1f}"
+                             f"{histogram.percentile(99) * 1000:>11.1f}")
+        return '\n'.join(lines)
+
+
+class _PrometheusHandler(BaseHTTPRequestHandler):
+    registry = None
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/metrics', '/'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        data = self.registry.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsExporter:
+    """指标导出：Prometheus HTTP端点和定期JSON文件"""
+
+    def __init__(self, registry, http_port=0, json_file='', json_interval=60, http_host='127.0.0.1'):
+        self.registry = registry
+        self.http_host = http_host
+        self.http_port = http_port
+        self.json_file = json_file
+        self.json_interval = json_interval
+        self._httpd = None
+        self._stop_event = threading.Event()
+
+    def start(self):
+        try:
+            if self.http_port:
+                handler = type('BoundPrometheusHandler', (_PrometheusHandler,), {'registry': self.registry})
+                self._httpd = ThreadingHTTPServer((self.http_host, self.http_port), handler)
+                self._httpd.daemon_threads = True
+                threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+                logger.info(f"指标HTTP端点已启动: http://{self.http_host}:{self.http_port}/metrics")
+            if self.json_file:
+                threading.Thread(target=self._write_loop, daemon=True).start()
+                logger.info(f"指标将每{self.json_interval}秒写入: {self.json_file}")
+        except Exception as e:
+            logger.error(f"启动指标导出时出错: {str(e)}")
+        return self
+
+    def write_json(self):
+        """立即写入一次JSON文件(先写临时文件再替换，避免读到半个文件)"""
+        try:
+            directory = os.path.dirname(os.path.abspath(self.json_file))
+            os.makedirs(directory, exist_ok=True)
+            temp_file = self.json_file + '.tmp'
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                json.dump(self.registry.to_dict(), f, ensure_ascii=False, indent=2)
+            os.replace(temp_file, self.json_file)
+        except Exception as e:
+            logger.error(f"写入指标文件时出错: {str(e)}")
+
+    def _write_loop(self):
+        while not self._stop_event.wait(self.json_interval):
+            self.write_json()
+
+    def stop(self):
+        self._stop_event.set()
+        if self.json_file:
+            self.write_json()
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+
+
+def start_exporter(http_port=None, json_file=None):
+    """
+    按配置启动指标导出，参数为None时使用CONFIG['metrics']中的值
+
+    Returns:
+        MetricsExporter: 导出器，未配置任何导出方式时返回None
+    """
+    settings = CONFIG['metrics']
+    http_port = settings['http_port'] if http_port is None else http_port
+    json_file = settings['json_file'] if json_file is None else json_file
+    if not http_port and not json_file:
+        return None
+    return MetricsExporter(metrics, http_port, json_file, settings['json_interval'],
+                           settings.get('http_host', '127.0.0.1')).start()
+
+
+# 全局实例
+metrics = Metrics()
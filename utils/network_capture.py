@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+通过Chrome性能日志(performance log)捕获商品详情接口的响应
+
+打开页面后读取性能日志中的Network.responseReceived事件，URL匹配
+CONFIG['extract']['api_patterns']的响应通过CDP的Network.getResponseBody读取内容，
+按商品ID缓存，供价格和SKU获取直接解析。
+"""
+
+import json
+import logging
+from collections import OrderedDict
+from urllib.parse import urlparse, parse_qs
+from core.api_parser import parse_body, payload_item_id, is_success
+from utils.metrics import metrics
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.network_capture')
+
+
+def network_mode():
+    """是否启用接口数据提取"""
+    return CONFIG['extract']['mode'] == 'network'
+
+
+def enable_capture(options):
+    """在ChromeOptions中开启性能日志"""
+    options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+
+
+def url_item_id(url):
+    """商品页面URL中的商品ID(id参数)"""
+    values = parse_qs(urlparse(url).query).get('id')
+    return values[0] if values else None
+
+
+class NetworkCapture:
+    """接口响应捕获，按商品ID保存最近的接口数据"""
+
+    def __init__(self):
+        self._payloads = OrderedDict()
+
+    def collect(self, driver):
+        """读取性能日志中新增的接口响应并解析"""
+        patterns = CONFIG['extract']['api_patterns']
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            logger.warning(f"读取性能日志失败: {str(e)}")
+            return
+
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, ValueError, TypeError):
+                continue
+            if message.get('method') != 'Network.responseReceived':
+                continue
+            params = message.get('params', {})
+            response_url = params.get('response', {}).get('url', '')
+            if not any(pattern in response_url for pattern in patterns):
+                continue
+
+            try:
+                body = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': params['requestId']})
+            except Exception as e:
+                # 响应属于其他标签页或已被释放
+                logger.debug(f"读取接口响应失败 {response_url}: {str(e)}")
+                continue
+            self.add_body(body.get('body'))
+
+    def add_body(self, body):
+        """
+        解析一个接口响应内容并按商品ID保存(其他后端直接监听到响应时调用)
+
+        Args:
+            body: 响应文本
+
+        Returns:
+            bool: 是否为有效的商品详情数据
+        """
+        payload = parse_body(body)
+        if payload is None or not is_success(payload):
+            return False
+        item_id = payload_item_id(payload)
+        if item_id is None:
+            return False
+        metrics.inc('api_responses_total')
+        self._payloads[item_id] = payload
+        self._payloads.move_to_end(item_id)
+        while len(self._payloads) > CONFIG['extract']['api_buffer']:
+            self._payloads.popitem(last=False)
+        return True
+
+    def payload_for(self, url):
+        """
+        Returns:
+            dict: 该商品页面最近一次捕获的接口数据，没有时返回None
+        """
+        item_id = url_item_id(url)
+        if item_id is None:
+            return None
+        return self._payloads.get(item_id)
+
+    def discard(self, url):
+        """重新打开页面前丢弃旧数据，避免读到上一次的结果"""
+        item_id = url_item_id(url)
+        if item_id is not None:
+            self._payloads.pop(item_id, None)
+
+    def clear(self):
+        self._payloads.clear()
@@ -0,0 +1,220 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+页面快照归档
+
+config.py中的选择器失效后，只能修改选择器再重新打开全部页面。开启archive.enabled后，
+每次成功打开页面(获取成功或选择器失效)时把页面HTML压缩保存，修改选择器后可以用
+`python cli.py reextract`对归档的页面重新提取(见core/reextractor.py)，不需要联网。
+
+页面按内容的SHA-256保存(objects/前两位/摘要.zst)，内容相同的页面(同一链接的价格和SKU、
+多轮之间没有变化的页面)只保存一份。安装了zstandard时使用zstd压缩，否则使用标准库的zlib，
+读取时按扩展名解压，两种格式可以混用。每次获取在index/日期-进程号.jsonl中追加一条索引：
+时间、链接、获取类型、页面摘要、当时提取的值和状态。
+"""
+
+import os
+import re
+import json
+import time
+import zlib
+import hashlib
+import logging
+import threading
+from config import CONFIG
+from utils.metrics import metrics
+
+logger = logging.getLogger('taobao_price_checker.page_archive')
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# 归档模式
+MODE_FULL = 'full'          # 完整HTML
+MODE_STRIPPED = 'stripped'  # 去掉script、style、svg和注释，提取逻辑用不到这些内容
+
+_STRIP_PATTERN = re.compile(r'<(script|style|svg|noscript)\b.*?</\1\s*>|<!--.*?-->', re.IGNORECASE | re.DOTALL)
+
+# 压缩格式扩展名
+EXT_ZSTD = '.zst'
+EXT_ZLIB = '.zz'
+
+
+def _zstd():
+    """zstandard为可选依赖，未安装时返回None"""
+    try:
+        import zstandard
+        return zstandard
+    except ImportError:
+        return None
+
+
+def strip_html(html):
+    """去掉页面中的脚本、样式、矢量图和注释"""
+    return _STRIP_PATTERN.sub('', html)
+
+
+def archive_root():
+    return os.path.join(BASE_DIR, CONFIG['archive']['dir'])
+
+
+class PageArchive:
+    """按内容寻址、压缩保存的页面快照"""
+
+    def __init__(self, root=None, codec=None):
+        """
+        Args:
+            root: 归档目录，None则使用archive.dir
+            codec: zstd或zlib，None则按archive.codec配置(auto时安装了zstandard则用zstd)
+        """
+        self.root = root or archive_root()
+        codec = codec or CONFIG['archive']['codec']
+        if codec == 'auto':
+            codec = 'zstd' if _zstd() else 'zlib'
+        if codec == 'zstd' and not _zstd():
+            logger.warning("未安装zstandard，页面归档改用zlib压缩")
+            codec = 'zlib'
+        self.codec = codec
+        self._index_lock = threading.Lock()
+
+    # 页面内容
+
+    def _object_path(self, digest, extension):
+        return os.path.join(self.root, 'objects', digest[:2], digest + extension)
+
+    def _find_object(self, digest):
+        for extension in (EXT_ZSTD, EXT_ZLIB):
+            path = self._object_path(digest, extension)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, html):
+        """
+        保存页面内容，内容相同的页面只保存一份
+
+        Args:
+            html: 页面HTML
+
+        Returns:
+            str: 内容摘要
+        """
+        data = html.encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        if self._find_object(digest):
+            metrics.inc('archive_dedup_hits_total')
+            return digest
+
+        if self.codec == 'zstd':
+            compressed, extension = _zstd().ZstdCompressor(level=10).compress(data), EXT_ZSTD
+        else:
+            compressed, extension = zlib.compress(data, 6), EXT_ZLIB
+        path = self._object_path(digest, extension)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再改名，多个进程同时保存同一页面时不会读到写了一半的文件
+        temp_file = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(compressed)
+        os.replace(temp_file, path)
+        metrics.inc('archive_bytes_total', len(compressed))
+        return digest
+
+    def get(self, digest):
+        """
+        读取页面内容
+
+        Returns:
+            str: 页面HTML，不存在时抛出KeyError
+        """
+        path = self._find_object(digest)
+        if path is None:
+            raise KeyError(digest)
+        with open(path, 'rb') as f:
+            data = f.read()
+        if path.endswith(EXT_ZSTD):
+            zstandard = _zstd()
+            if zstandard is None:
+                raise RuntimeError("读取zstd格式的页面归档需要安装zstandard")
+            data = zstandard.ZstdDecompressor().decompress(data)
+        else:
+            data = zlib.decompress(data)
+        return data.decode('utf-8')
+
+    # 索引
+
+    def _index_file(self):
+        return os.path.join(self.root, 'index', f"{time.strftime('%Y%m%d')}-{os.getpid()}.jsonl")
+
+    def record(self, url, kind, html, value, status):
+        """
+        保存一次获取的页面并追加索引
+
+        Args:
+            url: 商品页面URL
+            kind: 获取类型(price/sku/variants)
+            html: 页面HTML
+            value: 当时提取的值
+            status: 当时的获取状态(FailureCategory的值)
+
+        Returns:
+            str: 页面摘要，保存失败时返回None
+        """
+        try:
+            if CONFIG['archive']['mode'] == MODE_STRIPPED:
+                html = strip_html(html)
+            digest = self.put(html)
+            entry = {'time': time.strftime("%Y-%m-%d %H:%M:%S"), 'url': url, 'kind': kind,
+                     'digest': digest, 'value': value, 'status': status}
+            path = self._index_file()
+            with self._index_lock:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+            metrics.inc('archive_pages_total')
+            return digest
+        except Exception as e:
+            logger.warning(f"归档页面失败 {url}: {str(e)}")
+            return None
+
+    def entries(self, since=None):
+        """
+        按时间顺序读取索引
+
+        Args:
+            since: 只读取该时间(YYYY-mm-dd HH:MM:SS格式的字符串)之后的记录，None则全部读取
+
+        Returns:
+            list: 索引记录(字典)列表
+        """
+        index_dir = os.path.join(self.root, 'index')
+        if not os.path.isdir(index_dir):
+            return []
+        entries = []
+        for name in sorted(os.listdir(index_dir)):
+            if not name.endswith('.jsonl'):
+                continue
+            with open(os.path.join(index_dir, name), encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # 进程中途退出时最后一行可能不完整
+                    if since is None or entry['time'] >= since:
+                        entries.append(entry)
+        entries.sort(key=lambda entry: entry['time'])
+        return entries
+
+    def latest_pages(self, since=None):
+        """
+        每个链接最近一次归档的页面及当时提取的值
+
+        Returns:
+            dict: URL -> {'digest', 'time', 'values': {获取类型: (值, 状态)}}
+        """
+        pages = {}
+        for entry in self.entries(since):
+            page = pages.get(entry['url'])
+            if page is None or page['digest'] != entry['digest']:
+                page = pages[entry['url']] = {'digest': entry['digest'], 'time': entry['time'], 'values': {}}
+            page['values'][entry['kind']] = (entry['value'], entry['status'])
+        return pages
@@ -0,0 +1,309 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Playwright获取后端(backend.name为playwright)
+
+一个Chromium进程内创建backend.contexts个浏览器上下文，每个上下文相当于一个独立的无痕窗口
+(cookie、缓存互相隔离)，创建和销毁只需几十毫秒，比多开Chrome进程省内存得多。
+Playwright的异步API运行在后台线程的事件循环中，对外提供与其他后端相同的同步接口：
+当前上下文提取数据时，其他上下文并发加载接下来的页面(与多标签页预加载相同)；
+回收时只重建上下文，不重启浏览器。
+
+需要安装playwright并下载浏览器：
+    pip install playwright
+    python -m playwright install chromium
+"""
+
+import time
+import asyncio
+import logging
+import threading
+from utils.fetch_backend import FetchBackend, EXTRACT_BATCH_JS
+from utils.network_capture import NetworkCapture, network_mode
+from utils.metrics import metrics
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.playwright_backend')
+
+# 等待后台事件循环返回结果时，在页面超时之外额外等待的时间(秒)
+CALL_MARGIN = 10
+
+
+def _selector(by, value):
+    """selenium的定位方式转换为Playwright选择器"""
+    if by == 'xpath':
+        return f'xpath={value}'
+    if by == 'id':
+        return f'[id="{value}"]'
+    if by == 'class name':
+        return f'.{value}'
+    return value
+
+
+class PlaywrightBackend(FetchBackend):
+    """一个浏览器进程、多个浏览器上下文的获取后端"""
+
+    name = 'playwright'
+
+    def __init__(self):
+        self.last_error = None
+        self.network = NetworkCapture()
+        self.session_pages = 0
+        self._loop = None
+        self._thread = None
+        self._playwright = None
+        self._browser = None
+        self._pages = []     # 每个上下文一个页面
+        self._loading = {}   # 预加载中的URL -> (页面, concurrent.futures.Future)
+        self._page = None    # 当前页面
+
+    @property
+    def max_loads(self):
+        return max(1, CONFIG['backend']['contexts'])
+
+    # 后台事件循环
+
+    def _call(self, coroutine, timeout=None):
+        """在事件循环中执行协程并等待结果"""
+        if timeout is None:
+            timeout = CONFIG['browser']['timeout'] + CALL_MARGIN
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result(timeout)
+
+    def _submit(self, coroutine):
+        """在事件循环中执行协程，不等待"""
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+
+    def setup(self):
+        if self._browser is not None:
+            return
+        try:
+            from playwright.async_api import async_playwright
+        except ImportError:
+            raise RuntimeError("backend.name为playwright时需要安装playwright: pip install playwright")
+
+        with metrics.span('browser_start'):
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(target=self._loop.run_forever, name='playwright-loop', daemon=True)
+            self._thread.start()
+            started = time.perf_counter()
+            self._call(self._start(async_playwright), timeout=CONFIG['browser']['timeout'] * 4)
+            metrics.observe('browser_startup_seconds', time.perf_counter() - started)
+        self.session_pages = 0
+        logger.info(f"Playwright浏览器初始化成功(上下文{len(self._pages)}个)")
+
+    async def _start(self, async_playwright):
+        self._playwright = await async_playwright().start()
+        # 未指定Chrome路径时使用playwright下载的Chromium
+        self._browser = await self._playwright.chromium.launch(
+            headless=CONFIG['browser']['headless'],
+            executable_path=CONFIG['browser']['binary_path'] or None,
+            args=['--disable-gpu', '--no-sandbox', '--disable-dev-shm-usage']
+        )
+        await self._open_contexts()
+
+    async def _open_contexts(self):
+        self._pages = []
+        for _ in range(self.max_loads):
+            context = await self._browser.new_context(
+                user_agent=CONFIG['browser']['user_agent'],
+                viewport=CONFIG['browser']['window_size']
+            )
+            context.set_default_timeout(CONFIG['browser']['timeout'] * 1000)
+            page = await context.new_page()
+            if network_mode():
+                page.on('response', self._on_response)
+            self._pages.append(page)
+        self._loading = {}
+        self._page = self._pages[0]
+
+    async def _close_contexts(self):
+        for page in self._pages:
+            try:
+                await page.context.close()
+            except Exception as e:
+                logger.warning(f"关闭浏览器上下文失败: {str(e)}")
+        self._pages = []
+
+    async def _on_response(self, response):
+        """接口数据提取：直接监听商品详情接口的响应，不需要性能日志"""
+        if not any(pattern in response.url for pattern in CONFIG['extract']['api_patterns']):
+            return
+        try:
+            self.network.add_body(await response.text())
+        except Exception as e:
+            logger.debug(f"读取接口响应失败 {response.url}: {str(e)}")
+
+    # 打开页面
+
+    def _idle_page(self, exclude_current=False):
+        busy = {id(page) for page, _ in self._loading.values()}
+        for page in self._pages:
+            if id(page) in busy or (exclude_current and page is self._page):
+                continue
+            return page
+        return self._page
+
+    def navigate(self, url):
+        self.setup()
+        try:
+            self.record('pages')
+            self.session_pages += 1
+            with metrics.span('navigate'):
+                loading = self._loading.pop(url, None)
+                if loading is not None:
+                    # 已在其他上下文中预加载，等待加载完成
+                    self.record('prefetch_hits')
+                    page, future = loading
+                    future.result(CONFIG['browser']['timeout'] + CALL_MARGIN)
+                else:
+                    page = self._idle_page()
+                    if network_mode():
+                        self.network.discard(url)
+                    self._call(page.goto(url, wait_until='load'))
+            self._page = page
+            self.last_error = None
+            return True
+        except Exception as e:
+            self.last_error = e
+            self.record('navigate_errors')
+            logger.error(f"打开页面失败 {url}: {str(e)}")
+            return False
+
+    def prefetch(self, urls, limit=None):
+        """在当前页面以外的上下文中开始加载接下来的页面"""
+        if self._browser is None or len(self._pages) < 2 or not urls:
+            return
+        window = len(self._pages) if limit is None else max(1, min(limit, len(self._pages)))
+        wanted = list(dict.fromkeys(urls))[:window]
+        for url in list(self._loading):
+            if url not in wanted:
+                del self._loading[url]
+        for url in wanted[1:]:
+            if url in self._loading:
+                continue
+            if len(self._loading) >= window - 1:
+                break
+            page = self._idle_page(exclude_current=True)
+            if page is self._page:
+                break
+            if network_mode():
+                self.network.discard(url)
+            self._loading[url] = (page, self._submit(page.goto(url, wait_until='load')))
+
+    def api_payload(self, url):
+        if not network_mode() or self._browser is None:
+            return None
+        # 接口响应可能在页面load事件之后才返回
+        deadline = time.monotonic() + CONFIG['extract']['api_wait']
+        payload = self.network.payload_for(url)
+        while payload is None and time.monotonic() < deadline:
+            time.sleep(0.05)
+            payload = self.network.payload_for(url)
+        return payload
+
+    # 读取页面
+
+    def wait_for(self, by, value, timeout=None):
+        if timeout is None:
+            timeout = CONFIG['browser']['timeout']
+        try:
+            with metrics.span('wait'):
+                return self._call(self._page.wait_for_selector(
+                    _selector(by, value), state='attached', timeout=timeout * 1000))
+        except Exception as e:
+            self.record('wait_timeouts')
+            logger.warning(f"等待元素超时 ({by}: {value}): {str(e).splitlines()[0] if str(e) else ''}")
+            return None
+
+    def find_all(self, by, value):
+        try:
+            return self._call(self._page.query_selector_all(_selector(by, value)))
+        except Exception as e:
+            logger.error(f"查找元素失败 ({by}: {value}): {str(e)}")
+            return []
+
+    def element_text(self, element):
+        if element is None:
+            return ""
+        try:
+            return (self._call(element.inner_text()) or "").strip()
+        except Exception as e:
+            logger.error(f"获取元素文本失败: {str(e)}")
+            return ""
+
+    def element_attribute(self, element, name):
+        if element is None:
+            return None
+        try:
+            return self._call(element.get_attribute(name))
+        except Exception as e:
+            logger.error(f"获取元素属性失败: {str(e)}")
+            return None
+
+    def click(self, element):
+        self._call(element.click())
+
+    def extract_batch(self, queries):
+        try:
+            result = self._call(self._page.evaluate(
+                EXTRACT_BATCH_JS, [[name, by, value] for name, (by, value) in queries.items()]))
+        except Exception as e:
+            logger.warning(f"批量读取元素失败: {str(e)}")
+            result = {}
+        return {name: list(result.get(name) or []) for name in queries}
+
+    @property
+    def current_url(self):
+        return self._page.url if self._page is not None else ''
+
+    @property
+    def title(self):
+        return self._call(self._page.title()) if self._page is not None else ''
+
+    @property
+    def page_source(self):
+        return self._call(self._page.content()) if self._page is not None else ''
+
+    # 回收和关闭
+
+    def maybe_recycle(self):
+        """同一批上下文打开的页面数达到browser.recycle.max_pages时重建上下文(不重启浏览器)"""
+        max_pages = CONFIG['browser']['recycle']['max_pages']
+        if self._browser is None or not max_pages or self.session_pages < max_pages:
+            return False
+        metrics.inc('browser_recycles_total', reason='pages')
+        logger.info(f"重建浏览器上下文(已打开{self.session_pages}个页面)")
+        with metrics.span('recycle'):
+            self._call(self._close_contexts())
+            self._call(self._open_contexts())
+        self.network.clear()
+        self.session_pages = 0
+        return True
+
+    def close(self):
+        if self._browser is None:
+            return
+        try:
+            self._call(self._stop())
+            logger.info("Playwright浏览器已关闭")
+        except Exception as e:
+            logger.error(f"关闭Playwright浏览器失败: {str(e)}")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(CALL_MARGIN)
+            self._loop.close()
+            self._loop = None
+            self._thread = None
+            self._browser = None
+            self._playwright = None
+            self._pages = []
+            self._loading = {}
+            self._page = None
+            self.session_pages = 0
+            self.network.clear()
+
+    async def _stop(self):
+        await self._close_contexts()
+        await self._browser.close()
+        await self._playwright.stop()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+启动耗时分析，输出类似 `python -X importtime` 的模块导入耗时明细。
+
+import语句(builtins.__import__)和各包__init__.py中延迟导入使用的importlib.import_module
+都会被记录。本模块只依赖标准库，需要在入口文件中其他导入之前引入：
+
+    from utils.startup_profiler import profiler
+    profiler.install_if_requested(sys.argv)
+"""
+
+import sys
+import time
+import logging
+import builtins
+import threading
+import importlib
+import importlib.util
+
+logger = logging.getLogger('taobao_price_checker.startup_profiler')
+
+STARTUP_FLAG = '--startup-report'
+
+
+class StartupProfiler:
+    """启动耗时记录类"""
+
+    def __init__(self):
+        self.enabled = False
+        self.start_time = time.perf_counter()
+        self.marks = []
+        self.imports = []
+        self._original_import = None
+        self._original_import_module = None
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def install_if_requested(self, argv, flag=STARTUP_FLAG):
+        """
+        命令行参数中包含启动分析标志时开启记录，并从参数中移除该标志
+
+        Args:
+            argv: 命令行参数列表(会被原地修改)
+            flag: 启动分析标志
+        """
+        if flag in argv:
+            argv.remove(flag)
+            self.enable()
+
+    def enable(self):
+        """开始记录模块导入耗时"""
+        if self.enabled:
+            return
+        self.enabled = True
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        builtins.__import__ = self._timed_import
+        importlib.import_module = self._timed_import_module
+
+    def disable(self):
+        """停止记录，恢复原始导入函数"""
+        if not self.enabled:
+            return
+        builtins.__import__ = self._original_import
+        importlib.import_module = self._original_import_module
+        self.enabled = False
+
+    def mark(self, name):
+        """记录一个启动阶段的时间点"""
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.start_time))
+
+    def _timed_import(self, name, globals=None, locals=None, fromlist=(), level=0):
+        module_name = self._resolve_name(name, globals, level)
+        return self._timed(module_name, self._original_import, name, globals, locals, fromlist, level)
+
+    def _timed_import_module(self, name, package=None):
+        module_name = name
+        if name.startswith('.'):
+            try:
+                module_name = importlib.util.resolve_name(name, package)
+            except (ImportError, ValueError):
+                pass
+        return self._timed(module_name, self._original_import_module, name, package)
+
+    def _timed(self, module_name, load, *args):
+        """调用原始导入函数，模块尚未导入时记录耗时"""
+        if module_name in sys.modules:
+            return load(*args)
+
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        stack.append(0.0)
+        started = time.perf_counter()
+        try:
+            return load(*args)
+        finally:
+            elapsed = time.perf_counter() - started
+            children = stack.pop()
+            if stack:
+                stack[-1] += elapsed
+            with self._lock:
+                self.imports.append((module_name, elapsed - children, elapsed, len(stack)))
+
+    def _resolve_name(self, name, globals, level):
+        if level == 0:
+            return name
+        try:
+            package = (globals or {}).get('__package__') or ''
+            return importlib.util.resolve_name('.' * level + name, package)
+        except (ImportError, ValueError):
+            return name
+
+    def report(self, top=20):
+        """
+        生成启动耗时报告并写入日志，生成后停止记录
+
+        Args:
+            top: 输出累计耗时最高的模块数量
+
+        Returns:
+            str: 报告文本，未开启时返回空字符串
+        """
+        if not self.enabled:
+            return ""
+        self.mark('报告生成')
+        self.disable()
+
+        lines = ["启动耗时报告", "阶段耗时:"]
+        for name, elapsed in self.marks:
+            lines.append(f"  {elapsed * 1000:9.1f} ms  {name}")
+
+        lines.append(f"模块导入耗时(前{top}项，单位微秒):")
+        lines.append("  import time:       self |  cumulative | imported package")
+        slowest = sorted(self.imports, key=lambda item: item[2], reverse=True)[:top]
+        for module_name, self_time, cumulative, depth in slowest:
+            lines.append(f"  import time: {self_time * 1e6:10.0f} | {cumulative * 1e6:11.0f} | "
+                         f"{'  ' * depth}{module_name}")
+
+        text = "\n".join(lines)
+        logger.info(text)
+        return text
+
+
+# 全局实例，入口文件在导入其他模块前使用
+profiler = StartupProfiler()
@@ -0,0 +1,235 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+基于静态HTML的WebDriver替代实现。
+
+只实现BrowserHandler和各获取类用到的WebDriver接口子集（get、page_source、
+find_element(s)、WebElement.text/get_attribute等），页面内容由调用方提供，
+用于离线基准测试和对已保存页面重新解析，不需要启动Chrome。
+"""
+
+import re
+import logging
+import urllib.request
+from config import CONFIG
+
+logger = logging.getLogger('taobao_price_checker.static_driver')
+
+# XPath单步：分隔符、节点名、谓词列表
+_XPATH_STEP = re.compile(
+    r'(//|/)(\*|[\w\-]+)((?:\[(?:[^\]"\']|"[^"]*"|\'[^\']*\')*\])*)'
+)
+_XPATH_PREDICATE = re.compile(r'\[((?:[^\]"\']|"[^"]*"|\'[^\']*\')*)\]')
+_ATTR_EQUALS = re.compile(r'^@([\w\-]+)\s*=\s*["\'](.*)["\']$')
+_ATTR_CONTAINS = re.compile(r'^contains\(\s*@([\w\-]+)\s*,\s*["\'](.*)["\']\s*\)$')
+
+
+def _no_such_element(message):
+    from selenium.common.exceptions import NoSuchElementException
+    return NoSuchElementException(message)
+
+
+def _to_css(by, value):
+    """与selenium的WebDriver.find_element相同，将id/class/name定位转换为CSS选择器"""
+    if by == 'id':
+        return 'css selector', f'[id="{value}"]'
+    if by == 'class name':
+        return 'css selector', f'.{value}'
+    if by == 'name':
+        return 'css selector', f'[name="{value}"]'
+    return by, value
+
+
+def _find_all(root, by, value):
+    """在root(BeautifulSoup对象或Tag)下按定位方式查找全部元素"""
+    by, value = _to_css(by, value)
+    if by == 'css selector':
+        return root.select(value)
+    if by == 'xpath':
+        return _xpath(root, value)
+    if by == 'tag name':
+        return root.find_all(value)
+    raise ValueError(f"不支持的定位方式: {by}")
+
+
+def _xpath(root, expression):
+    """
+    计算XPath表达式的常用子集：/、//、*、[n]、[@attr="v"]、[contains(@attr,"v")]
+    """
+    position = 0
+    steps = []
+    expression = expression.strip()
+    if expression.startswith('.'):
+        expression = expression[1:]
+    while position < len(expression):
+        match = _XPATH_STEP.match(expression, position)
+        if not match:
+            raise ValueError(f"不支持的XPath表达式: {expression}")
+        steps.append((match.group(1), match.group(2), _XPATH_PREDICATE.findall(match.group(3))))
+        position = match.end()
+
+    nodes = [root]
+    for axis, name, predicates in steps:
+        matched = []
+        seen = set()
+        for node in nodes:
+            contexts = [node] if axis == '/' else [node] + node.find_all(True)
+            for context in contexts:
+                children = context.find_all(True if name == '*' else name, recursive=False)
+                for child in _apply_predicates(children, predicates):
+                    if id(child) not in seen:
+                        seen.add(id(child))
+                        matched.append(child)
+        nodes = matched
+        if not nodes:
+            break
+    return nodes
+
+
+def _apply_predicates(nodes, predicates):
+    for predicate in predicates:
+        predicate = predicate.strip()
+        if predicate.isdigit():
+            index = int(predicate) - 1
+            nodes = [nodes[index]] if 0 <= index < len(nodes) else []
+            continue
+        match = _ATTR_EQUALS.match(predicate)
+        if match:
+            attr, expected = match.groups()
+            nodes = [n for n in nodes if _attribute(n, attr) == expected]
+            continue
+        match = _ATTR_CONTAINS.match(predicate)
+        if match:
+            attr, expected = match.groups()
+            nodes = [n for n in nodes if expected in (_attribute(n, attr) or '')]
+            continue
+        raise ValueError(f"不支持的XPath谓词: [{predicate}]")
+    return nodes
+
+
+def _attribute(tag, name):
+    value = tag.get(name)
+    if isinstance(value, list):
+        return ' '.join(value)
+    return value
+
+
+class StaticElement:
+    """WebElement的静态实现"""
+
+    def __init__(self, tag):
+        self._tag = tag
+
+    @property
+    def tag_name(self):
+        return self._tag.name
+
+    @property
+    def text(self):
+        # 与浏览器可见文本一致，合并连续空白
+        return ' '.join(self._tag.get_text(' ').split())
+
+    def get_attribute(self, name):
+        if name in ('textContent', 'innerText'):
+            return self._tag.get_text()
+        if name in ('outerHTML', 'innerHTML'):
+            return str(self._tag) if name == 'outerHTML' else self._tag.decode_contents()
+        return _attribute(self._tag, name)
+
+    def find_element(self, by='id', value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise _no_such_element(f"Unable to locate element: {by}={value}")
+        return elements[0]
+
+    def find_elements(self, by='id', value=None):
+        return [StaticElement(tag) for tag in _find_all(self._tag, by, value)]
+
+    def click(self):
+        pass
+
+    def is_displayed(self):
+        return True
+
+
+class StaticHtmlDriver:
+    """WebDriver的静态实现，页面HTML由page_loader(url)提供"""
+
+    def __init__(self, page_loader=None):
+        """
+        Args:
+            page_loader: 根据URL返回HTML文本的函数，为None时只能通过load_html加载页面
+        """
+        self.page_loader = page_loader
+        self.current_url = 'about:blank'
+        self.page_source = '<html><head></head><body></body></html>'
+        self._soup = None
+        self.window_handles = ['static-0']
+        self.current_window_handle = 'static-0'
+
+    def get(self, url):
+        """打开页面"""
+        if url == 'about:blank':
+            return self.load_html('<html><head></head><body></body></html>')
+        if self.page_loader is None:
+            raise ValueError("未设置page_loader，无法打开页面")
+        self.load_html(self.page_loader(url), url)
+
+    def load_html(self, html, url='about:blank'):
+        """直接加载HTML文本"""
+        self.current_url = url
+        self.page_source = html
+        self._soup = None
+
+    @property
+    def soup(self):
+        """当前页面的BeautifulSoup对象，第一次查找元素时才解析"""
+        if self._soup is None:
+            from bs4 import BeautifulSoup
+            self._soup = BeautifulSoup(self.page_source, 'html.parser')
+        return self._soup
+
+    @property
+    def title(self):
+        title = self.soup.find('title')
+        return title.get_text().strip() if title else ''
+
+    def find_element(self, by='id', value=None):
+        elements = self.find_elements(by, value)
+        if not elements:
+            raise _no_such_element(f"Unable to locate element: {by}={value}")
+        return elements[0]
+
+    def find_elements(self, by='id', value=None):
+        return [StaticElement(tag) for tag in _find_all(self.soup, by, value)]
+
+    def execute_script(self, script, *args):
+        if 'readyState' in script:
+            return 'complete'
+        return None
+
+    def close(self):
+        pass
+
+    def quit(self):
+        self._soup = None
+
+
+def http_page_loader(url, timeout=None):
+    """
+    通过HTTP直接下载页面HTML，可作为StaticHtmlDriver的page_loader
+
+    Args:
+        url: 页面URL
+        timeout: 超时时间（秒），None则使用浏览器超时配置
+
+    Returns:
+        str: 页面HTML，HTTP错误时抛出异常
+    """
+    if timeout is None:
+        timeout = CONFIG["browser"]["timeout"]
+    request = urllib.request.Request(url, headers={'User-Agent': CONFIG["browser"]["user_agent"]})
+    with urllib.request.urlopen(request, timeout=timeout) as response:
+        charset = response.headers.get_content_charset() or 'utf-8'
+        return response.read().decode(charset, errors='replace')